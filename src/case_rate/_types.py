@@ -1,15 +1,27 @@
 import datetime
+import operator
 import pathlib
-from typing import NamedTuple, Union
+from typing import (Any, Callable, Collection, Dict, Iterable, List,
+                    NamedTuple, Optional, Tuple, Type, TypeVar, Union)
+
+import numpy as np
+
+from .regions import REGIONS
 
 __all__ = [
     'Cases',
+    'CaseFrame',
     'CaseTesting',
-    'PathLike'
+    'PathLike',
+    'TestingFrame',
+    'to_frame'
 ]
 
 PathLike = Union[str, pathlib.Path]
 Datum = Union['Cases', 'CaseTesting']
+Region = Tuple[Optional[str], Optional[str]]
+Regions = Optional[Collection[Region]]
+Batch = Dict[str, List[Any]]
 
 
 class Cases(NamedTuple):
@@ -31,6 +43,12 @@ class Cases(NamedTuple):
         number of deaths confirmed due to COVID-19
     resolved : int
         number of confirmed resolved cases
+    county : str
+        the sub-provincial region (e.g., county, health unit, etc.) that the
+        cases are reported for; empty if the cases are for the whole province
+    rollup : bool
+        ``True`` if these are the national totals, as published by the source,
+        rather than the cases for a single province
     '''
     date: datetime.date
     province: str
@@ -38,6 +56,8 @@ class Cases(NamedTuple):
     confirmed: int
     deceased: int
     resolved: int
+    county: str = ''
+    rollup: bool = False
 
     def __add__(self, other: 'Cases') -> 'Cases':  # type: ignore
         if not isinstance(other, self.__class__):
@@ -48,6 +68,8 @@ class Cases(NamedTuple):
 
         province = self.province if other.province == self.province else 'aggr'
         country = self.country if other.country == self.country else 'aggr'
+        county = self.county if other.county == self.county else 'aggr'
+        rollup = self.rollup and other.rollup
 
         # Only add resolved cases if both are positive.  A negative value means
         # no information is available.
@@ -62,7 +84,9 @@ class Cases(NamedTuple):
             country=country,
             confirmed=self.confirmed + other.confirmed,
             deceased=self.deceased + other.deceased,
-            resolved=resolved
+            resolved=resolved,
+            county=county,
+            rollup=rollup
         )
 
 
@@ -114,3 +138,433 @@ class SourceInfo(NamedTuple):
     '''Used to specify information about where the data came from.'''
     description: str
     url: str
+
+
+# Label used for a region when records from different regions are summed.
+_AGGREGATE = 'aggr'
+
+_FrameT = TypeVar('_FrameT', bound='_Frame')
+
+# Day ordinal of the ``datetime64`` epoch.
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+
+def _group_sum(values: np.ndarray, groups: np.ndarray,
+               num_groups: int) -> np.ndarray:
+    '''Sum integer values by group.'''
+    # np.bincount() only sums as floating point, which is still exact for any
+    # realistic number of cases.
+    sums = np.bincount(groups, weights=values, minlength=num_groups)
+    return np.rint(sums).astype(np.int64)
+
+
+def _to_dates(values: Any) -> np.ndarray:
+    '''Convert a column of dates into a ``datetime64[D]`` array.'''
+    if isinstance(values, np.ndarray) or len(values) == 0 or \
+            not isinstance(values[0], datetime.date):
+        return np.asarray(values, dtype='datetime64[D]')
+
+    # Converting the day ordinals is much faster than having NumPy convert
+    # each date object.
+    ordinals = np.fromiter(map(datetime.date.toordinal, values), np.int64,
+                           count=len(values))
+    return (ordinals - _EPOCH).astype('datetime64[D]')
+
+
+def _to_array(values: Any, dtype) -> np.ndarray:
+    '''Convert a column of numbers into an array.'''
+    if isinstance(values, np.ndarray):
+        return values.astype(dtype, copy=False)
+    return np.fromiter(values, dtype, count=len(values))
+
+
+class _Frame:
+    '''Columnar (struct-of-arrays) storage for a set of records.
+
+    A frame holds the same information as a list of named tuples but stores
+    each field as a NumPy array.  Dates are ``datetime64[D]`` values, counts
+    are integers and the region names are dictionary-encoded, i.e. stored as
+    their IDs in the shared :data:`regions.REGIONS` registry.
+
+    Subclasses set the named tuple type and describe its fields.
+    '''
+    _RECORD: Type[Any]
+    _TEXT: Tuple[str, ...]
+    _COUNTS: Tuple[str, ...]
+    _FLAGS: Tuple[str, ...] = ()
+
+    def __init__(self, **columns):
+        '''
+        Parameters
+        ----------
+        columns
+            the arrays (or sequences) for each of the record's fields; any
+            field with a default value in the record type may be omitted
+        '''
+        for field in self._RECORD._fields:
+            if field in columns:
+                continue
+            if field not in self._RECORD._field_defaults:
+                raise ValueError(f'Missing the "{field}" column.')
+
+        self.date = _to_dates(columns['date'])
+        numel = self.date.shape[0]
+
+        self._codes: Dict[str, np.ndarray] = {}
+        for field in self._TEXT:
+            if field in columns:
+                codes = REGIONS.encode(columns[field])
+            else:
+                default = REGIONS.intern(self._RECORD._field_defaults[field])
+                codes = np.full(numel, default, dtype=np.int32)
+            self._codes[field] = codes
+
+        self._values: Dict[str, np.ndarray] = {}
+        for field in self._COUNTS + self._FLAGS:
+            dtype = bool if field in self._FLAGS else np.int64
+            if field in columns:
+                values = _to_array(columns[field], dtype)
+            else:
+                values = np.full(numel, self._RECORD._field_defaults[field],
+                                 dtype=dtype)
+            self._values[field] = values
+
+        for field, values in self._columns():
+            if values.shape[0] != numel:
+                raise ValueError(f'The "{field}" column has {values.shape[0]} '
+                                 f'values but there are {numel} dates.')
+
+    @classmethod
+    def _from_encoded(cls: Type[_FrameT], date: np.ndarray,
+                      codes: Dict[str, np.ndarray],
+                      values: Dict[str, np.ndarray]) -> _FrameT:
+        '''Create a frame from already encoded columns.'''
+        frame = cls.__new__(cls)
+        frame.date = date
+        frame._codes = codes
+        frame._values = values
+        return frame
+
+    @classmethod
+    def from_records(cls: Type[_FrameT], records: Iterable[Any]) -> _FrameT:
+        '''Create a frame from a sequence of named tuples.
+
+        Parameters
+        ----------
+        records : iterable of :class:`Cases` or :class:`CaseTesting`
+            the records to store in the frame
+
+        Returns
+        -------
+        frame
+            the records, in the same order
+        '''
+        records = list(records)
+        for record_type in set(map(type, records)):
+            if not issubclass(record_type, cls._RECORD):
+                raise TypeError(f'Expected a {cls._RECORD.__name__} record.')
+
+        if len(records) == 0:
+            return cls.empty()
+
+        return cls(**{
+            field: list(map(operator.itemgetter(i), records))
+            for i, field in enumerate(cls._RECORD._fields)
+        })
+
+    @classmethod
+    def from_batches(cls: Type[_FrameT], batches: Iterable[Batch]) -> _FrameT:
+        '''Create a frame from the columnar batches used by the storage.
+
+        Parameters
+        ----------
+        batches : iterable of dict
+            the mappings between field names and lists of column values, e.g.
+            from :meth:`Storage.batches`
+
+        Returns
+        -------
+        frame
+            the concatenated batches
+        '''
+        columns: Dict[str, List[Any]] = {}
+        for batch in batches:
+            for field, values in batch.items():
+                columns.setdefault(field, []).extend(values)
+
+        if len(columns) == 0:
+            return cls.empty()
+
+        return cls(**columns)
+
+    @classmethod
+    def empty(cls: Type[_FrameT]) -> _FrameT:
+        '''Create a frame without any records.'''
+        return cls(**{
+            field: [] for field in cls._RECORD._fields
+            if field not in cls._RECORD._field_defaults
+        })
+
+    def __len__(self) -> int:
+        return self.date.shape[0]
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def __getitem__(self, key):
+        '''Select a column by name or a subset of rows.
+
+        A string returns the named column, with any region names decoded.
+        Anything else (an index array, boolean mask or slice) returns a new
+        frame containing those rows.
+        '''
+        if isinstance(key, str):
+            return self.column(key)
+
+        if isinstance(key, (int, np.integer)):
+            key = slice(key, key + 1 if key != -1 else None)
+
+        return self._from_encoded(
+            self.date[key],
+            {field: codes[key] for field, codes in self._codes.items()},
+            {field: values[key] for field, values in self._values.items()})
+
+    def _columns(self):
+        yield 'date', self.date
+        yield from self._codes.items()
+        yield from self._values.items()
+
+    def column(self, field: str) -> np.ndarray:
+        '''Return a single column as an array.
+
+        Parameters
+        ----------
+        field : str
+            the name of the record field
+
+        Returns
+        -------
+        np.ndarray
+            the column's values; region names are decoded into strings
+        '''
+        if field == 'date':
+            return self.date
+        elif field in self._codes:
+            return REGIONS.decode(self._codes[field])
+        elif field in self._values:
+            return self._values[field]
+        raise KeyError(f'Unknown field "{field}".')
+
+    def encoded(self, field: str) -> np.ndarray:
+        '''Return the region IDs of a region column.
+
+        Parameters
+        ----------
+        field : str
+            one of the region (text) fields
+
+        Returns
+        -------
+        np.ndarray
+            the :data:`regions.REGIONS` ID for each row
+        '''
+        return self._codes[field]
+
+    def to_records(self) -> List[Any]:
+        '''Convert the frame into a list of named tuples.'''
+        columns = []
+        for field in self._RECORD._fields:
+            if field == 'date':
+                columns.append(self.date.tolist())
+            elif field in self._codes:
+                # Share the registry's copy of each name between records.
+                columns.append(REGIONS.to_names(self._codes[field]))
+            else:
+                columns.append(self.column(field).tolist())
+        return [self._RECORD(*values) for values in zip(*columns)]
+
+    def select(self: _FrameT,
+               predicate: Union[np.ndarray, Callable[[Any], bool]]
+               ) -> _FrameT:
+        '''Select a subset of the records.
+
+        Parameters
+        ----------
+        predicate : np.ndarray, :class:`filters.Predicate` or callable
+            either a boolean mask, with one value per record, a predicate
+            that's evaluated over the whole frame, or a function that's called
+            on each record (as a named tuple)
+
+        Returns
+        -------
+        frame
+            the selected records, sorted by date
+        '''
+        if hasattr(predicate, 'mask'):
+            mask = predicate.mask(self)  # type: ignore
+        elif callable(predicate):
+            mask = np.array([bool(predicate(record)) for record in self],
+                            dtype=bool)
+        else:
+            mask = np.asarray(predicate, dtype=bool)
+
+        indices = np.flatnonzero(mask)
+        dates = self.date[indices]
+        if np.any(dates[1:] < dates[:-1]):
+            indices = indices[np.argsort(dates, kind='stable')]
+        return self[indices]
+
+    def select_by_country(self: _FrameT, country: str) -> _FrameT:
+        '''Select the records for a single country.
+
+        Parameters
+        ----------
+        country : str
+            country to select
+
+        Returns
+        -------
+        frame
+            the country's records, sorted by date
+        '''
+        region = REGIONS.lookup(country)
+        if region is None:
+            return self.select(np.zeros(len(self), dtype=bool))
+        return self.select(self._codes['country'] == region)
+
+    def sum_by_date(self: _FrameT) -> _FrameT:
+        '''Sum the records by date.
+
+        This produces the same result as adding the named tuples together.
+        Any region field that differs between records on the same day is
+        labelled as ``'aggr'``.
+
+        Returns
+        -------
+        frame
+            one record per date, sorted by date
+        '''
+        if len(self) == 0:
+            return self[:]
+
+        # Group the records by their day ordinal, relative to the first day.
+        # Counting the records on each day gives the days that are present
+        # and, in date order, the group that each record belongs to.
+        first_day = self.date.min()
+        days = (self.date - first_day).astype(np.int64)
+        present = np.bincount(days) > 0
+        groups = (np.cumsum(present) - 1)[days]
+        num_groups = int(np.count_nonzero(present))
+
+        codes: Dict[str, np.ndarray] = {}
+        for field in self._TEXT:
+            lowest = np.full(num_groups, np.iinfo(np.int32).max, np.int32)
+            highest = np.full(num_groups, -1, np.int32)
+            np.minimum.at(lowest, groups, self._codes[field])
+            np.maximum.at(highest, groups, self._codes[field])
+            lowest[lowest != highest] = REGIONS.intern(_AGGREGATE)
+            codes[field] = lowest
+
+        values = {
+            field: self._reduce(field, self._values[field], groups,
+                                num_groups)
+            for field in self._COUNTS
+        }
+        for field in self._FLAGS:
+            unset = np.bincount(groups, weights=~self._values[field],
+                                minlength=num_groups)
+            values[field] = unset == 0
+
+        dates = first_day + np.flatnonzero(present)
+        return self._from_encoded(dates, codes, values)
+
+    def _reduce(self, field: str, values: np.ndarray, groups: np.ndarray,
+                num_groups: int) -> np.ndarray:
+        '''Combine the values for each day.
+
+        Parameters
+        ----------
+        field : str
+            name of the field being combined
+        values : np.ndarray
+            the field's values, in record order
+        groups : np.ndarray
+            the day that each record belongs to, numbered in date order
+        num_groups : int
+            the number of days
+
+        Returns
+        -------
+        np.ndarray
+            the combined value for each day
+        '''
+        return _group_sum(values, groups, num_groups)
+
+
+class CaseFrame(_Frame):
+    '''A columnar collection of :class:`Cases`.
+
+    Attributes
+    ----------
+    date : np.ndarray
+        the ``datetime64[D]`` date of each record
+    '''
+    _RECORD = Cases
+    _TEXT = ('province', 'country', 'county')
+    _COUNTS = ('confirmed', 'deceased', 'resolved')
+    _FLAGS = ('rollup',)
+
+    def _reduce(self, field: str, values: np.ndarray, groups: np.ndarray,
+                num_groups: int) -> np.ndarray:
+        if field == 'resolved':
+            # Resolved cases are only added if they're all positive, starting
+            # from the first record.  A negative value means no information is
+            # available.
+            first = np.full(num_groups, len(self), np.int64)
+            np.minimum.at(first, groups, np.arange(len(self)))
+            known = _group_sum(np.where(values >= 0, values, 0), groups,
+                               num_groups)
+            return np.where(values[first] >= 0, known, values[first])
+
+        return super()._reduce(field, values, groups, num_groups)
+
+
+class TestingFrame(_Frame):
+    '''A columnar collection of :class:`CaseTesting`.
+
+    Attributes
+    ----------
+    date : np.ndarray
+        the ``datetime64[D]`` date of each record
+    '''
+    _RECORD = CaseTesting
+    _TEXT = ('province', 'country')
+    _COUNTS = ('tested', 'under_investigation')
+
+
+def to_frame(records: List[Datum]) -> Union[CaseFrame, TestingFrame]:
+    '''Convert a list of records into the matching type of frame.
+
+    Parameters
+    ----------
+    records : list of :class:`Cases` or :class:`CaseTesting`
+        the records to convert; there must be at least one
+
+    Returns
+    -------
+    :class:`CaseFrame` or :class:`TestingFrame`
+        the records, in the same order
+
+    Raises
+    ------
+    TypeError
+        if the records aren't all of the same, supported type
+    '''
+    if len(records) == 0:
+        raise ValueError('Need at least one record to choose the frame type.')
+
+    for FrameCls in (CaseFrame, TestingFrame):
+        if isinstance(records[0], FrameCls._RECORD):
+            return FrameCls.from_records(records)
+
+    raise TypeError('Can only convert Cases or CaseTesting objects.')
@@ -1,4 +1,5 @@
 # flake8: noqa
 from .operations import *
 from .predict import DailyCasesPredictor
-from .timeseries import TimeSeries
+from .incremental import IncrementalRegression
+from .timeseries import MultiTimeSeries, TimeSeries, TimeSeriesPanel
@@ -0,0 +1,186 @@
+from typing import Dict
+
+import numpy as np
+import scipy.stats
+
+__all__ = [
+    'IncrementalRegression'
+]
+
+
+class IncrementalRegression:
+    '''Maintain a set of local linear regressions on a growing time series.
+
+    This produces the same results as :func:`smooth` and
+    :func:`estimate_slope`, for a linear (first-order) fit, but is designed
+    for a time series that's updated one day at a time.  A sample only affects
+    the regressions whose windows contain it, so an update only re-fits the
+    windows that overlap new or revised samples.  Everything else is reused
+    from the previous update.
+
+    The fits are computed directly from the window sums, with the times and
+    values centred on their means, rather than by solving the full linear
+    system for every window.
+
+    Attributes
+    ----------
+    window : int
+        size of the sliding window, in days
+    confidence : float
+        the confidence interval used for the slope estimates
+    '''
+    def __init__(self, window: int, confidence: float = 0.95):
+        '''
+        Parameters
+        ----------
+        window : int
+            size of the sliding window, in days
+        confidence : float, optional
+            the desired confidence interval, which defaults to 95%
+        '''
+        if window < 3:
+            raise ValueError('Window size must be at least three days.')
+
+        self.window = window
+        self.confidence = confidence
+
+        self._samples = np.zeros((0,))
+        self._smoothed = np.zeros((0,))
+        self._slope = np.zeros((0, 3))
+        self._critical: Dict[int, float] = {}
+
+    def __len__(self):
+        return self._samples.shape[0]
+
+    @property
+    def samples(self) -> np.ndarray:
+        '''np.ndarray: The current time series.'''
+        return self._samples
+
+    @property
+    def smoothed(self) -> np.ndarray:
+        '''np.ndarray: The smoothed time series (see :func:`smooth`).'''
+        return self._smoothed
+
+    @property
+    def slope(self) -> np.ndarray:
+        '''np.ndarray: The slope estimates (see :func:`estimate_slope`).'''
+        return self._slope
+
+    def _critical_value(self, dof: int) -> float:
+        '''The two-sided Student's t critical value, cached per DOF.'''
+        if dof not in self._critical:
+            self._critical[dof] = scipy.stats.t.ppf((1 + self.confidence)/2,
+                                                    dof)
+        return self._critical[dof]
+
+    def update(self, samples: np.ndarray) -> int:
+        '''Update the regressions for a new version of the time series.
+
+        The new time series must start on the same day as the previous one.
+        It would normally be the previous time series with one or more extra
+        days but any earlier samples may also have been revised.  Call
+        :meth:`reset` if the start of the time series has changed.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            the full time series
+
+        Returns
+        -------
+        int
+            the number of windows that were re-fit
+        '''
+        samples = np.asarray(samples, dtype=float)
+        M = min(samples.shape[0], len(self))
+
+        # Find the first sample that's different from the last update.
+        changed = np.flatnonzero(samples[:M] != self._samples[:M])
+        first = changed[0] if changed.shape[0] > 0 else M
+        return self._refit(samples, first)
+
+    def extend(self, samples: np.ndarray) -> int:
+        '''Update the regressions with samples added onto the end.
+
+        This is the same as calling :meth:`update` with the full time series,
+        except that the earlier samples are assumed to be unchanged, so they
+        don't need to be checked for revisions.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            the new samples, which follow the last sample of the previous
+            update
+
+        Returns
+        -------
+        int
+            the number of windows that were re-fit
+        '''
+        samples = np.asarray(samples, dtype=float)
+        return self._refit(np.concatenate((self._samples, samples)),
+                           len(self))
+
+    def _refit(self, samples: np.ndarray, first: int) -> int:
+        '''Re-fit any windows affected by the samples from ``first`` on.'''
+        N = samples.shape[0]
+        M = min(N, len(self))
+
+        # Any window containing a changed sample needs to be re-fit.  Windows
+        # near the end are also truncated, so adding samples changes them too.
+        half = self.window // 2
+        start = max(0, min(first, M) - half)
+
+        smoothed = np.zeros((N,))
+        slope = np.zeros((N, 3))
+        smoothed[:start] = self._smoothed[:start]
+        slope[:start, :] = self._slope[:start, :]
+
+        for i in range(start, N):
+            i_min = max(0, i - half)
+            i_max = min(N - 1, i + half) + 1
+            smoothed[i], slope[i, :] = self._fit(samples[i_min:i_max], i_min,
+                                                 i)
+
+        self._samples = samples.copy()
+        self._smoothed = smoothed
+        self._slope = slope
+        return N - start
+
+    def reset(self):
+        '''Discard all of the stored regressions.'''
+        self._samples = np.zeros((0,))
+        self._smoothed = np.zeros((0,))
+        self._slope = np.zeros((0, 3))
+
+    def _fit(self, x: np.ndarray, t_min: int, t0: int):
+        '''Fit a line to a single window.
+
+        Returns
+        -------
+        value : float
+            the value of the line at ``t0``
+        slope : np.ndarray
+            the slope along with its upper and lower confidence bounds
+        '''
+        n = x.shape[0]
+        if n <= 2:
+            raise ValueError('Number of samples must be greater than one plus '
+                             'the polynomial order.')
+
+        t = np.arange(t_min, t_min + n, dtype=float)
+        t_mean = t.mean()
+        x_mean = x.mean()
+        dt = t - t_mean
+        dx = x - x_mean
+
+        s_tt = dt @ dt
+        s_tx = dt @ dx
+        b1 = s_tx / s_tt
+
+        ssr = max(dx @ dx - b1*s_tx, 0.0)
+        noise = ssr / (n - 2)
+        ci = self._critical_value(n - 2)*np.sqrt(noise / s_tt)
+
+        return x_mean + b1*(t0 - t_mean), np.array([b1, b1 + ci, b1 - ci])
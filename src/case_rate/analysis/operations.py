@@ -1,7 +1,17 @@
+from typing import Dict, Optional, Sequence, Tuple, Union, overload
+
 import numpy as np
+import scipy.stats
 
 from .least_squares import LeastSquares, derivative, evalpoly
-from .timeseries import _compute_growth, TimeSeries
+from .timeseries import (_compute_growth, MultiTimeSeries, TimeSeries,
+                         TimeSeriesPanel)
+
+Series = Union[TimeSeries, MultiTimeSeries, TimeSeriesPanel]
+
+# The number of regions whose windows are solved together by a higher-order
+# panel regression.
+PANEL_CHUNK_SIZE = 16
 
 
 __all__ = [
@@ -13,14 +23,318 @@ __all__ = [
 ]
 
 
-def smooth(ts: TimeSeries, window: int, log_domain: bool,
-           order: int = 1) -> np.ndarray:
+def _batched_regression(samples: np.ndarray, window: int, order: int,
+                        confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    '''Performs the local least-squares on several columns at once.
+
+    This is the same as running :meth:`TimeSeries.local_regression` on each
+    column separately.  The design matrix only depends on the window, so each
+    window is solved once for all of the columns.
+
+    Parameters
+    ----------
+    samples : np.ndarray
+        an ``N x C`` array with ``C`` time series
+    window : int
+        size of the sliding window, in days
+    order : int
+        the order of the polynomial used for the regression
+    confidence : float
+        the desired confidence interval
+
+    Returns
+    -------
+    values : np.ndarray
+        an ``N x C`` array with the value of each regression at its sample
+    slopes : np.ndarray
+        an ``N x 3 x C`` array with the slope of each regression at its sample
+        and the slopes of the upper and lower confidence interval curves
+    '''
+    if window < 3:
+        raise ValueError('Window size must be at least three days.')
+
+    N, C = samples.shape
+    K = order + 1
+    powers = np.arange(K)
+
+    values = np.zeros((N, C))
+    slopes = np.zeros((N, 3, C))
+    for i in range(N):
+        i_min = max(0, i - window // 2)
+        i_max = min(N - 1, i + window // 2) + 1
+        M = i_max - i_min
+        if M <= K:
+            raise ValueError('Number of samples must be greater than one plus '
+                             'the polynomial order.')
+
+        X = np.arange(i_min, i_max, dtype=float)[:, np.newaxis]**powers
+        y = samples[i_min:i_max, :]
+
+        weights = np.linalg.pinv(X) @ y
+        ssr = ((y - X @ weights)**2).sum(axis=0)
+        covar = np.linalg.inv(X.transpose() @ X)
+        variances = np.diag(covar)[:, np.newaxis] * (ssr / (M - K))
+        cv = scipy.stats.t.ppf((1 + confidence)/2, M - K)*np.sqrt(variances)
+
+        # The value and derivative of each polynomial at 't = i'.
+        tn = float(i)**powers
+        dt = powers[1:] * tn[:-1]
+
+        values[i, :] = tn @ weights
+        slopes[i, 0, :] = dt @ weights[1:, :]
+        slopes[i, 1, :] = dt @ (weights + cv)[1:, :]
+        slopes[i, 2, :] = dt @ (weights - cv)[1:, :]
+
+    return values, slopes
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    '''Sum the values in a centred window around each sample.
+
+    The windows are truncated at the ends of the last axis, in the same way as
+    :meth:`TimeSeries.local_regression`.  The sums are computed from a single
+    cumulative sum so the cost doesn't depend on the window size.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        the values to sum, along the last axis
+    window : int
+        size of the sliding window, in samples
+
+    Returns
+    -------
+    np.ndarray
+        an array, the same shape as ``values``, with the sum of each window
+    '''
+    N = values.shape[-1]
+    half = window // 2
+    offsets = np.arange(N)
+    lower = np.maximum(offsets - half, 0)
+    upper = np.minimum(offsets + half, N - 1) + 1
+
+    totals = np.zeros(values.shape[:-1] + (N + 1,))
+    np.cumsum(values, axis=-1, out=totals[..., 1:])
+    return totals[..., upper] - totals[..., lower]
+
+
+def _linear_regression(samples: np.ndarray, valid: np.ndarray,
+                       times: np.ndarray, window: int,
+                       confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    '''Performs a local linear regression using running sums.
+
+    A straight line only depends on the number of samples in the window and
+    the sums of ``t``, ``t^2``, ``x``, ``tx`` and ``x^2``.  Those are obtained
+    with :func:`_window_sums`, so this only needs ``O(R x D)`` memory and time.
+    The arguments and outputs are the same as for :func:`_panel_regression`.
+    '''
+    # Windows containing a non-finite sample, e.g. 'log(0)', can't be fit.
+    # They're removed from the sums, so they don't affect any other windows,
+    # and the fit is marked as missing.
+    finite = np.isfinite(samples)
+    missing = _window_sums(valid & ~finite, window) > 0
+    mask = valid & finite
+
+    # Subtracting each region's mean keeps the running sums small, which
+    # limits the round-off when they're differenced.
+    counts = np.maximum(mask.sum(axis=1, keepdims=True), 1)
+    offset = np.where(mask, samples, 0).sum(axis=1, keepdims=True) / counts
+
+    t = np.where(mask, times, 0).astype(float)
+    x = np.where(mask, samples - offset, 0)
+
+    n = _window_sums(mask, window)
+    st = _window_sums(t, window)
+    stt = _window_sums(t*t, window)
+    sx = _window_sums(x, window)
+    stx = _window_sums(t*x, window)
+    sxx = _window_sums(x*x, window)
+
+    solvable = valid & ~missing & (n > 2)
+    n = np.where(solvable, n, 3)
+
+    # Centre the sums on the window's mean time and value.
+    t_mean = st / n
+    x_mean = sx / n
+    ctt = stt - st*t_mean
+    ctx = stx - st*x_mean
+    cxx = sxx - sx*x_mean
+    ctt[~solvable] = 1
+
+    slope = ctx / ctt
+    ssr = np.maximum(cxx - slope*ctx, 0)
+    dof = n - 2
+    cv = scipy.stats.t.ppf((1 + confidence)/2, dof) * \
+        np.sqrt(ssr / dof / ctt)
+
+    values = offset + x_mean + slope*(times - t_mean)
+    slopes = np.stack([slope, slope + cv, slope - cv], axis=2)
+
+    values[~solvable] = np.nan
+    slopes[~solvable, :] = np.nan
+    return values, slopes
+
+
+def _windowed_regression(samples: np.ndarray, valid: np.ndarray,
+                         times: np.ndarray, window: int, order: int,
+                         confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    '''Performs a local polynomial regression by solving every window.
+
+    Every window's normal equations are built and solved together.  This needs
+    ``R x D x W x K`` memory, for ``W`` days in a window and ``K`` polynomial
+    coefficients, so :func:`_panel_regression` only gives it a few regions at
+    a time.  The arguments and outputs are the same as for
+    :func:`_panel_regression`.
+    '''
+    # Pad the day axis so that every day has a full window; the padding is
+    # masked out.
+    half = window // 2
+    padding = ((0, 0), (half, half))
+    windows = np.lib.stride_tricks.sliding_window_view
+    x = windows(np.pad(samples, padding), 2*half + 1, axis=1)
+    t = windows(np.pad(times.astype(float), padding), 2*half + 1, axis=1)
+    v = windows(np.pad(valid, padding), 2*half + 1, axis=1)
+
+    K = order + 1
+    powers = np.arange(K)
+    X = t[..., np.newaxis]**powers
+    vX = X * v[..., np.newaxis]
+
+    # Windows without enough samples are given a placeholder system so that
+    # they can be solved along with everything else.
+    N = v.sum(axis=2)
+    solvable = valid & (N > K)
+    XtX = np.einsum('rdwk,rdwl->rdkl', vX, X)
+    XtX[~solvable] = np.eye(K)
+    Xty = np.einsum('rdwk,rdw->rdk', vX, x)
+
+    weights = np.linalg.solve(XtX, Xty[..., np.newaxis])[..., 0]
+    residuals = x - np.einsum('rdwk,rdk->rdw', X, weights)
+    ssr = (v*residuals**2).sum(axis=2)
+
+    dof = np.where(solvable, N - K, 1)
+    covar = np.linalg.inv(XtX)
+    variances = np.diagonal(covar, axis1=2, axis2=3) * (ssr / dof)[..., None]
+    cv = scipy.stats.t.ppf((1 + confidence)/2, dof)[..., np.newaxis] * \
+        np.sqrt(variances)
+
+    # The value and derivative of each polynomial at its own sample.
+    tn = times[..., np.newaxis].astype(float)**powers
+    dt = powers[1:] * tn[..., :-1]
+
+    values = np.einsum('rdk,rdk->rd', tn, weights)
+    slopes = np.stack([
+        np.einsum('rdk,rdk->rd', dt, weights[..., 1:]),
+        np.einsum('rdk,rdk->rd', dt, (weights + cv)[..., 1:]),
+        np.einsum('rdk,rdk->rd', dt, (weights - cv)[..., 1:]),
+    ], axis=2)
+
+    values[~solvable] = np.nan
+    slopes[~solvable, :] = np.nan
+    return values, slopes
+
+
+def _panel_regression(panel: TimeSeriesPanel, window: int, order: int,
+                      confidence: float,
+                      log_domain: bool = False) -> Tuple[np.ndarray,
+                                                         np.ndarray]:
+    '''Performs the local least-squares on every region of a panel at once.
+
+    This is the same as running :meth:`TimeSeries.local_regression` on each
+    region separately.  A region's windows are truncated at the start and end
+    of its own time series, which is done by masking out the samples that
+    aren't valid for that region.  Linear regressions are computed from
+    running sums over all of the regions at once; higher orders solve each
+    window, :data:`PANEL_CHUNK_SIZE` regions at a time.
+
+    Parameters
+    ----------
+    panel : :class:`TimeSeriesPanel`
+        the regional time series
+    window : int
+        size of the sliding window, in days
+    order : int
+        the order of the polynomial used for the regression
+    confidence : float
+        the desired confidence interval
+    log_domain : bool, optional
+        perform the regression in the log-domain
+
+    Returns
+    -------
+    values : np.ndarray
+        an ``R x D`` array with the value of each regression at its sample
+    slopes : np.ndarray
+        an ``R x D x 3`` array with the slope of each regression at its sample
+        and the slopes of the upper and lower confidence interval curves
+
+    Notes
+    -----
+    Any days that aren't part of a region's time series, or where the window
+    doesn't have enough samples for the regression, are ``NaN``.
+    '''
+    if window < 3:
+        raise ValueError('Window size must be at least three days.')
+
+    valid = panel.valid
+    samples = np.where(valid, np.asarray(panel), 0)
+    if log_domain:
+        samples = np.log(samples, out=np.zeros_like(samples), where=valid)
+
+    # Times are relative to the start of each region, just like when the
+    # region is analyzed on its own.
+    times = np.arange(len(panel)) - panel.starts[:, np.newaxis]
+
+    if order == 1:
+        return _linear_regression(samples, valid, times, window, confidence)
+
+    values = np.empty(valid.shape)
+    slopes = np.empty(valid.shape + (3,))
+    for first in range(0, valid.shape[0], PANEL_CHUNK_SIZE):
+        rows = slice(first, first + PANEL_CHUNK_SIZE)
+        values[rows], slopes[rows] = _windowed_regression(
+            samples[rows], valid[rows], times[rows], window, order,
+            confidence)
+
+    return values, slopes
+
+
+def _select(ts: MultiTimeSeries, columns: Optional[Sequence[str]],
+            log_domain: bool = False) -> Tuple[Tuple[str, ...], np.ndarray]:
+    '''Get the columns, and their samples, that an operation will run on.'''
+    if columns is None:
+        columns = ts.columns
+
+    samples = ts.select(columns)
+    if log_domain:
+        samples = np.log(samples)
+    return tuple(columns), samples
+
+
+@overload
+def smooth(ts: Union[TimeSeries, TimeSeriesPanel], window: int,
+           log_domain: bool, order: int = ...,
+           columns: Optional[Sequence[str]] = ...) -> np.ndarray:
+    ...
+
+
+@overload
+def smooth(ts: MultiTimeSeries, window: int, log_domain: bool,
+           order: int = ..., columns: Optional[Sequence[str]] = ...
+           ) -> Dict[str, np.ndarray]:
+    ...
+
+
+def smooth(ts: Series, window: int, log_domain: bool, order: int = 1,
+           columns: Optional[Sequence[str]] = None
+           ) -> Union[np.ndarray, Dict[str, np.ndarray]]:
     '''Return a smoothed version of a time series.
 
     Parameters
     ----------
     ts: :class:`TimeSeries`
-        time series
+        time series; this may also be a :class:`MultiTimeSeries` or a
+        :class:`TimeSeriesPanel`
     window : int
         size of the sliding window, in days, used for the smoothing
     log_domain : bool
@@ -29,18 +343,34 @@ def smooth(ts: TimeSeries, window: int, log_domain: bool,
         the order of the polynomial used for the smoothing; defaults
         to '1', which assumes the contents of the window are approximately
         linear
+    columns : list of ``str``, optional
+        the columns to use when ``ts`` is a :class:`MultiTimeSeries`; defaults
+        to all of them
 
     Returns
     -------
-    np.ndarray
-        a ``N``-length array containing the smoothed time series
+    np.ndarray or dict
+        a ``N``-length array containing the smoothed time series; a
+        :class:`MultiTimeSeries` returns an array for each column and a
+        :class:`TimeSeriesPanel` returns an ``R x N`` array
     '''
+    if isinstance(ts, TimeSeriesPanel):
+        values, _ = _panel_regression(ts, window, order, 0.95, log_domain)
+        return np.exp(values) if log_domain else values
+
+    if isinstance(ts, MultiTimeSeries):
+        columns, samples = _select(ts, columns, log_domain)
+        values, _ = _batched_regression(samples, window, order, 0.95)
+        if log_domain:
+            values = np.exp(values)
+        return {column: values[:, j] for j, column in enumerate(columns)}
+
     output = np.zeros((len(ts),))
     regressions = ts.local_regression(window, log_domain, order)
 
     ls: LeastSquares
     for i, ls in enumerate(regressions):
-        output[i] = ls.value(i)
+        output[i] = ls.value(i).item()
 
     if log_domain:
         output = np.exp(output)
@@ -48,14 +378,33 @@ def smooth(ts: TimeSeries, window: int, log_domain: bool,
     return output
 
 
-def estimate_slope(ts: TimeSeries, window: int, order: int = 1,
-                   confidence: float = 0.95) -> np.ndarray:
+@overload
+def estimate_slope(ts: Union[TimeSeries, TimeSeriesPanel], window: int,
+                   order: int = ..., confidence: float = ...,
+                   columns: Optional[Sequence[str]] = ...
+                   ) -> np.ndarray:
+    ...
+
+
+@overload
+def estimate_slope(ts: MultiTimeSeries, window: int, order: int = ...,
+                   confidence: float = ...,
+                   columns: Optional[Sequence[str]] = ...
+                   ) -> Dict[str, np.ndarray]:
+    ...
+
+
+def estimate_slope(ts: Series, window: int, order: int = 1,
+                   confidence: float = 0.95,
+                   columns: Optional[Sequence[str]] = None
+                   ) -> Union[np.ndarray, Dict[str, np.ndarray]]:
     '''Estimate the slope at any given point in a time series.
 
     Parameters
     ----------
     ts: :class:`TimeSeries`
-        time series
+        time series; this may also be a :class:`MultiTimeSeries` or a
+        :class:`TimeSeriesPanel`
     window : int
         size of the sliding window, in days, used in the slope estimate
     order : int, optional
@@ -64,14 +413,27 @@ def estimate_slope(ts: TimeSeries, window: int, order: int = 1,
         linear
     confidence : float, optional
         the desired confidence interval, which defaults to 95%
+    columns : list of ``str``, optional
+        the columns to use when ``ts`` is a :class:`MultiTimeSeries`; defaults
+        to all of them
 
     Returns
     -------
-    numpy.ndarray
+    numpy.ndarray or dict
         a :math:`N \\times 3`` array containing the slope and 95%
         confidence interval, e.g. each row is ``(slope, upper_ci,
-        lower_ci)``
+        lower_ci)``; a :class:`MultiTimeSeries` returns an array for each
+        column and a :class:`TimeSeriesPanel` returns an ``R x N x 3`` array
     '''
+    if isinstance(ts, TimeSeriesPanel):
+        _, slopes = _panel_regression(ts, window, order, confidence)
+        return slopes
+
+    if isinstance(ts, MultiTimeSeries):
+        columns, samples = _select(ts, columns)
+        _, slopes = _batched_regression(samples, window, order, confidence)
+        return {column: slopes[:, :, j] for j, column in enumerate(columns)}
+
     output = np.zeros((len(ts), 3))
     regressions = ts.local_regression(window, False, order)
 
@@ -81,21 +443,40 @@ def estimate_slope(ts: TimeSeries, window: int, order: int = 1,
         cv = ls.confidence(confidence)
         t0 = np.array([i])
 
-        output[i, 0] = evalpoly(derivative(weights), t0)
-        output[i, 1] = evalpoly(derivative(weights + cv), t0)
-        output[i, 2] = evalpoly(derivative(weights - cv), t0)
+        output[i, 0] = evalpoly(derivative(weights), t0).item()
+        output[i, 1] = evalpoly(derivative(weights + cv), t0).item()
+        output[i, 2] = evalpoly(derivative(weights - cv), t0).item()
 
     return output
 
 
-def estimate_growth(ts: TimeSeries, window: int, order: int = 1,
-                    confidence: float = 0.95) -> np.ndarray:
+@overload
+def estimate_growth(ts: Union[TimeSeries, TimeSeriesPanel], window: int,
+                    order: int = ..., confidence: float = ...,
+                    columns: Optional[Sequence[str]] = ...
+                    ) -> np.ndarray:
+    ...
+
+
+@overload
+def estimate_growth(ts: MultiTimeSeries, window: int, order: int = ...,
+                    confidence: float = ...,
+                    columns: Optional[Sequence[str]] = ...
+                    ) -> Dict[str, np.ndarray]:
+    ...
+
+
+def estimate_growth(ts: Series, window: int, order: int = 1,
+                    confidence: float = 0.95,
+                    columns: Optional[Sequence[str]] = None
+                    ) -> Union[np.ndarray, Dict[str, np.ndarray]]:
     '''Estimate the growth factor at any given point in the time series.
 
     Parameters
     ----------
     ts: :class:`TimeSeries`
-        time series
+        time series; this may also be a :class:`MultiTimeSeries` or a
+        :class:`TimeSeriesPanel`
     window : int
         size of the sliding window, in days, used in the slope estimate
     order : int, optional
@@ -104,26 +485,60 @@ def estimate_growth(ts: TimeSeries, window: int, order: int = 1,
         linear
     confidence : float, optional
         the desired confidence interval, which defaults to 95%
+    columns : list of ``str``, optional
+        the columns to use when ``ts`` is a :class:`MultiTimeSeries`; defaults
+        to all of them
 
     Returns
     -------
-    numpy.ndarray
+    numpy.ndarray or dict
         a :math:`N \\times 3`` array containing the growth factor and 95%
         confidence interval, e.g. each row is ``(slope, upper_ci,
-        lower_ci)``
+        lower_ci)``; a :class:`MultiTimeSeries` returns an array for each
+        column and a :class:`TimeSeriesPanel` returns an ``R x N`` array
     '''
+    if isinstance(ts, TimeSeriesPanel):
+        growth = _compute_growth(estimate_slope(ts, window, order,
+                                                confidence)[..., 0])
+        growth[~ts.valid] = np.nan
+        return growth
+
+    if isinstance(ts, MultiTimeSeries):
+        slopes = estimate_slope(ts, window, order, confidence, columns)
+        return {column: _compute_growth(slope[:, 0])
+                for column, slope in slopes.items()}
+
     slope = estimate_slope(ts, window, order, confidence)[:, 0]
     return _compute_growth(slope)
 
 
-def percent_change(ts: TimeSeries, window: int, order: int = 1,
-                   confidence: float = 0.95) -> np.ndarray:
+@overload
+def percent_change(ts: Union[TimeSeries, TimeSeriesPanel], window: int,
+                   order: int = ..., confidence: float = ...,
+                   columns: Optional[Sequence[str]] = ...
+                   ) -> np.ndarray:
+    ...
+
+
+@overload
+def percent_change(ts: MultiTimeSeries, window: int, order: int = ...,
+                   confidence: float = ...,
+                   columns: Optional[Sequence[str]] = ...
+                   ) -> Dict[str, np.ndarray]:
+    ...
+
+
+def percent_change(ts: Series, window: int, order: int = 1,
+                   confidence: float = 0.95,
+                   columns: Optional[Sequence[str]] = None
+                   ) -> Union[np.ndarray, Dict[str, np.ndarray]]:
     '''Estimate the day-over-day percent change.
 
     Parameters
     ----------
     ts: :class:`TimeSeries`
-        time series
+        time series; this may also be a :class:`MultiTimeSeries` or a
+        :class:`TimeSeriesPanel`
     window : int
         size of the sliding window, in days, used in the slope estimate
     order : int, optional
@@ -132,14 +547,29 @@ def percent_change(ts: TimeSeries, window: int, order: int = 1,
         linear
     confidence : float, optional
         the desired confidence interval, which defaults to 95%
+    columns : list of ``str``, optional
+        the columns to use when ``ts`` is a :class:`MultiTimeSeries`; defaults
+        to all of them
 
     Returns
     -------
-    numpy.ndarray
+    numpy.ndarray or dict
         a :math:`N \\times 3`` array containing the percent change and 95%
         confidence interval, e.g. each row is ``(slope, upper_ci,
-        lower_ci)``
+        lower_ci)``; a :class:`MultiTimeSeries` returns an array for each
+        column and a :class:`TimeSeriesPanel` returns an ``R x N x 3`` array
     '''
+    if isinstance(ts, TimeSeriesPanel):
+        _, slopes = _panel_regression(ts, window, order, confidence,
+                                      log_domain=True)
+        return np.exp(slopes) - 1
+
+    if isinstance(ts, MultiTimeSeries):
+        columns, samples = _select(ts, columns, log_domain=True)
+        _, slopes = _batched_regression(samples, window, order, confidence)
+        slopes = np.exp(slopes) - 1
+        return {column: slopes[:, :, j] for j, column in enumerate(columns)}
+
     output = np.zeros((len(ts), 3))
     regressions = ts.local_regression(window, True, order)
 
@@ -149,9 +579,9 @@ def percent_change(ts: TimeSeries, window: int, order: int = 1,
         cv = ls.confidence(confidence)
         t0 = np.array([i])
 
-        output[i, 0] = evalpoly(derivative(weights), t0)
-        output[i, 1] = evalpoly(derivative(weights + cv), t0)
-        output[i, 2] = evalpoly(derivative(weights - cv), t0)
+        output[i, 0] = evalpoly(derivative(weights), t0).item()
+        output[i, 1] = evalpoly(derivative(weights + cv), t0).item()
+        output[i, 2] = evalpoly(derivative(weights - cv), t0).item()
 
     # Convert into percent change by converting from the log-domain and
     # subtracting by one.
@@ -159,75 +589,86 @@ def percent_change(ts: TimeSeries, window: int, order: int = 1,
     return output
 
 
-def _sequence_growth_factor(sequence: np.ndarray, window: int) -> np.ndarray:
+def _sequence_growth_factor(sequence: np.ndarray, window: int,
+                            valid: Optional[np.ndarray] = None
+                            ) -> np.ndarray:
     '''Calculate the exponential growth factor for an array.
 
     Parameters
     ----------
     sequence : np.ndarray
-        a 1D array containing a sequency potentially undergoing exponential
-        growth
+        an array containing sequences, along its last axis, potentially
+        undergoing exponential growth
     window : int
         width of the filtering window
+    valid : np.ndarray, optional
+        a mask of the samples that are part of each sequence; by default all
+        of them are
 
     Returns
     -------
     np.ndarray
         estimated growth factor at each point in the sequence
     '''
-    N = sequence.shape[0]
-    output = np.zeros_like(sequence, dtype=float)
-    output[:] = np.nan
+    if valid is None:
+        valid = np.ones(sequence.shape, dtype=bool)
+
+    # If all values in the window are less than '0.5' then the growth rate is,
+    # by definition, '0' because nothing's happening.  The value may be
+    # smoothed, so this assumes that a value of '0.5' should be rounded down
+    # to '0'.
+    nothing = _window_sums(valid & (sequence < 0.5), window) == \
+        _window_sums(valid, window)
+
+    # Negative values may come from a number of sources, such as corrections
+    # being applied onto the time series, so they're left out of the fit.
+    # There must be enough values left to calculate a least squares fit.
+    # Since this is a linear fit, that means 3 points (can work with 2, but 3
+    # is better).
+    usable = valid & ~(sequence < 0)
+    missing = _window_sums(usable & np.isnan(sequence), window) > 0
+    usable &= ~np.isnan(sequence)
+    n = _window_sums(usable, window)
+    solvable = ~missing & (n >= 3)
+
+    # Add a small non-zero value when converting to log to allow it to work
+    # with windows where some days don't change.  The regression will find
+    # log(x[n]) = b_0 + b_1*n, where b_1 is the estimate of log(a).
+    t = np.where(usable, np.arange(sequence.shape[-1]), 0)
+    log_x = np.where(usable, np.log(np.where(usable, sequence, 1) + 1e-10), 0)
+
+    n = np.where(solvable, n, 3)
+    st = _window_sums(t, window)
+    ctt = _window_sums(t*t, window) - st*st/n
+    ctx = _window_sums(t*log_x, window) - st*_window_sums(log_x, window)/n
+    ctt[~solvable] = 1
+
+    output = np.where(solvable, np.exp(ctx / ctt), np.nan)
+    output[nothing] = 0
+    output[~valid] = np.nan
+    return output
 
-    for i in range(N):
-        i_min = max(0, i - window // 2)
-        i_max = min(N - 1, i + window // 2) + 1
 
-        x = sequence[i_min:i_max]
-        t = np.arange(i_min, i_max)
-
-        # If all values in the window are less than '0.5' then the growth rate
-        # is, by definition, '0' because nothing's happening.  The value may be
-        # smoothed, so this assumes that a value of '0.5' should be rounded
-        # down to '0'.
-        if np.all(x < 0.5):
-            output[i] = 0
-            continue
-
-        # Determine if there are any negative values.  Those may come from a
-        # number of sources, such as corrections being applied onto the time
-        # series.  If all values are negative then no growth rate can be
-        # calculated.
-        is_negative = x < 0
-        if np.all(is_negative):
-            continue
-
-        # Similarly, there must enough values to calculate a least squares fit.
-        # Since this is a linear fit, that means 3 points (can work with 2, but
-        # 3 is better).
-        valid = np.logical_not(is_negative)
-        if valid.sum() < 3:
-            continue
-
-        # Remove the invalid values and centre the window so that the centre
-        # corresponds to 'n = 0'.
-        x = x[valid]
-        t = t[valid]
-
-        # Add a small non-zero value when converting to log to allow it to work
-        # with windows where some days don't change.
-        log_x = np.log(x + 1e-10)
-
-        # The regression will find log(x[n]) = b_0 + b_1*n, where b_1 is the
-        # estimate of log(a).
-        ls = LeastSquares(t, log_x, 1)
-        output[i] = np.exp(ls.weights[1])
+@overload
+def growth_factor(ts: Union[TimeSeries, TimeSeriesPanel], window: int,
+                  order: int = ..., confidence: float = ...,
+                  columns: Optional[Sequence[str]] = ...
+                  ) -> np.ndarray:
+    ...
 
-    return output
 
+@overload
+def growth_factor(ts: MultiTimeSeries, window: int, order: int = ...,
+                  confidence: float = ...,
+                  columns: Optional[Sequence[str]] = ...
+                  ) -> Dict[str, np.ndarray]:
+    ...
 
-def growth_factor(ts: TimeSeries, window: int, order: int = 1,
-                  confidence: float = 0.95) -> np.ndarray:
+
+def growth_factor(ts: Series, window: int, order: int = 1,
+                  confidence: float = 0.95,
+                  columns: Optional[Sequence[str]] = None
+                  ) -> Union[np.ndarray, Dict[str, np.ndarray]]:
     '''Estimate the exponential growth factor of the time series.
 
     The growth factor is calculated from the LOESS regression provided by
@@ -238,7 +679,8 @@ def growth_factor(ts: TimeSeries, window: int, order: int = 1,
     Parameters
     ----------
     ts: :class:`TimeSeries`
-        time series
+        time series; this may also be a :class:`MultiTimeSeries` or a
+        :class:`TimeSeriesPanel`
     window : int
         size of the sliding window, in days
     order : int, optional
@@ -246,42 +688,68 @@ def growth_factor(ts: TimeSeries, window: int, order: int = 1,
         which assumes the contents of the window are approximately linear
     confidence : float, optional
         the desired confidence interval, which defaults to 95%
+    columns : list of ``str``, optional
+        the columns to use when ``ts`` is a :class:`MultiTimeSeries`; defaults
+        to all of them
 
     Returns
     -------
-    numpy.ndarray
+    numpy.ndarray or dict
         a :math:`N \\times 3`` array containing the growth factor curves of the
         daily change and confidence interval curves, i.e. each row is
-        ``(growth_slope, growth_upper_ci, growth_lower_ci)``
+        ``(growth_slope, growth_upper_ci, growth_lower_ci)``; a
+        :class:`MultiTimeSeries` returns an array for each column and a
+        :class:`TimeSeriesPanel` returns an ``R x N x 3`` array
     '''
     if window < 3:
         raise ValueError('Window size must be at least three days.')
 
-    slopes = estimate_slope(ts, window, order, confidence)
-    output = np.zeros_like(slopes)
+    if isinstance(ts, TimeSeriesPanel):
+        # Each region's windows are truncated to its own time series.
+        slopes = estimate_slope(ts, window, order, confidence)
+        return _slope_growth_factor(slopes, window, ts.valid)
+
+    if isinstance(ts, MultiTimeSeries):
+        column_slopes = estimate_slope(ts, window, order, confidence, columns)
+        return {column: _slope_growth_factor(slope, window)
+                for column, slope in column_slopes.items()}
+
+    return _slope_growth_factor(estimate_slope(ts, window, order, confidence),
+                                window)
 
-    for i in range(slopes.shape[1]):
-        output[:, i] = _sequence_growth_factor(slopes[:, i], window)
+
+def _slope_growth_factor(slopes: np.ndarray, window: int,
+                         valid: Optional[np.ndarray] = None) -> np.ndarray:
+    '''Convert the slope curves into growth factor curves.
+
+    Parameters
+    ----------
+    slopes : np.ndarray
+        a :math:`N \\times 3`` array from :func:`estimate_slope`, or the
+        ``R x N x 3`` array for a :class:`TimeSeriesPanel`
+    window : int
+        width of the filtering window
+    valid : np.ndarray, optional
+        the ``R x N`` mask of the valid panel samples
+
+    Returns
+    -------
+    np.ndarray
+        an array, the same shape as ``slopes``, with the growth factor curves
+    '''
+    output = np.stack([_sequence_growth_factor(slopes[..., i], window, valid)
+                       for i in range(slopes.shape[-1])], axis=-1)
 
     # Set the upper/lower CI curves to zero if the best fit curve is zero.  The
     # results are meaningless in this case because there wasn't enough data to
     # do the calculation.
-    best_fit = output[:, 0]
-    confidence_intervals = output[:, 1:]
+    best_fit = output[..., 0]
+    confidence_intervals = output[..., 1:]
     confidence_intervals[best_fit == 0, :] = 0
 
     # The intervals curves will have different growth factor curves, so they
     # need to be sorted to be consistent with the idea of an upper/lower bound.
-    is_swapped = np.argmin(confidence_intervals, 1) != 0
-
-    if np.any(is_swapped):
-        for i, swapped in enumerate(is_swapped):
-            if not swapped:
-                continue
-
-            value = confidence_intervals[i, 0]
-            confidence_intervals[i, 0] = confidence_intervals[i, 1]
-            confidence_intervals[i, 1] = value
+    is_swapped = np.argmin(confidence_intervals, axis=-1) != 0
+    confidence_intervals[is_swapped] = confidence_intervals[is_swapped, ::-1]
 
-    output[:, 1:] = confidence_intervals
     return output
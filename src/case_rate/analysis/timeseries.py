@@ -1,11 +1,15 @@
 import datetime
-from typing import List
+from typing import (Any, Dict, List, Mapping, Optional, Sequence, Tuple,
+                    Union)
 
 import numpy as np
 
+from .incremental import IncrementalRegression
 from .least_squares import LeastSquares
-from .. import filters
-from .._types import Datum
+from .._types import CaseFrame, Datum, TestingFrame, _to_dates, to_frame
+from ..regions import REGIONS
+
+Frame = Union[CaseFrame, TestingFrame]
 
 
 def _compute_growth(x: np.ndarray, min_x: float = 0.1) -> np.ndarray:
@@ -14,7 +18,7 @@ def _compute_growth(x: np.ndarray, min_x: float = 0.1) -> np.ndarray:
     Parameters
     ----------
     x : np.ndarray
-        N-length input sequence
+        N-length input sequence, or an array of sequences along its last axis
     min_x : float, optional
         smallest possible value for 'x' where it can still be considered valid
         when given a real-valued input sequence; default is '0.1'
@@ -24,20 +28,19 @@ def _compute_growth(x: np.ndarray, min_x: float = 0.1) -> np.ndarray:
     np.ndarray
         N-length growth sequence, with the first value being '1'
     '''
-    current_x = x[1:]
-    previous_x = x[:-1]
+    current_x = x[..., 1:]
+    previous_x = x[..., :-1]
 
     # If *any* of the differences are fractional then it means the input
     # sequence has been smoothed.
-    is_fractional = np.any(np.abs(current_x - previous_x) < 1)
+    is_fractional = np.any(np.abs(current_x - previous_x) < 1, axis=-1,
+                           keepdims=True)
 
     # When integer-valued the growth value can only be computed if the previous
     # day's change is non-zero.  There isn't an equivalent when it's
     # real-valued.
-    if is_fractional:
-        undefined = np.zeros_like(current_x, dtype=bool)
-    else:
-        undefined = np.logical_and(current_x > 0, previous_x < 1)
+    undefined = np.logical_and(current_x > 0, previous_x < 1)
+    undefined &= np.logical_not(is_fractional)
 
     # Compute the growth only where it's well-defined.
     valid = previous_x > min_x
@@ -45,17 +48,132 @@ def _compute_growth(x: np.ndarray, min_x: float = 0.1) -> np.ndarray:
     growth[valid] = current_x[valid] / previous_x[valid]
     growth[undefined] = np.nan
 
-    return np.pad(growth, (1, 0), constant_values=1)
+    padding = [(0, 0)]*(x.ndim - 1) + [(1, 0)]
+    return np.pad(growth, padding, constant_values=1)
+
 
+def _densify(dates: np.ndarray, values: np.ndarray, threshold: np.ndarray,
+             min_value: int) -> Tuple[datetime.date, np.ndarray]:
+    '''Convert unordered dates and values into a dense set of samples.
+
+    Parameters
+    ----------
+    dates : np.ndarray
+        the ``datetime64[D]`` date of each value
+    values : np.ndarray
+        an ``N``-length array, or an ``N x C`` array with one column per field
+    threshold : np.ndarray
+        an ``N``-length array compared against ``min_value``
+    min_value : int
+        don't include any values where ``threshold`` is below this
 
-class TimeSeries:
+    Returns
+    -------
+    start : :class:`datetime.date`
+        the date of the first sample
+    samples : np.ndarray
+        the values summed on each day, with any gaps filled in
+    '''
+    if dates.shape[0] != values.shape[0]:
+        raise ValueError('Must have the same number of dates and values.')
+
+    keep = threshold >= min_value
+    dates = dates[keep]
+    values = values[keep]
+    if dates.shape[0] == 0:
+        raise ValueError(f'No values are above {min_value}.')
+
+    # Sum the values onto a dense array of day offsets.
+    start = dates.min()
+    days = (dates - start).astype(np.int64)
+    if values.ndim == 1:
+        samples = np.bincount(days, weights=values)
+    else:
+        samples = np.column_stack([
+            np.bincount(days, weights=values[:, j])
+            for j in range(values.shape[1])
+        ])
+
+    # Any gaps in the reporting are filled in using the previously reported
+    # value, i.e. the index of the last reported day is carried forward.
+    reported = np.bincount(days) > 0
+    last_reported = np.where(reported, np.arange(reported.shape[0]), 0)
+    np.maximum.accumulate(last_reported, out=last_reported)
+
+    return start.item(), samples[last_reported]
+
+
+class _DateIndex:
+    '''The daily dates shared by all of the samples in a time series.'''
+    _start: datetime.date
+    _samples: np.ndarray
+
+    def _set_samples(self, start: datetime.date, samples: np.ndarray,
+                     index: Optional[np.ndarray] = None):
+        '''Set the samples, discarding any cached dates.'''
+        self._start = start
+        self._samples = samples
+        self._index = index
+        self._dates: Optional[List[datetime.date]] = None
+
+    def __len__(self):
+        return self._samples.shape[0]
+
+    @property
+    def index(self) -> np.ndarray:
+        if self._index is None:
+            index = np.datetime64(self._start, 'D') + np.arange(len(self))
+            index.flags.writeable = False
+            self._index = index
+        return self._index
+
+    @property
+    def dates(self) -> List[datetime.date]:
+        # Kept for compatibility; it's only built on the first access.
+        if self._dates is None:
+            self._dates = self.index.tolist()
+        return self._dates
+
+    def locate(self, date: Union[datetime.date, np.datetime64]) -> int:
+        '''Find the sample for some date.
+
+        Parameters
+        ----------
+        date : :class:`datetime.date` or ``np.datetime64``
+            the date to look up
+
+        Returns
+        -------
+        int
+            the index of the date's sample
+
+        Raises
+        ------
+        KeyError
+            if the date isn't part of the time series
+        '''
+        offset = int((np.asarray(date, dtype='datetime64[D]') -
+                      np.datetime64(self._start, 'D')).astype(np.int64))
+        if offset < 0 or offset >= len(self):
+            raise KeyError(f'{date} is not in the time series.')
+        return offset
+
+
+class TimeSeries(_DateIndex, np.lib.mixins.NDArrayOperatorsMixin):
     '''Represent a set of time series data
 
+    A time series can be used anywhere that NumPy expects an array.  The
+    conversion, e.g. ``np.asarray(series)``, doesn't copy the samples.
+    Elementwise operations, such as ``series / 1000`` or ``np.log(series)``,
+    produce a new time series that shares the same dates.
+
     Attributes
     ----------
     label : str
         a label used to describe the time series; it will default to the
         field used to generate the time series.
+    index : np.ndarray
+        the (read-only) ``datetime64[D]`` date of each sample
     dates : list of :class:`datetime.date` instances
         list of dates the time series represents
     daily_change : np.ndarray
@@ -65,65 +183,238 @@ class TimeSeries:
         the amount of growth in the time series, defined as
         ``daily_change[n]/daily_change[n-1]``
     '''
-    def __init__(self, data: List[Datum], field: str, min_value: int = 0):
+    def __init__(self, data: Union[List[Datum], Frame], field: str,
+                 min_value: int = 0):
         '''
         Parameters
         ----------
-        data : list of :class:`Cases` or :class:`CaseTesting`
-            a list of either :class:`Cases` or :class:`CaseTesting` objects
+        data : list of :class:`Cases` or :class:`CaseTesting`, or a frame
+            a list of either :class:`Cases` or :class:`CaseTesting` objects,
+            or the equivalent :class:`CaseFrame` or :class:`TestingFrame`
         field : str
             the name of the field to use for the time series
         min_value : int
             don't include any data below this threshold
         '''
-        def filter_by_field(datum: Datum) -> bool:
-            return datum._asdict()[field] >= min_value
+        if not isinstance(data, (CaseFrame, TestingFrame)):
+            if len(data) == 0:
+                raise ValueError('Cannot create an empty time series.')
+            data = to_frame(data)
 
-        data = filters.select(data, filter_by_field)
-        data = filters.sum_by_date(data)
+        self._assign(data.date, data[field], min_value)
+        self.label = field
 
-        start_date = data[0].date
-        end_date = data[-1].date
+    @classmethod
+    def from_arrays(cls, dates: Any, values: Any, label: str = '',
+                    min_value: int = 0) -> 'TimeSeries':
+        '''Create a time series directly from its dates and values.
 
-        # Convert the case/testing data into a time series.
-        duration = (end_date - start_date).days + 1
-        dates = [start_date + datetime.timedelta(days=i) for i in range(duration)]  # noqa: E501
-        samples = np.zeros((duration,))
+        Any values on the same date are added together, just like when
+        creating a time series from a set of records.
 
-        datum: Datum
-        for i, datum in enumerate(data):
-            value = datum._asdict()[field]
-            if value < min_value:
-                continue
+        Parameters
+        ----------
+        dates : array-like
+            the date of each value, as ``datetime64`` values or
+            :class:`datetime.date` objects
+        values : array-like
+            the time series values
+        label : str, optional
+            a label used to describe the time series
+        min_value : int
+            don't include any values below this threshold
 
-            # The computed index and enumerated index should be the same.  If
-            # not, then some duplicate data wasn't reported.  Fill it in using
-            # nearest-neighbour interpolation (not actually interpolation).
-            index = (datum.date - data[0].date).days
-            if index > i:
-                last_index = (data[i-1].date - data[0].date).days
-                for j in range(last_index, index):
-                    samples[j] = samples[last_index]
+        Returns
+        -------
+        :class:`TimeSeries`
+            the new time series
+        '''
+        series = cls.__new__(cls)
+        series._assign(_to_dates(dates), np.asarray(values), min_value)
+        series.label = label
+        return series
 
-            samples[index] = datum._asdict()[field]
+    # Views and ufunc results don't have a threshold of their own.
+    _min_value = 0
 
-        self._start = start_date
-        self._dates = dates
-        self._samples = samples
-        self.label = field
+    def _assign(self, dates: np.ndarray, values: np.ndarray, min_value: int):
+        '''Convert the (unordered) dates and values into the time series.'''
+        self._set_samples(*_densify(dates, values, values, min_value))
+        self._min_value = min_value
 
-    def __len__(self):
-        return self._samples.shape[0]
+    def _set_samples(self, start: datetime.date, samples: np.ndarray,
+                     index: Optional[np.ndarray] = None):
+        super()._set_samples(start, samples, index)
+        self._regressions: Dict[Tuple[int, float], IncrementalRegression] = {}
+
+    def append(self, dates: Any, values: Any):
+        '''Add new values onto the end of the time series.
+
+        This gives the same time series as if it had been created with the new
+        values included.  Values on the same date are added together, any gaps
+        are filled in, and any values below the time series' ``min_value``
+        are ignored.  The regressions from :meth:`regression` are kept up to
+        date by only re-fitting the windows at the end of the time series.
+
+        Parameters
+        ----------
+        dates : array-like
+            the date of each value, as ``datetime64`` values or
+            :class:`datetime.date` objects; they must all be after the last
+            date in the time series, unless it's empty
+        values : array-like
+            the new values
+
+        Raises
+        ------
+        ValueError
+            if any of the dates are already part of the time series
+        '''
+        dates = _to_dates(dates)
+        values = np.asarray(values)
+        if dates.shape[0] != values.shape[0]:
+            raise ValueError('Must have the same number of dates and values.')
+
+        # The dates are checked before any values are dropped for being below
+        # the threshold.
+        end = np.datetime64(self._start, 'D') + len(self)
+        if len(self) > 0 and dates.shape[0] > 0 and dates.min() < end:
+            raise ValueError('Can only append dates after the end of the time '
+                             'series.')
+
+        keep = values >= self._min_value
+        if not np.any(keep):
+            return
+
+        start, samples = _densify(dates[keep], values[keep], values[keep],
+                                  self._min_value)
+
+        if len(self) == 0:
+            # An empty series, e.g. from between(), has no last sample to fill
+            # in a gap with, so it just starts on the first new date.
+            first = start
+            added = samples
+        else:
+            offset = int((np.datetime64(start, 'D') - end).astype(np.int64))
+
+            # Any days between the current end and the new values are filled
+            # in with the last sample.
+            first = self._start
+            added = np.concatenate((np.repeat(self._samples[-1:], offset),
+                                    samples))
+
+        regressions = self._regressions
+        self._set_samples(first, np.concatenate((self._samples, added)))
+        for regression in regressions.values():
+            regression.extend(added)
+        self._regressions = regressions
+
+    def regression(self, window: int,
+                   confidence: float = 0.95) -> IncrementalRegression:
+        '''Get the local linear regressions for the time series.
+
+        The regressions are stored with the time series, so that only the
+        windows at the end need to be re-fit when new values are added with
+        :meth:`append`.  They're the same as the ones calculated by
+        :func:`smooth` and :func:`estimate_slope` for a linear fit.
+
+        Parameters
+        ----------
+        window : int
+            size of the sliding window, in days
+        confidence : float, optional
+            the desired confidence interval, which defaults to 95%
+
+        Returns
+        -------
+        :class:`IncrementalRegression`
+            the regressions for the current time series
+        '''
+        key = (window, confidence)
+        if key not in self._regressions:
+            regression = IncrementalRegression(window, confidence)
+            regression.update(self._samples)
+            self._regressions[key] = regression
+        return self._regressions[key]
 
     def __getitem__(self, ind):
         return self._samples[ind]
 
-    @property
-    def dates(self) -> List[datetime.date]:
-        return [
-            self._start + datetime.timedelta(days=i)
-            for i in range(self._samples.shape[0])
-        ]
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if copy:
+            return np.array(self._samples, dtype=dtype)
+        return np.asarray(self._samples, dtype=dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        def unwrap(value):
+            if not isinstance(value, TimeSeries):
+                return value
+            if value._start != self._start or len(value) != len(self):
+                raise ValueError('Time series must cover the same dates.')
+            return value._samples
+
+        inputs = tuple(unwrap(value) for value in inputs)
+        out = kwargs.get('out')
+        if out is not None:
+            kwargs['out'] = tuple(unwrap(value) for value in out)
+
+        result = getattr(ufunc, method)(*inputs, **kwargs)
+        if out is not None:
+            return out[0] if len(out) == 1 else out
+
+        if isinstance(result, tuple):
+            return tuple(self._wrap(value) for value in result)
+        return self._wrap(result)
+
+    def _wrap(self, result: Any) -> Any:
+        '''Wrap a ufunc result into a time series with the same dates.'''
+        if not isinstance(result, np.ndarray) or \
+                result.shape != self._samples.shape:
+            return result
+
+        series = TimeSeries.__new__(TimeSeries)
+        series._set_samples(self._start, result, self.index)
+        series.label = self.label
+        return series
+
+    def between(self, start: Optional[datetime.date] = None,
+                end: Optional[datetime.date] = None) -> 'TimeSeries':
+        '''Select the part of the time series between two dates.
+
+        The returned time series is a view, i.e. it shares its samples and
+        dates with this time series rather than copying them.
+
+        Parameters
+        ----------
+        start : :class:`datetime.date`, optional
+            the first date to include; defaults to the start of the series
+        end : :class:`datetime.date`, optional
+            the last date to include; defaults to the end of the series
+
+        Returns
+        -------
+        :class:`TimeSeries`
+            the samples between ``start`` and ``end``, inclusive
+        '''
+        origin = np.datetime64(self._start, 'D')
+
+        first = 0
+        if start is not None:
+            first = int((np.datetime64(start, 'D') - origin).astype(np.int64))
+            first = min(max(first, 0), len(self))
+
+        last = len(self)
+        if end is not None:
+            last = int((np.datetime64(end, 'D') - origin).astype(np.int64)) + 1
+            last = min(max(last, first), len(self))
+
+        index = self.index[first:last]
+        series = TimeSeries.__new__(TimeSeries)
+        series._set_samples(self._start + datetime.timedelta(days=first),
+                            self._samples[first:last], index)
+        series.label = self.label
+        series._min_value = self._min_value
+        return series
 
     @property
     def daily_change(self) -> np.ndarray:
@@ -177,3 +468,280 @@ class TimeSeries:
                                               order))
 
         return least_squares
+
+
+class MultiTimeSeries(_DateIndex):
+    '''Represent several fields of time series data on the same dates.
+
+    This is equivalent to creating a :class:`TimeSeries` for each field,
+    except that the records are only filtered and summed once.  The samples
+    are stored as a single ``N x C`` array, with one column per field.
+
+    Attributes
+    ----------
+    columns : tuple of ``str``
+        the name of each column, i.e. the fields used to generate the series
+    index : np.ndarray
+        the (read-only) ``datetime64[D]`` date of each sample
+    dates : list of :class:`datetime.date` instances
+        list of dates the time series represents
+    '''
+    def __init__(self, data: Union[List[Datum], Frame],
+                 fields: Optional[Sequence[str]] = None, min_value: int = 0):
+        '''
+        Parameters
+        ----------
+        data : list of :class:`Cases` or :class:`CaseTesting`, or a frame
+            a list of either :class:`Cases` or :class:`CaseTesting` objects,
+            or the equivalent :class:`CaseFrame` or :class:`TestingFrame`
+        fields : list of ``str``, optional
+            the fields to use for the time series; defaults to all of the
+            counts in the records
+        min_value : int
+            don't include any records where the first field is below this
+            threshold
+        '''
+        if not isinstance(data, (CaseFrame, TestingFrame)):
+            if len(data) == 0:
+                raise ValueError('Cannot create an empty time series.')
+            data = to_frame(data)
+
+        if fields is None:
+            fields = data._COUNTS
+        if len(fields) == 0:
+            raise ValueError('Must provide at least one field.')
+
+        columns = [data[field] for field in fields]
+        self._set_samples(*_densify(data.date, np.column_stack(columns),
+                                    columns[0], min_value))
+        self.columns = tuple(fields)
+        self._lookup: Dict[str, int] = {
+            column: i for i, column in enumerate(self.columns)
+        }
+
+    def __getitem__(self, column: str) -> TimeSeries:
+        '''Get a single column as a time series.
+
+        The time series is a view, i.e. it shares its samples and dates with
+        this time series rather than copying them.
+        '''
+        if column not in self._lookup:
+            raise KeyError(f'"{column}" is not a column in the time series.')
+
+        series = TimeSeries.__new__(TimeSeries)
+        series._set_samples(self._start,
+                            self._samples[:, self._lookup[column]],
+                            self.index)
+        series.label = column
+        return series
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if copy:
+            return np.array(self._samples, dtype=dtype)
+        return np.asarray(self._samples, dtype=dtype)
+
+    def select(self, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+        '''Get the samples for a set of columns.
+
+        Parameters
+        ----------
+        columns : list of ``str``, optional
+            the columns to select, in order; defaults to all of the columns
+
+        Returns
+        -------
+        np.ndarray
+            an ``N x k`` array with the samples for the ``k`` columns
+        '''
+        if columns is None:
+            return self._samples
+
+        missing = [column for column in columns if column not in self._lookup]
+        if len(missing) > 0:
+            raise KeyError(f'{", ".join(missing)} are not columns in the time '
+                           'series.')
+
+        return self._samples[:, [self._lookup[column] for column in columns]]
+
+
+class TimeSeriesPanel(_DateIndex):
+    '''Represent the same field for many regions on a shared calendar.
+
+    The samples are stored as a single ``R x D`` array, with one row for each
+    of the ``R`` regions and one column for each of the ``D`` days on the
+    calendar.  Each region only covers part of the calendar, i.e. the days
+    between its first and last reported values, so the panel also keeps a
+    mask of the valid samples.  Any samples outside of a region's time series
+    are ``NaN``.
+
+    A region's row is the same as the :class:`TimeSeries` that would be
+    created from that region's data on its own.
+
+    Attributes
+    ----------
+    label : str
+        a label used to describe the time series; it will default to the
+        field used to generate the time series.
+    regions : tuple of ``str``
+        the name of each region, i.e. each row of the panel
+    index : np.ndarray
+        the (read-only) ``datetime64[D]`` date of each day on the calendar
+    dates : list of :class:`datetime.date` instances
+        list of dates on the calendar
+    valid : np.ndarray
+        a (read-only) ``R x D`` mask that is ``True`` for days that are part
+        of a region's time series
+    starts : np.ndarray
+        the calendar offset of the first valid day of each region
+    '''
+    def __init__(self, data: Mapping[str, Union[List[Datum], Frame]],
+                 field: str, min_value: int = 0):
+        '''
+        Parameters
+        ----------
+        data : dict
+            the records for each region, as either a list of :class:`Cases`
+            or :class:`CaseTesting` objects, or as a frame
+        field : str
+            the name of the field to use for the time series
+        min_value : int
+            don't include any data below this threshold
+        '''
+        frames = [
+            records if isinstance(records, (CaseFrame, TestingFrame))
+            else to_frame(records)
+            for records in data.values() if len(records) > 0
+        ]
+        if len(frames) == 0:
+            raise ValueError('Cannot create an empty time series.')
+
+        rows = np.repeat(np.arange(len(data)), [len(data[region])
+                                                for region in data])
+        self._assign(np.concatenate([frame.date for frame in frames]), rows,
+                     np.concatenate([frame[field] for frame in frames]),
+                     len(data), min_value)
+        self.regions = tuple(data)
+        self.label = field
+
+    @classmethod
+    def from_frame(cls, data: Union[List[Datum], Frame], field: str,
+                   by: str = 'country',
+                   min_value: int = 0) -> 'TimeSeriesPanel':
+        '''Create a panel by splitting a set of records by region.
+
+        Parameters
+        ----------
+        data : list of :class:`Cases` or :class:`CaseTesting`, or a frame
+            a list of either :class:`Cases` or :class:`CaseTesting` objects,
+            or the equivalent :class:`CaseFrame` or :class:`TestingFrame`
+        field : str
+            the name of the field to use for the time series
+        by : str, optional
+            the region field used to split the records; defaults to
+            ``'country'``
+        min_value : int
+            don't include any data below this threshold
+
+        Returns
+        -------
+        :class:`TimeSeriesPanel`
+            a panel with one row for each distinct value of ``by``
+        '''
+        if not isinstance(data, (CaseFrame, TestingFrame)):
+            if len(data) == 0:
+                raise ValueError('Cannot create an empty time series.')
+            data = to_frame(data)
+
+        codes, rows = np.unique(data.encoded(by), return_inverse=True)
+
+        panel = cls.__new__(cls)
+        panel._assign(data.date, rows, data[field], codes.shape[0], min_value)
+        panel.regions = tuple(REGIONS.to_names(codes))
+        panel.label = field
+        return panel
+
+    def _assign(self, dates: np.ndarray, rows: np.ndarray,
+                values: np.ndarray, num_regions: int, min_value: int):
+        '''Convert the (unordered) dates and values into the panel.'''
+        keep = values >= min_value
+        dates = dates[keep]
+        rows = rows[keep]
+        values = values[keep]
+        if dates.shape[0] == 0:
+            raise ValueError(f'No values are above {min_value}.')
+
+        # Sum the values onto a dense (region, day) grid.
+        start = dates.min()
+        days = (dates - start).astype(np.int64)
+        num_days = int(days.max()) + 1
+        cells = rows*num_days + days
+        size = num_regions*num_days
+
+        sums = np.bincount(cells, weights=values, minlength=size)
+        reported = np.bincount(cells, minlength=size) > 0
+        sums = sums.reshape((num_regions, num_days))
+        reported = reported.reshape((num_regions, num_days))
+
+        # Gaps are filled in the same way as a single time series, except that
+        # each region only covers the days between its first and last reports.
+        offsets = np.arange(num_days)
+        last_reported = np.where(reported, offsets, -1)
+        np.maximum.accumulate(last_reported, axis=1, out=last_reported)
+
+        first = np.where(reported.any(axis=1), reported.argmax(axis=1),
+                         num_days)
+        last = last_reported[:, -1]
+        valid = (offsets >= first[:, np.newaxis]) & \
+            (offsets <= last[:, np.newaxis])
+        valid.flags.writeable = False
+
+        samples = np.take_along_axis(sums, np.maximum(last_reported, 0),
+                                     axis=1)
+        samples[~valid] = np.nan
+
+        self._set_samples(start.item(), samples)
+        self._valid = valid
+        self._starts = first
+        self._min_value = min_value
+
+    def __len__(self):
+        # The number of days on the calendar, like a single time series.
+        return self._samples.shape[1]
+
+    def __getitem__(self, region: str) -> TimeSeries:
+        '''Get a single region as a time series.
+
+        The time series is a view, i.e. it shares its samples and dates with
+        the panel rather than copying them.
+        '''
+        if region not in self.regions:
+            raise KeyError(f'"{region}" is not a region in the panel.')
+
+        row = self.regions.index(region)
+        valid = np.flatnonzero(self._valid[row])
+        if valid.shape[0] == 0:
+            raise ValueError(f'"{region}" has no values in the panel.')
+
+        first = valid[0]
+        last = valid[-1] + 1
+
+        series = TimeSeries.__new__(TimeSeries)
+        series._set_samples(self._start + datetime.timedelta(days=int(first)),
+                            self._samples[row, first:last],
+                            self.index[first:last])
+        series.label = self.label
+        series._min_value = self._min_value
+        return series
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if copy:
+            return np.array(self._samples, dtype=dtype)
+        return np.asarray(self._samples, dtype=dtype)
+
+    @property
+    def valid(self) -> np.ndarray:
+        return self._valid
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self._starts
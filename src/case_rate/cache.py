@@ -0,0 +1,297 @@
+import datetime
+import hashlib
+import os
+import pathlib
+import tempfile
+import zipfile
+from typing import (IO, Dict, Generator, Iterable, List, Optional,
+                    Tuple)
+
+import numpy as np
+
+from ._types import Batch, PathLike, Regions
+
+__all__ = [
+    'ParsedCache'
+]
+
+
+CACHE_SIZE_LIMIT = 256  # 256 Mb
+_CACHE_VERSION = 2
+
+
+def _to_array(column: list) -> np.ndarray:
+    '''Convert a batch column into an array that can be stored in a .npz.'''
+    if len(column) > 0 and isinstance(column[0], datetime.date):
+        return np.array(column, dtype='datetime64[D]')
+    return np.array(column)
+
+
+class _Spool:
+    '''Holds the parsed columns on disk until they can be stored.
+
+    Each batch is written out as soon as it arrives, so reading a source
+    through the cache doesn't need to keep the whole source in memory.  The
+    cache entry is then assembled one column at a time.
+    '''
+    def __init__(self, path: pathlib.Path):
+        self._folder = tempfile.TemporaryDirectory(dir=path, prefix='.')
+        self._files: Dict[str, IO[bytes]] = {}
+        self._dtypes: Dict[str, np.dtype] = {}
+        self._chunks: Dict[str, int] = {}
+        self._lengths: Dict[str, int] = {}
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._folder.cleanup()
+
+    def append(self, batch: Batch) -> bool:
+        '''Add a batch to the spool.
+
+        Returns
+        -------
+        bool
+            ``False`` if the batch can't be stored in the cache
+        '''
+        for field, column in batch.items():
+            array = _to_array(column)
+
+            # Anything that NumPy can't represent natively (e.g. a column with
+            # missing values) would need to be pickled, so it's not cached.
+            if array.dtype.hasobject:
+                return False
+
+            if field not in self._files:
+                path = pathlib.Path(self._folder.name) / f'{len(self._files)}'
+                self._files[field] = path.open('w+b')
+                self._dtypes[field] = array.dtype
+                self._chunks[field] = 0
+                self._lengths[field] = 0
+
+            try:
+                # Text columns are only as wide as their longest value.
+                self._dtypes[field] = np.promote_types(self._dtypes[field],
+                                                       array.dtype)
+            except TypeError:
+                return False
+
+            np.save(self._files[field], array, allow_pickle=False)
+            self._chunks[field] += 1
+            self._lengths[field] += array.shape[0]
+
+        return True
+
+    def write(self, f: IO[bytes]):
+        '''Write the spooled columns out as a compressed ``.npz`` file.'''
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED,
+                             allowZip64=True) as archive:
+            for field, spooled in self._files.items():
+                dtype = self._dtypes[field]
+                header = {
+                    'descr': np.lib.format.dtype_to_descr(dtype),
+                    'fortran_order': False,
+                    'shape': (self._lengths[field],)
+                }
+
+                spooled.seek(0)
+                with archive.open(f'{field}.npy', 'w',
+                                  force_zip64=True) as out:
+                    np.lib.format.write_array_header_2_0(out, header)
+                    for _ in range(self._chunks[field]):
+                        chunk = np.load(spooled, allow_pickle=False)
+                        out.write(chunk.astype(dtype, copy=False).tobytes())
+
+
+class _Reader:
+    '''Reads the columns of a cache entry back in fixed-size chunks.
+
+    The columns are decompressed as they're read, so only one chunk of each
+    column is ever in memory, no matter how large the entry is.
+    '''
+    _HEADERS = {
+        (1, 0): np.lib.format.read_array_header_1_0,
+        (2, 0): np.lib.format.read_array_header_2_0
+    }
+
+    def __init__(self, path: pathlib.Path):
+        self._archive = zipfile.ZipFile(path)
+        self._files: List[IO[bytes]] = []
+        self._columns: Dict[str, Tuple[IO[bytes], np.dtype]] = {}
+        try:
+            lengths = set()
+            for name in self._archive.namelist():
+                f = self._archive.open(name)
+                self._files.append(f)
+
+                version = np.lib.format.read_magic(f)
+                if version not in _Reader._HEADERS:
+                    raise ValueError('Unsupported cache entry format.')
+
+                shape, fortran_order, dtype = _Reader._HEADERS[version](f)
+                if len(shape) != 1 or fortran_order or dtype.hasobject:
+                    raise ValueError('Unexpected column in cache entry.')
+
+                self._columns[name[:-len('.npy')]] = (f, dtype)
+                lengths.add(shape[0])
+
+            if len(lengths) > 1:
+                raise ValueError('Cache entry columns have different lengths.')
+            self.length = lengths.pop() if len(lengths) > 0 else 0
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        for f in self._files:
+            f.close()
+        self._archive.close()
+
+    def batches(self, batch_size: int) -> Generator[Batch, None, None]:
+        '''Split the cached columns back into batches.'''
+        if len(self._columns) == 0:
+            return
+
+        for start in range(0, self.length, batch_size):
+            count = min(batch_size, self.length - start)
+            yield {
+                field: np.frombuffer(f.read(count*dtype.itemsize),
+                                     dtype=dtype).tolist()
+                for field, (f, dtype) in self._columns.items()
+            }
+
+
+class ParsedCache:
+    '''An on-disk cache of parsed input source data.
+
+    Parsing a large CSV file is far more expensive than loading the equivalent
+    NumPy arrays.  The cache stores the parsed columns of each input source in
+    a compressed ``.npz`` file.  Entries are keyed on a fingerprint of the raw
+    data (see :meth:`InputSource.fingerprint`) along with any filters used when
+    parsing it, so a changed file is never read from the cache.
+
+    The total size of the cache is capped.  When it's exceeded, the least
+    recently used entries are removed.
+    '''
+    def __init__(self, path: PathLike, size_limit: float = CACHE_SIZE_LIMIT):
+        '''
+        Parameters
+        ----------
+        path : path-like object
+            folder where the cache entries are stored
+        size_limit : float, optional
+            maximum size of the cache, in Mb, by default
+            :data:`CACHE_SIZE_LIMIT`
+        '''
+        self._path = pathlib.Path(path)
+        self._size_limit = size_limit*2**20
+
+    def _entry(self, name: str, table: str, fingerprint: str,
+               regions: Regions, since: Optional[datetime.date]
+               ) -> pathlib.Path:
+        '''Path to a cache entry.'''
+        if regions is not None:
+            regions = sorted(regions, key=repr)
+
+        key = f'{_CACHE_VERSION}|{name}|{table}|{fingerprint}|{regions!r}|{since!r}'  # noqa: E501
+        digest = hashlib.sha1(key.encode()).hexdigest()[:20]
+        return self._path / f'{name}-{table}-{digest}.npz'
+
+    def read_through(self, name: str, table: str, fingerprint: str,
+                     batches: Iterable[Batch], batch_size: int,
+                     regions: Regions = None,
+                     since: Optional[datetime.date] = None
+                     ) -> Generator[Batch, None, None]:
+        '''Read batches from the cache, falling back to the original source.
+
+        If the entry isn't in the cache then ``batches`` is consumed, with
+        each batch being passed along as-is, and the result is stored once
+        the source has been fully read.  The batches are written to disk as
+        they're read, rather than being kept in memory.
+
+        Parameters
+        ----------
+        name : str
+            the input source's name
+        table : str
+            either ``'cases'`` or ``'testing'``
+        fingerprint : str
+            the fingerprint of the input source's raw data
+        batches : iterable of batches
+            the batches from the input source; only used if the entry isn't in
+            the cache
+        batch_size : int
+            maximum number of records in each batch
+        regions : collection of ``(country, province)`` tuples, optional
+            any region filter used when parsing the source
+        since : :class:`datetime.date`, optional
+            any date filter used when parsing the source
+
+        Yields
+        ------
+        dict
+            the columnar batches
+        '''
+        entry = self._entry(name, table, fingerprint, regions, since)
+        if entry.exists():
+            try:
+                reader: Optional[_Reader] = self._open(entry)
+            except (OSError, ValueError, zipfile.BadZipFile):
+                reader = None
+
+            if reader is not None:
+                try:
+                    yield from reader.batches(batch_size)
+                finally:
+                    reader.close()
+                return
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        spool: Optional[_Spool] = _Spool(self._path)
+        try:
+            for batch in batches:
+                if spool is not None and not spool.append(batch):
+                    spool.close()
+                    spool = None
+                yield batch
+
+            if spool is not None:
+                self._store(entry, spool)
+        finally:
+            if spool is not None:
+                spool.close()
+
+    def _open(self, entry: pathlib.Path) -> _Reader:
+        '''Open an entry, marking it as the most recently used.'''
+        os.utime(entry)
+        return _Reader(entry)
+
+    def _store(self, entry: pathlib.Path, spool: _Spool):
+        '''Store an entry and then evict any old entries.'''
+        fd, tmpname = tempfile.mkstemp(dir=self._path, prefix='.',
+                                       suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                spool.write(f)
+            os.replace(tmpname, entry)
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        '''Remove the least recently used entries until under the size cap.'''
+        # Any dot-prefixed files are still being written, possibly by another
+        # process, so they're left alone.
+        entries = [(entry.stat(), entry) for entry in self._path.glob('*.npz')
+                   if not entry.name.startswith('.')]
+        entries.sort(key=lambda item: item[0].st_mtime)
+
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if total <= self._size_limit:
+                break
+
+            entry.unlink()
+            total -= stat.st_size
@@ -10,9 +10,11 @@ import numpy as np
 # from case_rate.analysis.operations import growth_factor
 
 from ._helpers import _parse_region_selector
-from .. import analysis, sources
-from .._types import Cases, PathLike, SourceInfo
-from ..analysis import DailyCasesPredictor, TimeSeries
+from .. import analysis
+from .._types import PathLike, SourceInfo
+from ..analysis import DailyCasesPredictor, TimeSeries, TimeSeriesPanel
+from ..analysis.timeseries import Frame
+from ..ingest import ingest
 from ..storage import Storage
 
 
@@ -88,60 +90,55 @@ def _generate_prediction(series: TimeSeries, initial_value: float,
     predictor.train(series)
     predicted_cases, confidence, prediction_window = predictor.predict(initial_value, num_days)
     days_since_start = [datetime.timedelta(days=n) for n in prediction_window.tolist()]
+    start = series.dates[0]
 
     return {
-        'dates': [series.dates[0] + days for days in days_since_start],
+        'dates': [start + days for days in days_since_start],
         'cases': predicted_cases,
         'predictionInterval': confidence
     }
 
 
-def _calculate_growth_factor(series: TimeSeries, filter_window: int) -> List[Optional[float]]:
+def _growth_to_list(growth_factor: np.ndarray) -> List[Optional[float]]:
     def nan_to_none(gf: float) -> Optional[float]:
         if math.isnan(gf):
             return None
         else:
             return gf
 
-    growth_factor: List[float] = analysis.estimate_growth(series, filter_window).tolist()
-    prepped = list(map(nan_to_none, growth_factor))
-    return prepped
+    return list(map(nan_to_none, growth_factor.tolist()))
 
 
-def _output_analysis(output_folder: PathLike, country: str, data: List[Cases],
-                     no_indent: bool, min_confirmed: int, filter_window: int,
-                     predict: _PredictOptions):
+def _write_analysis(output_folder: PathLike, country: str, dates: List[datetime.date],
+                    raw: np.ndarray, daily_change: np.ndarray, smoothed: np.ndarray,
+                    slope: np.ndarray, growth_factor: List[Optional[float]],
+                    prediction: Dict, no_indent: bool):
     output_folder = pathlib.Path(output_folder)
     analysis_file = output_folder / pathlib.Path(f'{_process_country_name(country)}.json')
 
     click.echo(f'Writing to {analysis_file}...', nl=False)
 
-    series = TimeSeries(data, 'confirmed', min_confirmed)  # type: ignore
-    derivative = analysis.estimate_slope(series, filter_window)
-
-    initial_value = derivative[-(predict.delay+1)][0]
-
     output = {
         'country': country,
-        'date': series.dates,
+        'date': dates,
         'timeseries': [
             {
                 'name': 'cases',
-                'raw': series._samples,
-                'interpolated': analysis.smooth(series, filter_window, False)
+                'raw': raw,
+                'interpolated': smoothed
             },
             {
                 'name': 'dailyChange',
-                'raw': series.daily_change,
-                'interpolated': np.squeeze(derivative[:, 0]),
-                'confidenceInterval': np.squeeze(derivative[:, 1:])
+                'raw': daily_change,
+                'interpolated': np.squeeze(slope[:, 0]),
+                'confidenceInterval': np.squeeze(slope[:, 1:])
             },
             {
                 'name': 'growthFactor',
-                'interpolated': _calculate_growth_factor(series, filter_window)
+                'interpolated': growth_factor
             }
         ],
-        'prediction': _generate_prediction(series, initial_value, filter_window, predict)
+        'prediction': prediction
     }
 
     with analysis_file.open('wt') as f:
@@ -157,6 +154,30 @@ def _output_analysis(output_folder: PathLike, country: str, data: List[Cases],
     click.secho('\u2713', fg='green')
 
 
+def _output_analysis(output_folder: PathLike, panel: TimeSeriesPanel,
+                     no_indent: bool, filter_window: int,
+                     predict: _PredictOptions):
+    # The regressions for every region are run together and then split back
+    # out into each region's own time series.
+    smoothed = analysis.smooth(panel, filter_window, False)
+    slopes = analysis.estimate_slope(panel, filter_window)
+    growth = analysis.estimate_growth(panel, filter_window)
+
+    for row, country in enumerate(panel.regions):
+        series = panel[country]
+        span = slice(panel.locate(series.dates[0]),
+                     panel.locate(series.dates[-1]) + 1)
+
+        derivative = slopes[row, span]
+        initial_value = derivative[-(predict.delay+1)][0]
+
+        _write_analysis(output_folder, country, series.dates, np.asarray(series),
+                        series.daily_change, smoothed[row, span], derivative,
+                        _growth_to_list(growth[row, span]),
+                        _generate_prediction(series, initial_value, filter_window, predict),
+                        no_indent)
+
+
 @click.command('analyze')
 @click.option('-c', '--country', 'countries', nargs=1, multiple=True,
               help='Specify countries/regions to put into the analysis.')
@@ -195,44 +216,33 @@ def command(config: dict, countries: Tuple[str], output: str, no_indent: bool,
         click.echo()
         click.echo(',\n'.join(f'  {country}' for country in countries))
 
-    # Set up the input sources.
-    input_sources = {
-        country: sources.init_source(config['storage'], False, country,
-                                     config['sources'])
-        for country in countries
-    }
-
-    source_info = {
-        country: SourceInfo(description=source.details(), url=source.url())
-        for country, source in input_sources.items()
-    }
-
-    # Populate the database.
     with Storage() as storage:
+        # Initialize the input sources and populate the database.  Regions
+        # that share a source also share the same instance so that it's only
+        # initialized and ingested once.
+        input_sources = ingest(storage, config['storage'], False, countries,
+                               config['sources'])
+
+        # Read each region as a frame; the panel is built directly from the
+        # columns rather than from lists of records.  `None` maps to `World`
+        # in the dashboard.
+        data: Dict[str, Frame] = {}
+        source_info: Dict[str, SourceInfo] = {}
         for region in countries:
-            storage.populate(input_sources[region])
-
-        data = {}
-        for region in countries:
-            country, province = _parse_region_selector(region)
-            data[region] = storage.cases(input_sources[region],
-                                         country=country, province=province)
-
-    # Ensure `None` maps to `World` in the dashboard.
-    if None in data:
-        data['World'] = data[None]  # type: ignore
-        del data[None]  # type: ignore
+            country, province, county = _parse_region_selector(region)
+            source = input_sources[region]
 
-    if None in source_info:
-        source_info['World'] = source_info[None]  # type: ignore
-        del source_info[None]  # type: ignore
+            name = 'World' if region is None else region
+            data[name] = storage.frame(source, 'cases', country=country,
+                                       province=province, county=county)
+            source_info[name] = SourceInfo(description=source.details(),
+                                           url=source.url())
 
     # Write out the analysis configuration.
     _output_configuration(output, source_info, min_confirmed, filter_window, predict)
 
     # Process all of the requested countries/regions.
-    for country, timeseries in data.items():
-        _output_analysis(output, country, timeseries, no_indent, min_confirmed,
-                         filter_window, predict)
+    panel = TimeSeriesPanel(data, 'confirmed', min_confirmed)
+    _output_analysis(output, panel, no_indent, filter_window, predict)
 
     click.echo('Generated analysis...' + click.style('\u2713', fg='green'))
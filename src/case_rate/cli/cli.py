@@ -3,8 +3,9 @@ import pathlib
 import click
 import toml
 
-from . import analyze, info, sources
+from . import analyze, info, replay, sources
 from .. import VERSION
+from ..sources import register_sources
 
 
 @click.group()
@@ -29,6 +30,9 @@ def main(ctx: click.Context, config_path):
     ctx.obj['database'] = config['case-rate']['database']
     ctx.obj['sources'] = config['sources']
 
+    # Add any sources that are declared in the configuration.
+    register_sources(config['sources'])
+
     # Print the preamble (common to all commands).
     click.secho(f'COVID-19 Case Rates (v{VERSION})', bold=True)
     click.secho('--', bold=True)
@@ -36,6 +40,7 @@ def main(ctx: click.Context, config_path):
 
 main.add_command(analyze.command)
 main.add_command(info.command)
+main.add_command(replay.command)
 main.add_command(sources.command)
 
 
@@ -22,11 +22,12 @@ def command(config: dict, country: Optional[str], details: bool):
     input_source = sources.init_source(config['storage'], False, country,
                                        config['sources'])
 
-    country, province = _parse_region_selector(country)
+    country, province, county = _parse_region_selector(country)
 
     with Storage() as storage:
-        storage.populate(input_source)
-        cases = storage.cases(input_source, country=country, province=province)
+        storage.populate(input_source, regions=[(country, province)])
+        cases = storage.cases(input_source, country=country, province=province,
+                              county=county)
 
     cases = filters.sum_by_date(cases)
 
@@ -37,6 +38,8 @@ def command(config: dict, country: Optional[str], details: bool):
         click.echo(click.style('Country: ', bold=True) + country)
     if province is not None:
         click.echo(click.style('Province/State: ', bold=True) + province)
+    if county is not None:
+        click.echo(click.style('County: ', bold=True) + county)
 
     click.echo(f'First: {cases[0].date}')
     click.echo(f'  - Confirmed: {cases[0].confirmed}')
@@ -0,0 +1,171 @@
+import bisect
+import datetime
+import pathlib
+from typing import Dict, List, Optional, Tuple
+
+import click
+import numpy as np
+
+from ._helpers import _parse_region_selector
+from .analyze import (_growth_to_list, _output_configuration, _PredictOptions,
+                      _write_analysis)
+from .._types import Cases, SourceInfo
+from ..analysis import IncrementalRegression, TimeSeries
+from ..analysis.timeseries import _compute_growth
+from ..ingest import ingest
+from ..storage import InputSource, Storage
+
+
+class _Replay:
+    '''Replays the analysis for a single region, one day at a time.'''
+    def __init__(self, storage: Storage, source: InputSource,
+                 region: Optional[str], min_confirmed: int,
+                 filter_window: int):
+        self._storage = storage
+        self._source = source
+        self._region = _parse_region_selector(region)
+        self._min_confirmed = min_confirmed
+        self._regression = IncrementalRegression(filter_window)
+        self._start: Optional[datetime.date] = None
+
+        # Without any vintages, the current data is truncated to each day.
+        self._vintages = storage.vintages(source)
+        self._loaded: Optional[int] = None
+        self._cases: List[Cases] = []
+
+    def _available(self, day: datetime.date) -> List[Cases]:
+        '''The cases that would have been available on some day.'''
+        if len(self._vintages) == 0:
+            vintage = 0
+        else:
+            # Days before the first vintage can only use the first vintage.
+            dates = [date for _, date in self._vintages]
+            index = max(bisect.bisect_right(dates, day) - 1, 0)
+            vintage = self._vintages[index][0]
+
+        if vintage != self._loaded:
+            country, province, county = self._region
+            as_of = None
+            if len(self._vintages) > 0:
+                as_of = max(day, self._vintages[0][1])
+            self._cases = self._storage.cases(self._source, country=country,
+                                              province=province, county=county,
+                                              as_of=as_of)
+            self._loaded = vintage
+
+        return [case for case in self._cases if case.date <= day]
+
+    def run(self, day: datetime.date, output: pathlib.Path, no_indent: bool,
+            name: str) -> bool:
+        '''Write out the analysis as it would have looked on some day.
+
+        Returns
+        -------
+        bool
+            ``False`` if there wasn't enough data available on that day
+        '''
+        cases = [case for case in self._available(day)
+                 if case.confirmed >= self._min_confirmed]
+        if len(cases) == 0:
+            return False
+
+        series = TimeSeries(cases, 'confirmed', self._min_confirmed)  # type: ignore  # noqa: E501
+        if len(series) < 3:
+            return False
+
+        if series.dates[0] != self._start:
+            self._regression.reset()
+            self._start = series.dates[0]
+
+        self._regression.update(np.asarray(series))
+        slope = self._regression.slope
+
+        _write_analysis(output, name, series.dates, np.asarray(series),
+                        series.daily_change, self._regression.smoothed, slope,
+                        _growth_to_list(_compute_growth(slope[:, 0])),
+                        {'dates': [], 'cases': [], 'predictionInterval': []},
+                        no_indent)
+        return True
+
+
+@click.command('replay')
+@click.option('-c', '--country', 'countries', nargs=1, multiple=True,
+              help='Specify countries/regions to put into the analysis.')
+@click.option('--from', 'start', required=True,
+              type=click.DateTime(formats=['%Y-%m-%d']),
+              help='First day to replay.')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Last day to replay; defaults to today.')
+@click.option('-o', '--output', help='Location of the output files.',
+              default='_replay',
+              type=click.Path(dir_okay=True, file_okay=False))
+@click.option('--no-indent', is_flag=True, help='Do not indent any JSON output.')
+@click.option('--min-confirmed', nargs=1, type=int, default=100, show_default=True,
+              help='Remove entries lower that the minimum confirmed number.',
+              metavar='CASES')
+@click.option('--filter-window', nargs=1, type=int, default=14, show_default=True,
+              help='Window size when performing least-squares.', metavar='DAYS')
+@click.option('--record', is_flag=True,
+              help='Record the current data as a new vintage before replaying.')
+@click.pass_obj
+def command(config: dict, countries: Tuple[str], start: datetime.datetime,
+            end: Optional[datetime.datetime], output: str, no_indent: bool,
+            min_confirmed: int, filter_window: int, record: bool):
+    '''Regenerate the analysis as it would have looked on past days.
+
+    The analysis for each day, between '--from' and '--to', is stored in its
+    own 'YYYY-MM-DD' folder inside of the output folder.  Only the data that
+    was available on that day is used.  That's the most recent vintage
+    recorded in the database (see '--record') or, if the source has no
+    vintages, the current data truncated to that day.
+    '''
+    first_day = start.date()
+    last_day = datetime.date.today() if end is None else end.date()
+    if last_day < first_day:
+        raise click.BadParameter('"--to" must not be before "--from".')
+
+    click.secho('Replaying Report', bold=True)
+    click.secho('Regions: ', bold=True, nl=False)
+
+    if len(countries) == 0:
+        countries = [None]  # type: ignore
+        click.echo('World')
+    else:
+        click.echo()
+        click.echo(',\n'.join(f'  {country}' for country in countries))
+
+    with Storage(config['database']) as storage:
+        input_sources = ingest(storage, config['storage'], False, countries,
+                               config['sources'], vintage=record)
+
+        replays = {
+            region: _Replay(storage, input_sources[region], region,
+                            min_confirmed, filter_window)
+            for region in countries
+        }
+
+        source_info: Dict[str, SourceInfo] = {
+            'World' if region is None else region: SourceInfo(
+                description=source.details(), url=source.url())
+            for region, source in input_sources.items()
+        }
+
+        day = first_day
+        while day <= last_day:
+            click.secho(f'{day.isoformat()}:', bold=True)
+            folder = pathlib.Path(output) / day.isoformat()
+
+            available = {}
+            for region, replay in replays.items():
+                name = 'World' if region is None else region
+                folder.mkdir(parents=True, exist_ok=True)
+                if replay.run(day, folder, no_indent, name):
+                    available[name] = source_info[name]
+
+            if len(available) > 0:
+                _output_configuration(folder, available, min_confirmed,
+                                      filter_window, _PredictOptions())
+
+            day += datetime.timedelta(days=1)
+
+    click.echo('Replayed analysis...' + click.style('\u2713', fg='green'))
@@ -1,13 +1,63 @@
+import concurrent.futures
+import time
+from typing import NamedTuple, Optional, Type
+
 import click
 
 from .. import sources
+from ..sources._utilities import DOWNLOADER
 from ..storage import InputSource
 
 
+class _UpdateResult(NamedTuple):
+    name: str
+    elapsed: float
+    nbytes: Optional[int]
+    error: Optional[Exception] = None
+
+
+def _update_source(config: dict, SourceCls: Type[InputSource],
+                   region: Optional[str]) -> _UpdateResult:
+    '''Update a single input source, capturing any errors.'''
+    start_time = time.perf_counter()
+    start_bytes = DOWNLOADER.transferred
+    start_requests = DOWNLOADER.requested
+    error = None
+    try:
+        sources.init_source(config['storage'], True, region, config['sources'])
+    except Exception as e:
+        error = e
+
+    # Sources that don't go through the HTTP downloader, e.g. the 'git'
+    # based ones, don't have a byte count.
+    nbytes: Optional[int] = None
+    if DOWNLOADER.requested > start_requests:
+        nbytes = DOWNLOADER.transferred - start_bytes
+
+    return _UpdateResult(name=SourceCls.name(),
+                         elapsed=time.perf_counter() - start_time,
+                         nbytes=nbytes, error=error)
+
+
+def _format_bytes(nbytes: Optional[int]) -> str:
+    '''Format a byte count using the closest binary prefix.'''
+    if nbytes is None:
+        return 'n/a'
+
+    value = float(nbytes)
+    for unit in ('B', 'KiB', 'MiB'):
+        if value < 1024:
+            return f'{value:.1f} {unit}'
+        value /= 1024
+    return f'{value:.1f} GiB'
+
+
 @click.command('sources')
 @click.argument('action', type=click.Choice(['list', 'update']))
+@click.option('-j', '--jobs', nargs=1, type=int, default=4, show_default=True,
+              help='Number of sources to update concurrently.')
 @click.pass_obj
-def command(config: dict, action: str):
+def command(config: dict, action: str, jobs: int):
     '''Perform simple management operations on the input data sources.
 
     The two main actions are:
@@ -29,16 +79,36 @@ def command(config: dict, action: str):
 
     if action == 'list':
         click.secho('Available Sources:', bold=True)
-    elif action == 'update':
-        click.secho('Updating Sources: ', bold=True)
-
-    SourceCls: InputSource
-    for key, SourceCls in sources.DATA_SOURCES.items():  # type: ignore
-        if action == 'list':
+        SourceCls: InputSource
+        for SourceCls in sources.DATA_SOURCES.values():  # type: ignore
             click.echo(f'  Name: {SourceCls.name()}')
             click.echo(f'  Description: {SourceCls.details()}')
-        elif action == 'update':
-            click.echo(f'- Updating {SourceCls.name()}')
-            sources.init_source(config['storage'], True, regions[key],
-                                config['sources'])
-        click.echo('  --')
+            click.echo('  --')
+        return
+
+    click.secho('Updating Sources: ', bold=True)
+
+    # Sources spend most of their time waiting on the network or a 'git'
+    # subprocess so they can be updated concurrently.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(_update_source, config, SourceCls, regions[key])
+            for key, SourceCls in sources.DATA_SOURCES.items()
+        ]
+        results = [future.result() for future in futures]
+
+    click.secho('Summary:', bold=True)
+    for result in results:
+        if result.error is None:
+            status = click.style('\u2713', fg='green', bold=True)
+        else:
+            status = click.style('\u2717', fg='red', bold=True)
+
+        click.echo(f'  {status} {result.name:<30} {result.elapsed:8.1f} s '
+                   f'{_format_bytes(result.nbytes):>12}')
+        if result.error is not None:
+            click.echo(f'      {type(result.error).__name__}: {result.error}')
+
+    failed = sum(1 for result in results if result.error is not None)
+    if failed > 0:
+        raise click.ClickException(f'{failed} source(s) failed to update.')
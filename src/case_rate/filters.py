@@ -1,66 +1,328 @@
+import abc
 import datetime
-from typing import Callable, Dict, List
+from typing import Any, Callable, Collection, List, Optional, Tuple, Union
 
-from ._types import Datum
+import numpy as np
 
+from ._types import (Cases, CaseFrame, CaseTesting, Datum, TestingFrame,
+                     to_frame)
+from .regions import REGIONS
 
-def select(cases: List[Datum], fn: Callable[[Datum], bool]) -> List[Datum]:
+__all__ = [
+    'And',
+    'AtLeast',
+    'DateRange',
+    'Equals',
+    'IsIn',
+    'Not',
+    'Or',
+    'Predicate',
+    'select',
+    'select_by_country',
+    'sum_by_date'
+]
+
+Frame = Union[CaseFrame, TestingFrame]
+Clause = Tuple[str, Tuple[Any, ...]]
+
+# All of the fields that a predicate can refer to.
+_FIELDS = set(Cases._fields) | set(CaseTesting._fields)
+
+
+def _check_field(field: str):
+    if field not in _FIELDS:
+        raise ValueError(f'Unknown field "{field}".')
+
+
+class Predicate(abc.ABC):
+    '''A condition used to select records.
+
+    Unlike a plain function, a predicate can be evaluated in three ways: on a
+    single record, as a mask over all of the records in a
+    :class:`CaseFrame`/:class:`TestingFrame`, or as an SQL ``WHERE`` condition
+    so that the records are selected by the :class:`Storage` instead.
+    Predicates can be combined with ``&``, ``|`` and ``~``.
+    '''
+    @abc.abstractmethod
+    def __call__(self, record: Datum) -> bool:
+        '''Check if a single record matches the predicate.'''
+
+    @abc.abstractmethod
+    def mask(self, frame: Frame) -> np.ndarray:
+        '''Check which records in a frame match the predicate.
+
+        Parameters
+        ----------
+        frame : :class:`CaseFrame` or :class:`TestingFrame`
+            the records being checked
+
+        Returns
+        -------
+        np.ndarray
+            a boolean mask that is ``True`` for the matching records
+        '''
+
+    def where(self) -> Optional[Clause]:
+        '''Compile the predicate into an SQL condition.
+
+        Returns
+        -------
+        ``(condition, parameters)`` or ``None``
+            the condition and the values for any of its placeholders, or
+            ``None`` if the predicate can't be expressed in SQL
+        '''
+        return None
+
+    def __and__(self, other: 'Predicate') -> 'Predicate':
+        return And(self, other)
+
+    def __or__(self, other: 'Predicate') -> 'Predicate':
+        return Or(self, other)
+
+    def __invert__(self) -> 'Predicate':
+        return Not(self)
+
+
+class Equals(Predicate):
+    '''Select the records where a field has some value.'''
+    def __init__(self, field: str, value: Any):
+        _check_field(field)
+        self.field = field
+        self.value = value
+
+    def __call__(self, record: Datum) -> bool:
+        return getattr(record, self.field) == self.value
+
+    def mask(self, frame: Frame) -> np.ndarray:
+        if self.field in frame._TEXT:
+            # Compare the region IDs rather than the region names.
+            region = REGIONS.lookup(self.value)
+            if region is None:
+                return np.zeros(len(frame), dtype=bool)
+            return frame.encoded(self.field) == region
+        return frame[self.field] == self.value
+
+    def where(self) -> Optional[Clause]:
+        if self.field == 'date':
+            return None
+        return f'{self.field} == ?', (self.value,)
+
+
+class IsIn(Predicate):
+    '''Select the records where a field has one of a set of values.'''
+    def __init__(self, field: str, values: Collection[Any]):
+        _check_field(field)
+        self.field = field
+        self.values = list(values)
+
+    def __call__(self, record: Datum) -> bool:
+        return getattr(record, self.field) in self.values
+
+    def mask(self, frame: Frame) -> np.ndarray:
+        if self.field in frame._TEXT:
+            regions = [REGIONS.lookup(value) for value in self.values]
+            return np.isin(frame.encoded(self.field),
+                           [region for region in regions if region is not None])
+        return np.isin(frame[self.field], self.values)
+
+    def where(self) -> Optional[Clause]:
+        if self.field == 'date':
+            return None
+        if len(self.values) == 0:
+            return '0', ()
+        placeholders = ', '.join('?' for _ in self.values)
+        return f'{self.field} IN ({placeholders})', tuple(self.values)
+
+
+class AtLeast(Predicate):
+    '''Select the records where a count is at or above some threshold.'''
+    def __init__(self, field: str, value: int):
+        _check_field(field)
+        self.field = field
+        self.value = value
+
+    def __call__(self, record: Datum) -> bool:
+        return getattr(record, self.field) >= self.value
+
+    def mask(self, frame: Frame) -> np.ndarray:
+        return frame[self.field] >= self.value
+
+    def where(self) -> Optional[Clause]:
+        # Dates are stored as unpadded strings (see DateRange).
+        if self.field == 'date':
+            return None
+        return f'{self.field} >= ?', (self.value,)
+
+
+class DateRange(Predicate):
+    '''Select the records between two dates, inclusive.
+
+    Either end of the range may be omitted.
+    '''
+    def __init__(self, start: Optional[datetime.date] = None,
+                 end: Optional[datetime.date] = None):
+        self.start = start
+        self.end = end
+
+    def __call__(self, record: Datum) -> bool:
+        if self.start is not None and record.date < self.start:
+            return False
+        if self.end is not None and record.date > self.end:
+            return False
+        return True
+
+    def mask(self, frame: Frame) -> np.ndarray:
+        mask = np.ones(len(frame), dtype=bool)
+        if self.start is not None:
+            mask &= frame.date >= np.datetime64(self.start, 'D')
+        if self.end is not None:
+            mask &= frame.date <= np.datetime64(self.end, 'D')
+        return mask
+
+    # The database stores dates as unpadded 'YYYY-M-D' strings, which don't
+    # sort chronologically, so date ranges are never compiled into SQL.
+
+
+class And(Predicate):
+    '''Select the records that match all of a set of predicates.'''
+    def __init__(self, *predicates: Predicate):
+        self.predicates = predicates
+
+    def __call__(self, record: Datum) -> bool:
+        return all(predicate(record) for predicate in self.predicates)
+
+    def mask(self, frame: Frame) -> np.ndarray:
+        mask = np.ones(len(frame), dtype=bool)
+        for predicate in self.predicates:
+            mask &= predicate.mask(frame)
+        return mask
+
+    def where(self) -> Optional[Clause]:
+        return _join(self.predicates, 'AND')
+
+
+class Or(Predicate):
+    '''Select the records that match any of a set of predicates.'''
+    def __init__(self, *predicates: Predicate):
+        self.predicates = predicates
+
+    def __call__(self, record: Datum) -> bool:
+        return any(predicate(record) for predicate in self.predicates)
+
+    def mask(self, frame: Frame) -> np.ndarray:
+        mask = np.zeros(len(frame), dtype=bool)
+        for predicate in self.predicates:
+            mask |= predicate.mask(frame)
+        return mask
+
+    def where(self) -> Optional[Clause]:
+        return _join(self.predicates, 'OR')
+
+
+class Not(Predicate):
+    '''Select the records that don't match a predicate.'''
+    def __init__(self, predicate: Predicate):
+        self.predicate = predicate
+
+    def __call__(self, record: Datum) -> bool:
+        return not self.predicate(record)
+
+    def mask(self, frame: Frame) -> np.ndarray:
+        return ~self.predicate.mask(frame)
+
+    def where(self) -> Optional[Clause]:
+        clause = self.predicate.where()
+        if clause is None:
+            return None
+        return f'NOT ({clause[0]})', clause[1]
+
+
+def _join(predicates: Collection[Predicate], operator: str
+          ) -> Optional[Clause]:
+    '''Join the SQL conditions, if they can all be compiled.'''
+    conditions = []
+    params: Tuple[Any, ...] = ()
+    for predicate in predicates:
+        clause = predicate.where()
+        if clause is None:
+            return None
+        conditions.append(f'({clause[0]})')
+        params += clause[1]
+
+    if len(conditions) == 0:
+        return None
+
+    return f' {operator} '.join(conditions), params
+
+
+def select(cases: Union[List[Datum], Frame],
+           fn: Union[Predicate, Callable[[Datum], bool]]
+           ) -> Union[List[Datum], Frame]:
     '''Filters the list of cases based on some criteria.
 
+    A :class:`Predicate` is evaluated over all of the records at once when
+    the cases are stored in a :class:`CaseFrame` or :class:`TestingFrame`.
+    Any other function is called once per record.
+
     Parameters
     ----------
-    cases : list of either :class:`Cases` or :class:`CaseTesting`
+    cases : list of either :class:`Cases` or :class:`CaseTesting`, or a frame
         list of cases to filter
-    fn : callable ``(Cases) -> bool`` or ``(CaseTesting) -> bool``
-        a functor that can be used to filter the selected cases
+    fn : :class:`Predicate` or callable ``(Cases) -> bool``
+        a predicate or functor that can be used to filter the selected cases
 
     Returns
     -------
-    list of :class:`Cases` or :class:`CaseTesting`
+    list of :class:`Cases` or :class:`CaseTesting`, or a frame
         filtered list, with the items sorted by date
     '''
+    if isinstance(cases, (CaseFrame, TestingFrame)):
+        return cases.select(fn)
+
     filtered = filter(fn, cases)
     return sorted(filtered, key=lambda item: item.date)
 
 
-def select_by_country(cases: List[Datum], country: str) -> List[Datum]:
+def select_by_country(cases: Union[List[Datum], Frame],
+                      country: str) -> Union[List[Datum], Frame]:
     '''Filter the list of cases by country.
 
     Parameters
     ----------
-    cases : list of :class:`Cases`
+    cases : list of :class:`Cases`, or a frame
         list of cases to filter
     country : str
         country to select
 
     Returns
     -------
-    list of :class:`Cases`
+    list of :class:`Cases`, or a frame
         list filtered by country
     '''
-    return select(cases, lambda case: case.country == country)
+    return select(cases, Equals('country', country))
 
 
-def sum_by_date(cases: List[Datum]) -> List[Datum]:
+def sum_by_date(cases: Union[List[Datum], Frame]
+                ) -> Union[List[Datum], Frame]:
     '''Sum cases or testing status by date.
 
     Parameters
     ----------
-    cases : list of either :class:`Cases` or :class:`CaseTesting`
+    cases : list of either :class:`Cases` or :class:`CaseTesting`, or a frame
         list of cases to sum
 
     Returns
     -------
-    list of :class:`Cases`
+    list of :class:`Cases`, or a frame
         list of cases, but where each element is summed by date; if there are
         multiple countries/provinces then that information is lost
     '''
-    summed: Dict[datetime.date, Datum] = {}
-    for case in cases:
-        if case.date in summed:
-            summed[case.date] += case  # type: ignore
-        else:
-            summed[case.date] = case
-
-    dates: List[datetime.date] = sorted(summed.keys())
-    return list(summed[date] for date in dates)
+    if isinstance(cases, (CaseFrame, TestingFrame)):
+        return cases.sum_by_date()
+
+    if len(cases) == 0:
+        return []
+
+    # The frame does the summation with array operations rather than adding
+    # the named tuples together one at a time.
+    return to_frame(cases).sum_by_date().to_records()
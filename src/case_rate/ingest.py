@@ -0,0 +1,218 @@
+import asyncio
+import concurrent.futures
+import datetime
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from . import sources as _sources
+from ._types import PathLike, Region
+from .sources import _create_source, _source_key, _source_options
+from .storage import BATCH_SIZE, InputSource, Storage
+
+__all__ = [
+    'ingest'
+]
+
+
+QUEUE_SIZE = 16
+
+
+class _Job(NamedTuple):
+    SourceCls: Type[InputSource]
+    options: dict
+    regions: List[Region]
+
+
+def _plan(selectors: Iterable[Optional[str]], params: dict,
+          sources: dict) -> Tuple[Dict[Optional[str], Tuple], Dict[Tuple, _Job]]:  # noqa: E501
+    '''Map the region selectors onto a set of unique input sources.
+
+    Returns
+    -------
+    keys : dict
+        maps each selector onto its source's key
+    jobs : dict
+        the unique input sources, along with the regions requested from them
+
+    Raises
+    ------
+    ValueError
+        if two different input sources have the same name
+    '''
+    keys: Dict[Optional[str], Tuple] = {}
+    jobs: Dict[Tuple, _Job] = {}
+    names: Dict[str, Tuple] = {}
+    for selector in selectors:
+        SourceCls = _sources.select_source(selector, sources)
+        options = _source_options(SourceCls, params)
+        key = _source_key(SourceCls, options)
+
+        # The storage backend identifies sources by name, so a second source
+        # with the same name would never have its data stored.
+        name = SourceCls.name()
+        if names.setdefault(name, key) != key:
+            raise ValueError(f'More than one input source is named "{name}".')
+
+        if key not in jobs:
+            jobs[key] = _Job(SourceCls, options, [])
+
+        country, province, _ = _sources.parse_region(selector)
+        jobs[key].regions.append((country, province))
+        keys[selector] = key
+
+    return keys, jobs
+
+
+def _parse(source: InputSource, regions: List[Region],
+           since: Optional[datetime.date], queue: asyncio.Queue,
+           loop: asyncio.AbstractEventLoop, stop: threading.Event,
+           batch_size: int):
+    '''Parse an input source into batches and send them to the writer.
+
+    This runs on a worker thread.  Putting a batch onto the (bounded) queue
+    blocks the thread until the writer has room for it.
+    '''
+    for table in ('cases', 'testing'):
+        for batch in source.batches(table, batch_size, regions, since):
+            if stop.is_set():
+                return
+
+            item = (source, table, batch)
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+
+async def _ingest(storage: Storage, path: PathLike, update: bool,
+                  selectors: Iterable[Optional[str]], params: dict,
+                  sources: dict, since: Optional[datetime.date],
+                  batch_size: int, queue_size: int, vintage: bool,
+                  as_of: Optional[datetime.date]
+                  ) -> Dict[Optional[str], InputSource]:
+    keys, jobs = _plan(selectors, params, sources)
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    initialized: Dict[Tuple, InputSource] = {}
+
+    async def produce(executor: concurrent.futures.Executor, key: Tuple,
+                      job: _Job):
+        # Downloads and 'git' updates happen inside of the constructor.
+        source = await loop.run_in_executor(
+            executor, _create_source, job.SourceCls, path, update, job.options)
+        initialized[key] = source
+
+        if vintage:
+            storage.begin_vintage(source)
+        elif not storage.register(source):
+            return
+
+        await loop.run_in_executor(executor, _parse, source, job.regions,
+                                   since, queue, loop, stop, batch_size)
+
+        # The vintage is recorded by the writer, once it has written all of
+        # the source's batches.
+        if vintage:
+            await queue.put((source, None, None))
+
+    async def write():
+        # Everything is written from the event loop's thread since that's the
+        # thread that owns the SQLite connection.  The queue is always drained,
+        # even after an error, so that no parser is left blocked on it.
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            if stop.is_set():
+                continue
+
+            try:
+                source, table, batch = item
+                if table is None:
+                    storage.record_vintage(source, as_of)
+                else:
+                    storage.insert_batch(source, table, batch)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+    max_workers = 2*max(len(jobs), 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        writer = asyncio.ensure_future(write())
+        producers = [
+            asyncio.ensure_future(produce(executor, key, job))
+            for key, job in jobs.items()
+        ]
+
+        results = await asyncio.gather(*producers, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                errors.append(result)
+                stop.set()
+
+        await queue.put(None)
+        await writer
+
+    if len(errors) > 0:
+        raise errors[0]
+
+    return {selector: initialized[key] for selector, key in keys.items()}
+
+
+def ingest(storage: Storage, path: PathLike, update: bool,
+           selectors: Iterable[Optional[str]], params: dict = {},
+           sources: dict = _sources.DATA_SOURCES,
+           since: Optional[datetime.date] = None,
+           batch_size: int = BATCH_SIZE, queue_size: int = QUEUE_SIZE,
+           vintage: bool = False, as_of: Optional[datetime.date] = None
+           ) -> Dict[Optional[str], InputSource]:
+    '''Initialize the input sources for a set of regions and populate storage.
+
+    This is equivalent to calling :func:`sources.init_source` for each unique
+    input source followed by :meth:`Storage.populate`, except that the work
+    overlaps.  Regions that resolve to the same source, with the same options,
+    share a single instance.
+    Every input source is initialized (downloading or updating its data) and
+    parsed on a worker thread while a single writer, running on the calling
+    thread, drains the parsed batches into the storage backend.  The queue
+    between them is bounded so that a fast parser can't run too far ahead of
+    the writer.
+
+    Parameters
+    ----------
+    storage : :class:`Storage`
+        an initialized storage backend
+    path : path-like object
+        working directory used to store the input sources' data
+    update : bool
+        if ``True`` then the data sources should also try to update themselves
+    selectors : iterable of ``str`` or ``None``
+        the region strings, of the form ``country:province``
+    params : dict, optional
+        dictionary with any extra parameters that are needed by the input
+        sources, by default {}
+    sources : dict, optional
+        a dictionary containing the sources to query; a default set is provided
+        but can be modified if necessary
+    since : :class:`datetime.date`, optional
+        only ingest data reported on or after this date
+    batch_size : int, optional
+        number of records sent to the writer at a time
+    queue_size : int, optional
+        maximum number of batches waiting to be written
+    vintage : bool, optional
+        if ``True`` then any existing data for the input sources is replaced
+        and each ingest is recorded as a new vintage (see
+        :meth:`Storage.record_vintage`), by default ``False``
+    as_of : :class:`datetime.date`, optional
+        the date of the recorded vintages, by default today
+
+    Returns
+    -------
+    dict
+        a mapping between each region string and its input source
+    '''
+    return asyncio.run(_ingest(storage, path, update, selectors, params,
+                               sources, since, batch_size, queue_size,
+                               vintage, as_of))
@@ -0,0 +1,144 @@
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+__all__ = [
+    'REGIONS',
+    'RegionRegistry'
+]
+
+
+class RegionRegistry:
+    '''Interns region names as small integer IDs.
+
+    The same handful of country, province and county names are repeated on
+    every record.  The registry stores each name once and hands out an integer
+    ID for it, so that in-memory records only need to store the IDs.  Checking
+    if two records are for the same region is then an integer comparison.
+
+    IDs are only ever added, never removed or reused, so an ID is valid for
+    the lifetime of the registry.
+    '''
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._array: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    @property
+    def names(self) -> np.ndarray:
+        '''np.ndarray: All of the region names, indexed by their IDs.'''
+        names = self._array
+        if names is None or names.shape[0] != len(self._names):
+            names = np.array(self._names, dtype=str)
+            self._array = names
+        return names
+
+    def intern(self, name: str) -> int:
+        '''Get the ID for a region name, adding it if necessary.
+
+        Parameters
+        ----------
+        name : str
+            the region name
+
+        Returns
+        -------
+        int
+            the region's ID
+        '''
+        try:
+            return self._ids[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._ids:
+                # Store the name first so that an ID is never visible before
+                # its name is.
+                self._names.append(name)
+                self._ids[name] = len(self._names) - 1
+            return self._ids[name]
+
+    def lookup(self, name: str) -> Optional[int]:
+        '''Get the ID for a region name without adding it.
+
+        Parameters
+        ----------
+        name : str
+            the region name
+
+        Returns
+        -------
+        int or ``None``
+            the region's ID or ``None`` if the name hasn't been registered
+        '''
+        return self._ids.get(name)
+
+    def encode(self, names: Sequence[str]) -> np.ndarray:
+        '''Convert a sequence of region names into their IDs.
+
+        Parameters
+        ----------
+        names : sequence of ``str``
+            the region names; any new names are added to the registry
+
+        Returns
+        -------
+        np.ndarray
+            the ID of each name
+        '''
+        if isinstance(names, np.ndarray):
+            names = names.tolist()
+
+        # Only the new names (normally none) need to go through the lock.
+        for name in dict.fromkeys(names):
+            if name not in self._ids:
+                self.intern(name)
+
+        return np.fromiter(map(self._ids.__getitem__, names), np.int32,
+                           count=len(names))
+
+    def decode(self, ids: np.ndarray) -> np.ndarray:
+        '''Convert an array of IDs back into the region names.
+
+        Parameters
+        ----------
+        ids : np.ndarray
+            the region IDs
+
+        Returns
+        -------
+        np.ndarray
+            the region names
+        '''
+        return self.names[ids]
+
+    def to_names(self, ids: np.ndarray) -> List[str]:
+        '''Convert an array of IDs into a list of region names.
+
+        Unlike :meth:`decode`, the names are the registry's own strings, so
+        equal names share a single copy.
+
+        Parameters
+        ----------
+        ids : np.ndarray
+            the region IDs
+
+        Returns
+        -------
+        list of ``str``
+            the region names
+        '''
+        return list(map(self._names.__getitem__, ids.tolist()))
+
+
+# The registry shared by all of the in-memory records.
+REGIONS = RegionRegistry()
@@ -1,28 +1,90 @@
 import pathlib
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Type
 
+from .declarative import declare_source
 from .jhu_csse import JHUCSSESource
 from .public_health_agency_canada import PublicHealthAgencyCanadaSource
 from .public_health_ontario import PublicHealthOntarioSource
 
+from ..cache import ParsedCache
 from ..storage import InputSource
 
 __all__ = [
     'DATA_SOURCES',
     'init_source',
+    'parse_region',
+    'register_sources',
     'select_source'
 ]
 
 
-DATA_SOURCES = {
+DATA_SOURCES: Dict[Tuple[Optional[str], Optional[str]], Type[InputSource]] = {
     (None, None): JHUCSSESource,                       # Default source
     ('Canada', None): PublicHealthAgencyCanadaSource,  # Canada-specific
     ('Canada', 'Ontario'): PublicHealthOntarioSource   # Ontario-specific
 }
 
 
+def parse_region(region: Optional[str]
+                 ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    '''Parses a ``country:province:county`` region string.
+
+    Parameters
+    ----------
+    region : str, optional
+        a region string of the form ``country``, ``country:province`` or
+        ``country:province:county``
+
+    Returns
+    -------
+    ``(country, province, county)``
+        the parsed region; any part is ``None`` if it wasn't specified
+    '''
+    if region is None:
+        return (None, None, None)
+
+    parts: List[Optional[str]] = list(region.split(':'))
+    if len(parts) > 3:
+        raise ValueError(
+            'Expected "<country>:<province/state>:<county>" selector.')
+
+    parts += [None] * (3 - len(parts))
+    return (parts[0], parts[1], parts[2])
+
+
+def register_sources(params: dict, sources=DATA_SOURCES):
+    '''Register any input sources declared in the configuration.
+
+    Any ``[sources.<name>]`` table with ``type = "csv"`` declares a generic CSV
+    input source (see :class:`declarative.DeclarativeSource`).  It's registered
+    for the region given by its ``region`` key, e.g. ``"Canada:Quebec"``.
+
+    Parameters
+    ----------
+    params : dict
+        the contents of the configuration's ``[sources]`` table
+    sources : dict, optional
+        the dictionary the sources are registered into; by default this is
+        :data:`DATA_SOURCES`
+
+    Raises
+    ------
+    ValueError
+        if a declaration is invalid
+    '''
+    for name, declaration in params.items():
+        if declaration.get('type') != 'csv':
+            continue
+
+        if 'region' not in declaration:
+            raise ValueError(f'Source "{name}" is missing its "region".')
+
+        country, province, _ = parse_region(declaration['region'])
+        sources[(country, province)] = declare_source(name, declaration)
+
+
 def select_source(region: Optional[str] = None,
-                  sources=DATA_SOURCES) -> InputSource:
+                  sources=DATA_SOURCES) -> Type[InputSource]:
     '''Select a data source to use for COVID-19 data.
 
     The source selector uses a simple string format to obtain the input data
@@ -32,6 +94,9 @@ def select_source(region: Optional[str] = None,
       state
     * ``country:province`` to select a data source for a particular province
       (or state, region, voivodeship, etc.)
+    * ``country:province:county`` to select a data source for a particular
+      county (or other sub-provincial region); data sources are registered at
+      the province level so this uses the source for ``country:province``
 
     The resolution order is to check an see if the specific
     ``country:province`` exists.  If not, it will then check for a nation-level
@@ -46,7 +111,7 @@ def select_source(region: Optional[str] = None,
     Parameters
     ----------
     region : str, optional
-        a region string of the form ``country:province``
+        a region string of the form ``country:province:county``
     source : dict, optional
         a dictionary containing the sources to query; a default set is provided
         but can be modified if necessary
@@ -61,14 +126,8 @@ def select_source(region: Optional[str] = None,
     if region is None:
         return sources[default]
 
-    parts = region.split(':')
-    if len(parts) == 1:
-        key = (parts[0], None)
-    elif len(parts) == 2:
-        key = (parts[0], parts[1])  # type: ignore
-    else:
-        raise NotImplementedError(
-            'Subprovince (e.g. county-level) selection not implemented.')
+    country, province, _ = parse_region(region)
+    key = (country, province)
 
     # Specific key matched.
     if key in sources:
@@ -83,6 +142,31 @@ def select_source(region: Optional[str] = None,
     return sources[default]
 
 
+def _source_options(SourceCls: Type[InputSource], params: dict) -> dict:
+    '''Get the extra input arguments for an input source.'''
+    try:
+        return params[SourceCls.name()]
+    except KeyError:
+        return {}
+
+
+def _source_key(SourceCls: Type[InputSource], options: dict) -> Tuple:
+    '''Key used to identify identical input source instances.'''
+    return (SourceCls, tuple(sorted((k, repr(v)) for k, v in options.items())))
+
+
+def _create_source(SourceCls: Type[InputSource], path, update,
+                   options: dict) -> InputSource:
+    '''Create the working directory and construct the input source.'''
+    working_path: pathlib.Path = pathlib.Path(path) / SourceCls.name()
+    if not working_path.exists():
+        working_path.mkdir(parents=True, exist_ok=False)
+
+    source = SourceCls(path=working_path, update=update, **options)  # type: ignore
+    source.cache = ParsedCache(pathlib.Path(path) / '.cache')
+    return source
+
+
 def init_source(path, update, region: Optional[str] = None, params: dict = {},
                 sources=DATA_SOURCES) -> InputSource:
     '''Initialize a new :class:`InputSource` object.
@@ -118,14 +202,5 @@ def init_source(path, update, region: Optional[str] = None, params: dict = {},
         the initialized input source
     '''
     SourceCls = select_source(region, sources)
-
-    working_path: pathlib.Path = pathlib.Path(path) / SourceCls.name()
-    if not working_path.exists():
-        working_path.mkdir(parents=True, exist_ok=False)
-
-    try:
-        options = params[SourceCls.name()]
-    except KeyError:
-        options = {}
-
-    return SourceCls(path=working_path, update=update, **options)  # type: ignore
+    options = _source_options(SourceCls, params)
+    return _create_source(SourceCls, path, update, options)
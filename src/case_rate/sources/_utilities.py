@@ -1,14 +1,306 @@
+import gzip
+import hashlib
+import json
+import lzma
+import os
 import pathlib
+import tempfile
+import threading
+from typing import IO, Dict, Optional, TextIO, Tuple, Union
 
 import click
 import requests
+import requests.adapters
+from urllib3.util.retry import Retry
 
 
 FILE_SIZE_LIMIT = 10  # 10 Mb
+CHUNK_SIZE = 64*2**10  # 64 Kb
 
+# Supported compression formats and their file extensions.
+COMPRESSION = {
+    'gzip': '.gz',
+    'lzma': '.xz'
+}
 
-def download_file(url: str, filename: pathlib.Path):
-    '''Retrieve the contents at the specified URL and save it to disk.
+
+def compressed_path(filename: pathlib.Path,
+                    compression: Optional[str]) -> pathlib.Path:
+    '''Path to a file when it's stored with the given compression.
+
+    Parameters
+    ----------
+    filename : path
+        path to the uncompressed file
+    compression : str or ``None``
+        one of the formats in :data:`COMPRESSION`, or ``None`` for no
+        compression
+
+    Returns
+    -------
+    path
+        the path with the compression format's extension appended to it
+
+    Raises
+    ------
+    ValueError
+        if the compression format isn't supported
+    '''
+    filename = pathlib.Path(filename)
+    if compression is None:
+        return filename
+
+    if compression not in COMPRESSION:
+        raise ValueError(f'Unsupported compression format "{compression}".')
+
+    return filename.with_name(filename.name + COMPRESSION[compression])
+
+
+def _compressor(f: IO[bytes], filename: pathlib.Path
+                ) -> Union[IO[bytes], gzip.GzipFile, lzma.LZMAFile]:
+    '''Wrap a binary file so its contents are compressed based on the name.'''
+    suffix = pathlib.Path(filename).suffix
+    if suffix == COMPRESSION['gzip']:
+        return gzip.GzipFile(fileobj=f, mode='wb')
+    if suffix == COMPRESSION['lzma']:
+        return lzma.LZMAFile(f, mode='wb')
+    return f
+
+
+def open_text(filename: pathlib.Path) -> TextIO:
+    '''Open a downloaded file for reading as text.
+
+    Compressed files, as determined by their extension, are decompressed as
+    they're read so the file is never fully decompressed in memory or on disk.
+
+    Parameters
+    ----------
+    filename : path
+        path to the file
+
+    Returns
+    -------
+    file object
+        the opened file
+    '''
+    suffix = pathlib.Path(filename).suffix
+    if suffix == COMPRESSION['gzip']:
+        return gzip.open(filename, 'rt')
+    if suffix == COMPRESSION['lzma']:
+        return lzma.open(filename, 'rt')
+    return open(filename, 'rt')
+
+
+def _metadata_path(filename: pathlib.Path) -> pathlib.Path:
+    '''Path to the file storing the HTTP caching headers for a download.'''
+    return filename.with_name(filename.name + '.meta.json')
+
+
+def _load_metadata(filename: pathlib.Path) -> Dict[str, str]:
+    '''Load the stored caching headers for a previously downloaded file.
+
+    Parameters
+    ----------
+    filename : path
+        path to the downloaded file
+
+    Returns
+    -------
+    dict
+        the stored ``ETag`` and ``Last-Modified`` values; empty if the file, or
+        its metadata, doesn't exist
+    '''
+    metadata = _metadata_path(filename)
+    if not filename.exists() or not metadata.exists():
+        return {}
+
+    try:
+        with metadata.open('rt') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def file_fingerprint(filename: pathlib.Path) -> str:
+    '''Generate a fingerprint for the contents of a file.
+
+    The fingerprint combines the file's size, its modification time and a hash
+    of its contents.
+
+    Parameters
+    ----------
+    filename : path
+        path to the file
+
+    Returns
+    -------
+    str
+        the file's fingerprint
+    '''
+    stat = os.stat(filename)
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha1.update(chunk)
+
+    return f'{stat.st_size}-{stat.st_mtime_ns}-{sha1.hexdigest()}'
+
+
+def _conditional_headers(metadata: Dict[str, str]) -> Dict[str, str]:
+    '''Generate the request headers for a conditional GET.'''
+    headers = {}
+    if 'etag' in metadata:
+        headers['If-None-Match'] = metadata['etag']
+    if 'last-modified' in metadata:
+        headers['If-Modified-Since'] = metadata['last-modified']
+    return headers
+
+
+class Downloader:
+    '''Retrieve files over HTTP(S) using a shared connection pool.
+
+    The downloader owns a :class:`requests.Session` so that connections to the
+    same host are kept alive and reused between downloads.  Every request has
+    a connect/read timeout and is retried, with an exponential backoff, if the
+    connection is reset or the server responds with a 5xx error.
+    '''
+    def __init__(self, timeout: Tuple[float, float] = (10, 60),
+                 retries: int = 5, backoff: float = 0.5,
+                 pool_size: int = 4):
+        '''
+        Parameters
+        ----------
+        timeout : ``(connect, read)``, optional
+            the connect and read timeouts, in seconds, by default ``(10, 60)``
+        retries : int, optional
+            maximum number of times a request is retried, by default 5
+        backoff : float, optional
+            the backoff factor, in seconds, between retries; the n-th retry
+            waits ``backoff * 2**(n-1)`` seconds, by default 0.5
+        pool_size : int, optional
+            maximum number of connections kept alive per host, by default 4
+        '''
+        retry = Retry(total=retries, connect=retries, read=retries,
+                      status=retries, backoff_factor=backoff,
+                      status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=('GET', 'HEAD'),
+                      raise_on_status=False)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size,
+                                                max_retries=retry)
+
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._local = threading.local()
+
+    @property
+    def transferred(self) -> int:
+        '''int: Total number of bytes downloaded by the calling thread.'''
+        return getattr(self._local, 'nbytes', 0)
+
+    @property
+    def requested(self) -> int:
+        '''int: Total number of downloads requested by the calling thread.'''
+        return getattr(self._local, 'requests', 0)
+
+    def close(self):
+        '''Close all pooled connections.'''
+        self._session.close()
+
+    def download(self, url: str, filename: pathlib.Path) -> int:
+        '''Retrieve the contents at the specified URL and save it to disk.
+
+        The response is streamed to a temporary file in the same folder as
+        ``filename`` and then moved into place, so an interrupted download
+        never replaces an existing file.  If ``filename`` ends in one of the
+        extensions in :data:`COMPRESSION` then the file is compressed as it's
+        written.  If the server previously provided an
+        ``ETag`` or ``Last-Modified`` header then the request is made
+        conditional; an unchanged file only costs a single "304 Not Modified"
+        response.
+
+        Parameters
+        ----------
+        url : str
+            URL to retrieve
+        filename : path
+            path to where the file will be stored
+
+        Returns
+        -------
+        int
+            number of bytes downloaded; this is zero if the file was not
+            modified since the last download
+
+        Raises
+        ------
+        ValueError
+            if the server response exceeds :data:`FILE_SIZE_LIMIT`
+        '''
+        filename = pathlib.Path(filename)
+        size_limit = FILE_SIZE_LIMIT*2**20
+        headers = _conditional_headers(_load_metadata(filename))
+
+        click.echo(f'Downloading {url}')
+        self._local.requests = self.requested + 1
+        with self._session.get(url, headers=headers, stream=True,
+                               timeout=self.timeout) as response:
+            if response.status_code == requests.codes.not_modified:
+                click.echo(click.style('\u2713', fg='green', bold=True) +
+                           f'...`{filename}` is up to date')
+                return 0
+
+            response.raise_for_status()
+
+            content_length = int(response.headers.get('Content-Length', 0))
+            if content_length > size_limit:
+                raise ValueError(
+                    f'Server response was larger than {FILE_SIZE_LIMIT} Mb '
+                    f'{content_length}; something is off with the source.')
+
+            fd, tmpname = tempfile.mkstemp(dir=filename.parent,
+                                           prefix=f'.{filename.name}.')
+            nbytes = 0
+            try:
+                with os.fdopen(fd, 'wb') as f, \
+                        _compressor(f, filename) as out:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        nbytes += len(chunk)
+                        if nbytes > size_limit:
+                            raise ValueError(
+                                f'Server response was larger than '
+                                f'{FILE_SIZE_LIMIT} Mb; something is off with '
+                                'the source.')
+                        out.write(chunk)
+                self._local.nbytes = self.transferred + nbytes
+                os.replace(tmpname, filename)
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+
+            metadata = {
+                key.lower(): response.headers[key]
+                for key in ('ETag', 'Last-Modified')
+                if key in response.headers
+            }
+
+        with _metadata_path(filename).open('wt') as meta:
+            json.dump(metadata, meta)
+
+        click.echo(click.style('\u2713', fg='green', bold=True) +
+                   f'...saved to `{filename}`')
+        return nbytes
+
+
+DOWNLOADER = Downloader()
+
+
+def download_file(url: str, filename: pathlib.Path) -> int:
+    '''Download a file using the shared :data:`DOWNLOADER`.
+
+    See :meth:`Downloader.download` for details.
 
     Parameters
     ----------
@@ -16,17 +308,10 @@ def download_file(url: str, filename: pathlib.Path):
         URL to retrieve
     filename : path
         path to where the file will be stored
+
+    Returns
+    -------
+    int
+        number of bytes downloaded
     '''
-    click.echo(f'Downloading {url}')
-    response = requests.get(url)
-    nbytes = len(response.content)
-    if nbytes > FILE_SIZE_LIMIT*2**20:
-        raise ValueError(
-            f'Server response was larger than {FILE_SIZE_LIMIT} Mb {nbytes}; '
-            'something is off with the source.')
-
-    with filename.open('w') as f:
-        f.write(response.text)
-
-    click.echo(click.style('\u2713', fg='green', bold=True) +
-               f'...saved to `{filename}`')
+    return DOWNLOADER.download(url, filename)
@@ -0,0 +1,366 @@
+import csv
+import datetime
+import hashlib
+import json
+import pathlib
+import re
+from typing import Any, Collection, Dict, Generator, List, Optional, Type
+
+import click
+import numpy as np
+
+from case_rate._types import (Batch, Cases, CaseTesting, Datum, PathLike,
+                              Regions)
+from case_rate.sources._utilities import (compressed_path, download_file,
+                                          file_fingerprint, open_text)
+from case_rate.storage import BATCH_SIZE, InputSource, region_matches
+
+__all__ = [
+    'DeclarativeSource',
+    'declare_source'
+]
+
+
+# Fields that are text, rather than a count.
+_TEXT_FIELDS = ('province', 'country', 'county')
+
+# Values used for any fields not provided by the source.
+_DEFAULTS: Dict[str, Any] = {
+    'province': '',
+    'county': '',
+    'deceased': 0,
+    'resolved': -1,
+    'tested': -1,
+    'under_investigation': -1
+}
+
+# Fields that must always come from the CSV file.
+_REQUIRED = {
+    'cases': ('date', 'confirmed'),
+    'testing': ('date', 'tested')
+}
+
+_TABLE_TYPES: Dict[str, Type[Datum]] = {
+    'cases': Cases,
+    'testing': CaseTesting
+}
+
+
+class _Extractor:
+    '''Converts the raw CSV columns into the columns of a data table.
+
+    The extractor is built once, from the source's declaration, and then
+    converts entire columns at a time rather than individual rows.
+    '''
+    def __init__(self, table: str, columns: Dict[str, str],
+                 constants: Dict[str, str], date_format: str,
+                 null_values: Collection[str], rollup: Optional[str]):
+        fields = _TABLE_TYPES[table]._fields
+
+        unknown = set(columns) - (set(fields) - {'rollup'})
+        if len(unknown) > 0:
+            raise ValueError(
+                f'Unknown {table} field(s): {", ".join(sorted(unknown))}.')
+
+        for field in _REQUIRED[table]:
+            if field not in columns:
+                raise ValueError(f'Missing the "{field}" column for {table}.')
+
+        if 'country' not in columns and 'country' not in constants:
+            raise ValueError('Missing the "country" column or constant.')
+
+        self.table = table
+        self.columns = {field: columns[field] for field in fields
+                        if field in columns}
+        self.constants = {field: constants[field] for field in _TEXT_FIELDS
+                          if field in constants and field not in columns}
+        self.date_format = date_format
+        self.null_values = list(null_values)
+        self.rollup = rollup
+
+    def _dates(self, values: List[str]) -> np.ndarray:
+        '''Parse the date column, only converting each unique date once.'''
+        unique, inverse = np.unique(np.array(values, dtype=str),
+                                    return_inverse=True)
+        parsed = np.array(
+            [datetime.datetime.strptime(value, self.date_format).date()
+             for value in unique],
+            dtype='datetime64[D]')
+        return parsed[inverse]
+
+    def _counts(self, values: List[str]) -> np.ndarray:
+        '''Parse a count column, treating any null values as zero.'''
+        array = np.array(values, dtype=str)
+        array[np.isin(array, self.null_values)] = '0'
+        return array.astype(float).astype(np.int64)
+
+    def _text(self, field: str, raw: Dict[str, List[str]],
+              numel: int) -> np.ndarray:
+        if field in self.columns:
+            return np.array(raw[self.columns[field]], dtype=str)
+        value = self.constants.get(field, _DEFAULTS.get(field, ''))
+        return np.repeat(np.array(value, dtype=str), numel)
+
+    def extract(self, raw: Dict[str, List[str]], regions: Regions,
+                since: Optional[datetime.date]) -> Dict[str, np.ndarray]:
+        '''Extract the table's columns from the raw CSV columns.
+
+        Parameters
+        ----------
+        raw : dict
+            the raw CSV columns, keyed on the column names
+        regions : collection of ``(country, province)`` tuples, optional
+            only keep rows for these regions
+        since : :class:`datetime.date`, optional
+            only keep rows reported on or after this date
+
+        Returns
+        -------
+        dict
+            the extracted columns, keyed on the table's fields
+        '''
+        dates = self._dates(raw[self.columns['date']])
+        numel = dates.shape[0]
+
+        output: Dict[str, np.ndarray] = {'date': dates}
+        for field in _TEXT_FIELDS:
+            output[field] = self._text(field, raw, numel)
+
+        if self.table == 'cases':
+            rollup = np.zeros(numel, dtype=bool)
+            if self.rollup is not None:
+                rollup = output['province'] == self.rollup
+                output['province'][rollup] = ''
+            output['rollup'] = rollup
+
+        for field in _TABLE_TYPES[self.table]._fields:
+            if field in output:
+                continue
+            if field in self.columns:
+                output[field] = self._counts(raw[self.columns[field]])
+            else:
+                output[field] = np.repeat(_DEFAULTS[field], numel)
+
+        keep = np.ones(numel, dtype=bool)
+        if since is not None:
+            keep &= dates >= np.datetime64(since)
+
+        if regions is not None:
+            # Only check each unique region once.  The separator can't be a
+            # '\0' since NumPy strips trailing nulls from strings.
+            keys = np.char.add(np.char.add(output['country'], '\x1f'),
+                               output['province'])
+            unique, inverse = np.unique(keys, return_inverse=True)
+            matches = np.array(
+                [region_matches(regions, *key.split('\x1f'))
+                 for key in unique.tolist()],
+                dtype=bool)
+            keep &= matches[inverse]
+
+        return {field: output[field][keep]
+                for field in _TABLE_TYPES[self.table]._fields}
+
+
+def _read_columns(path: pathlib.Path,
+                  names: Collection[str]) -> Dict[str, List[str]]:
+    '''Read the named columns from a CSV file.'''
+    with open_text(path) as f:
+        reader = csv.reader(f)
+        header = next(reader)
+
+        missing = set(names) - set(header)
+        if len(missing) > 0:
+            raise RuntimeError(
+                f'"{path}" is missing the column(s): '
+                f'{", ".join(sorted(missing))}.')
+
+        indices = [header.index(name) for name in names]
+        columns: List[List[str]] = [[] for _ in indices]
+        for row in reader:
+            for column, index in zip(columns, indices):
+                column.append(row[index])
+
+    return dict(zip(names, columns))
+
+
+class DeclarativeSource(InputSource):
+    '''A generic CSV input source that's described by its configuration.
+
+    A new feed can be added by declaring it in the configuration file, rather
+    than writing a new :class:`InputSource`.  For example:
+
+    .. code-block:: toml
+
+        [sources.quebec]
+        type = "csv"
+        region = "Canada:Quebec"
+        details = "Quebec COVID-19 Report"
+        url = "https://example.com/quebec.csv"
+        info = "https://example.com/"
+        date_format = "%Y-%m-%d"
+        null_values = ["", "N/A"]
+
+        [sources.quebec.constants]
+        country = "Canada"
+        province = "Quebec"
+
+        [sources.quebec.columns]
+        date = "Date"
+        confirmed = "Total Cases"
+        deceased = "Deaths"
+
+        [sources.quebec.testing]
+        date = "Date"
+        tested = "Total Tests"
+
+    The ``columns`` (and optional ``testing``) tables map the fields of
+    :class:`Cases` (or :class:`CaseTesting`) onto CSV columns.  A text field
+    can instead be set to the same value for every row with ``constants``.
+    Any count that isn't provided is reported as unavailable.  If the CSV file
+    contains national totals then ``rollup`` can be set to the province name
+    used for them, e.g. ``rollup = "Canada"``.
+
+    Use :func:`declare_source` to create the input source class from the
+    declaration.
+    '''
+    _name: str = ''
+    _details: str = ''
+    _extractors: Dict[str, _Extractor] = {}
+    _digest: str = ''
+
+    def __init__(self, path: PathLike, url: Optional[str] = None,
+                 info: Optional[str] = None,
+                 update: bool = True, compression: Optional[str] = None,
+                 **declaration):
+        '''
+        Parameters
+        ----------
+        path : path-like object
+            the path (on disk) where the CSV file is located
+        url : str
+            the URL to the CSV file
+        info : str, optional
+            the URL to the main information page; defaults to ``url``
+        update : bool, optional
+            if ``True`` then updates an existing CSV file to the latest version
+        compression : str, optional
+            store the CSV file compressed, using either ``'gzip'`` or
+            ``'lzma'``; by default it's stored as plain text
+        declaration
+            the rest of the source's declaration; this is already compiled into
+            the class by :func:`declare_source`
+        '''
+        if url is None:
+            raise ValueError('Missing data source URL.')
+
+        path = compressed_path(pathlib.Path(path) / 'data.csv', compression)
+        if path.exists():
+            if update:
+                click.echo(f'Updating {self.details()}.')
+                download_file(url, path)
+        else:
+            click.echo(f'Accessing {self.details()}.')
+            download_file(url, path)
+
+        self._info = url if info is None else info
+        self._path = path
+
+    @classmethod
+    def name(cls) -> str:
+        return cls._name
+
+    @classmethod
+    def details(cls) -> str:
+        return cls._details
+
+    def url(self) -> str:
+        return self._info
+
+    def fingerprint(self) -> Optional[str]:
+        # A changed declaration needs to invalidate the cache too.
+        return f'{file_fingerprint(self._path)}-{self._digest}'
+
+    def cases(self, regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Cases, None, None]:
+        for batch in self.parse('cases', BATCH_SIZE, regions, since):
+            for values in zip(*(batch[field] for field in Cases._fields)):
+                yield Cases(*values)
+
+    def testing(self, regions: Regions = None,
+                since: Optional[datetime.date] = None
+                ) -> Generator[CaseTesting, None, None]:
+        for batch in self.parse('testing', BATCH_SIZE, regions, since):
+            for values in zip(*(batch[field] for field in CaseTesting._fields)):  # noqa: E501
+                yield CaseTesting(*values)
+
+    def parse(self, table: str, batch_size: int = BATCH_SIZE,
+              regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Batch, None, None]:
+        if table not in _TABLE_TYPES:
+            raise ValueError(f'Unknown data table "{table}".')
+
+        if table not in self._extractors:
+            return
+
+        extractor = self._extractors[table]
+        raw = _read_columns(self._path, sorted(set(extractor.columns.values())))
+        columns = extractor.extract(raw, regions, since)
+
+        numel = columns['date'].shape[0]
+        for start in range(0, numel, batch_size):
+            yield {field: column[start:start+batch_size].tolist()
+                   for field, column in columns.items()}
+
+
+def declare_source(name: str, declaration: dict) -> Type[DeclarativeSource]:
+    '''Create an input source class from its declaration.
+
+    Parameters
+    ----------
+    name : str
+        the input source's name; this is the ``<name>`` in
+        ``[sources.<name>]``
+    declaration : dict
+        the contents of the ``[sources.<name>]`` table (see
+        :class:`DeclarativeSource`)
+
+    Returns
+    -------
+    class
+        a :class:`DeclarativeSource` subclass
+
+    Raises
+    ------
+    ValueError
+        if the declaration is incomplete or invalid
+    '''
+    if 'columns' not in declaration:
+        raise ValueError(f'Source "{name}" is missing its "columns" table.')
+
+    constants = declaration.get('constants', {})
+    common = {
+        'date_format': declaration.get('date_format', '%Y-%m-%d'),
+        'null_values': declaration.get('null_values', ['', 'N/A']),
+        'rollup': declaration.get('rollup')
+    }
+
+    extractors = {
+        'cases': _Extractor('cases', declaration['columns'], constants,
+                            **common)
+    }
+    if 'testing' in declaration:
+        extractors['testing'] = _Extractor('testing', declaration['testing'],
+                                           constants, **common)
+
+    encoded = json.dumps(declaration, sort_keys=True, default=str)
+    class_name = ''.join(part.capitalize()
+                         for part in re.split(r'[^0-9a-zA-Z]+', name))
+
+    return type(f'{class_name}Source', (DeclarativeSource,), {
+        '_name': name,
+        '_details': declaration.get('details', name),
+        '_extractors': extractors,
+        '_digest': hashlib.sha1(encoded.encode()).hexdigest()[:12]
+    })
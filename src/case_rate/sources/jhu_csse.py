@@ -1,14 +1,18 @@
+import contextlib
 import csv
 import datetime
+import itertools
 import pathlib
 import subprocess
-from typing import Generator, List, Optional, Tuple
+from typing import Dict, Generator, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse, urlunsplit
 
 import click
+import numpy as np
 
-from case_rate._types import PathLike
-from case_rate.storage import InputSource, Cases
+from case_rate._types import Batch, PathLike, Regions
+from case_rate.storage import (BATCH_SIZE, InputSource, Cases,
+                               _to_batches, region_matches)
 
 
 def _git(*args, cwd: pathlib.Path = None) -> Tuple[str, str]:
@@ -97,20 +101,22 @@ def _validate_header(header: List[str]):
                 f'Found {found} field in header; expected {expected}.')
 
 
-def _parse_csv(path: pathlib.Path) -> Tuple[List[str], List[List[str]]]:
-    '''Parses the CSV file at the specified location.
+@contextlib.contextmanager
+def _open_csv(path: pathlib.Path
+              ) -> Iterator[Tuple[List[str], Iterator[List[str]]]]:
+    '''Opens the CSV file at the specified location for streaming.
 
     Parameters
     ----------
     path : path object
         path to a CSV file
 
-    Returns
-    -------
+    Yields
+    ------
     header : list of ``str``
         the CSV file's header
-    contents : list of lists
-        a list of string lists with the CSV's data
+    contents : iterator of lists
+        an iterator over the CSV's rows, as lists of strings
     '''
     with path.open() as f:
         contents = csv.reader(f)
@@ -119,10 +125,124 @@ def _parse_csv(path: pathlib.Path) -> Tuple[List[str], List[List[str]]]:
         header = next(contents)
         _validate_header(header)
 
-        # Get the CSV contents.
-        rows = [row for row in contents]
+        yield header, contents
+
+
+def _validate_us_header(header: List[str]) -> int:
+    '''Validate the header within the US time series CSV file.
+
+    Parameters
+    ----------
+    header : List[str]
+        list of header fields
+
+    Returns
+    -------
+    int
+        index of the first date column
+
+    Raises
+    ------
+    RuntimeError
+        if the header is invalid, with the reason being stored within the
+        exception string
+    '''
+    expected_names = [
+        'UID',
+        'iso2',
+        'iso3',
+        'code3',
+        'FIPS',
+        'Admin2',
+        'Province_State',
+        'Country_Region',
+        'Lat',
+        'Long_',
+        'Combined_Key'
+    ]
+    for expected, found in zip(expected_names, header):
+        if expected != found:
+            raise RuntimeError(
+                f'Found {found} field in header; expected {expected}.')
+
+    # Only the 'deaths' time series has a population column.
+    first_date = len(expected_names)
+    if header[first_date] == 'Population':
+        first_date += 1
 
-    return header, rows
+    return first_date
+
+
+@contextlib.contextmanager
+def _open_us_csv(path: pathlib.Path
+                 ) -> Iterator[Tuple[List[str], int, Iterator[List[str]]]]:
+    '''Opens the US county-level CSV file for streaming.
+
+    Yields
+    ------
+    dates : list of ``str``
+        the date columns in the CSV file's header
+    first_date : int
+        the index of the first date column in each row
+    contents : iterator of lists
+        an iterator over the CSV's rows, as lists of strings
+    '''
+    with path.open() as f:
+        contents = csv.reader(f)
+        header = next(contents)
+        first_date = _validate_us_header(header)
+        yield header[first_date:], first_date, contents
+
+
+def _to_dates(columns: List[str]) -> np.ndarray:
+    '''Convert the "M/D/YY" header dates into a ``datetime64`` array.'''
+    dates = []
+    for column in columns:
+        month, day, year = tuple(int(dd) for dd in column.split('/'))
+        dates.append(datetime.date(year+2000, month, day))
+    return np.array(dates, dtype='datetime64[D]')
+
+
+def _expand_rows(dates: np.ndarray, country: str, provinces: List[str],
+                 counties: List[str], confirmed: np.ndarray,
+                 deceased: np.ndarray,
+                 batch_size: int) -> Generator[Batch, None, None]:
+    '''Convert wide, per-region time series into columnar case batches.
+
+    Parameters
+    ----------
+    dates : np.ndarray
+        the ``D`` dates in the time series
+    country : str
+        country name
+    provinces, counties : list of ``str``
+        the ``K`` region names for each time series
+    confirmed, deceased : np.ndarray
+        :math:`K \\times D` arrays containing the time series
+    batch_size : int
+        maximum number of records in each batch
+
+    Yields
+    ------
+    dict
+        columnar batches with the same fields as :class:`Cases`
+    '''
+    num_regions, num_dates = confirmed.shape
+    numel = num_regions*num_dates
+    columns = {
+        'date': np.tile(dates, num_regions),
+        'province': np.repeat(provinces, num_dates),
+        'country': np.repeat(country, numel),
+        'confirmed': confirmed.ravel(),
+        'deceased': deceased.ravel(),
+        'resolved': np.repeat(-1, numel),
+        'county': np.repeat(counties, num_dates),
+        'rollup': np.zeros(numel, dtype=bool)
+    }
+
+    for start in range(0, numel, batch_size):
+        yield {field: columns[field][start:start+batch_size].tolist()
+               for field in Cases._fields}
 
 
 class JHUCSSESource(InputSource):
@@ -132,6 +252,11 @@ class JHUCSSESource(InputSource):
     up on GitHub (https://github.com/CSSEGISandData/COVID-19).  This input
     source pulls the latest version of the repo and provides an interface to
     the time series data.
+
+    The global time series only reports national totals for the US.  When the
+    US is explicitly requested, the county-level US time series is used
+    instead.  The counties are stored along with the state-level totals, which
+    are summed up while the file is being parsed.
     '''
     DEFAULT_REPO = 'https://github.com/CSSEGISandData/COVID-19'
 
@@ -172,7 +297,13 @@ class JHUCSSESource(InputSource):
             click.echo(stderr)
 
         self._path = path
-        self._url = _get_github_link(path)
+        try:
+            self._url = _get_github_link(path)
+        except ValueError:
+            # Mirrors that aren't on GitHub just link to the repo itself.
+            remote, _ = _git('config', '--get', 'remote.origin.url', cwd=path)
+            self._url = remote.decode().strip()
+        self._commit = _git('rev-parse', '--verify', 'HEAD', cwd=path)[0].decode().strip()  # noqa: E501
 
     @classmethod
     def name(cls) -> str:
@@ -185,41 +316,182 @@ class JHUCSSESource(InputSource):
     def url(self) -> str:
         return self._url
 
-    def cases(self) -> Generator[Cases, None, None]:
+    def _time_series(self, name: str) -> pathlib.Path:
+        '''Path to one of the time series CSV files.'''
         csse_covid_19_time_series = self._path / 'csse_covid_19_data' / 'csse_covid_19_time_series'  # noqa: E501
+        return csse_covid_19_time_series / f'time_series_covid19_{name}.csv'
 
-        # Get paths to the various CSV files.
-        csv_confirmed = csse_covid_19_time_series / 'time_series_covid19_confirmed_global.csv'  # noqa: E501
-        csv_deceased = csse_covid_19_time_series / 'time_series_covid19_deaths_global.csv'  # noqa: E501
-
-        # Parse the files.
-        header, rows_confirmed = _parse_csv(csv_confirmed)
-        header_deceased, rows_deceased = _parse_csv(csv_deceased)
-
-        # Check the data consistency.
-        numel_confirmed = sum(len(row) for row in rows_confirmed)
-        numel_deceased = sum(len(row) for row in rows_deceased)
+    def _use_us_series(self, regions: Regions) -> bool:
+        '''Check if the county-level US time series should be used.
 
-        if header != header_deceased:
-            raise RuntimeError('Confirmed and deceased headers don\'t match.')
-
-        same_size = numel_confirmed == numel_deceased
-        if not same_size:
-            raise RuntimeError(
-                f'CSV content sizes are different '
-                f'(confirmed: {numel_confirmed}, deceased: {numel_deceased}).'
-            )
-
-        # Extract the data.
-        for column in range(4, len(header)):
-            month, day, year = tuple(int(dd) for dd in header[column].split('/'))  # noqa: E501
-            date = datetime.date(year+2000, month, day)
-            for confirmed, deceased in zip(rows_confirmed, rows_deceased):
-                yield Cases(
-                    date=date,
-                    province=confirmed[0],
-                    country=confirmed[1],
-                    confirmed=confirmed[column],
-                    resolved=-1,
-                    deceased=deceased[column]
-                )
+        It's only used when a US state (or county) is requested.  The national
+        US totals always come from the global time series.
+        '''
+        if regions is None:
+            return False
+
+        if not any(country == 'US' and province is not None
+                   for country, province in regions):
+            return False
+
+        return self._time_series('confirmed_US').exists() and \
+            self._time_series('deaths_US').exists()
+
+    def cases(self, regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Cases, None, None]:
+        use_us_series = self._use_us_series(regions)
+        yield from self._global_cases(regions, since, use_us_series)
+
+        if use_us_series:
+            for batch in self._us_batches(regions, since, BATCH_SIZE):
+                columns = (batch[field] for field in Cases._fields)
+                for values in zip(*columns):
+                    yield Cases(*values)
+
+    def fingerprint(self) -> Optional[str]:
+        return self._commit
+
+    def parse(self, table: str, batch_size: int = BATCH_SIZE,
+              regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Batch, None, None]:
+        if table != 'cases' or not self._use_us_series(regions):
+            yield from super().parse(table, batch_size, regions, since)
+            return
+
+        records = self._global_cases(regions, since, True)
+        yield from _to_batches(records, Cases._fields, batch_size)
+        yield from self._us_batches(regions, since, batch_size)
+
+    def _us_batches(self, regions: Regions, since: Optional[datetime.date],
+                    batch_size: int) -> Generator[Batch, None, None]:
+        '''Parse the county-level US time series.
+
+        Each row is converted to an array as soon as it's read.  The
+        state-level totals are accumulated as the file is streamed and are
+        reported once the file has been fully read.
+        '''
+        csv_confirmed = self._time_series('confirmed_US')
+        csv_deceased = self._time_series('deaths_US')
+
+        with _open_us_csv(csv_confirmed) as (header, first_confirmed, rows_confirmed), \
+                _open_us_csv(csv_deceased) as (header_deceased, first_deceased, rows_deceased):  # noqa: E501
+            if header != header_deceased:
+                raise RuntimeError(
+                    'Confirmed and deceased headers don\'t match.')
+
+            dates = _to_dates(header)
+            start = 0
+            if since is not None:
+                start = int(np.searchsorted(dates, np.datetime64(since)))
+            dates = dates[start:]
+            num_dates = dates.shape[0]
+
+            country = 'US'
+            states: Dict[str, np.ndarray] = {}
+            counties: List[Tuple[str, str, np.ndarray, np.ndarray]] = []
+
+            def flush() -> Generator[Batch, None, None]:
+                yield from _expand_rows(
+                    dates, country,
+                    [county[0] for county in counties],
+                    [county[1] for county in counties],
+                    np.vstack([county[2] for county in counties]),
+                    np.vstack([county[3] for county in counties]),
+                    batch_size)
+                counties.clear()
+
+            rows = itertools.zip_longest(rows_confirmed, rows_deceased)
+            for confirmed, deceased in rows:
+                if confirmed is None or deceased is None \
+                        or confirmed[0] != deceased[0]:
+                    raise RuntimeError(
+                        'Rows are different between the confirmed and '
+                        'deceased time series.')
+
+                county, state, row_country = confirmed[5:8]
+                if not region_matches(regions, row_country, state):
+                    continue
+
+                confirmed_series = np.asarray(confirmed[first_confirmed+start:], dtype=float).astype(np.int64)  # noqa: E501
+                deceased_series = np.asarray(deceased[first_deceased+start:], dtype=float).astype(np.int64)  # noqa: E501
+
+                if state not in states:
+                    states[state] = np.zeros((2, num_dates), dtype=np.int64)
+                states[state][0, :] += confirmed_series
+                states[state][1, :] += deceased_series
+
+                # Some territories are only reported at the state level, which
+                # is already covered by the state totals.
+                if len(county) == 0:
+                    continue
+
+                counties.append((state, county, confirmed_series,
+                                 deceased_series))
+                if len(counties)*num_dates >= batch_size:
+                    yield from flush()
+
+            if len(counties) > 0:
+                yield from flush()
+
+        if len(states) == 0:
+            return
+
+        yield from _expand_rows(
+            dates, country, list(states.keys()), [''] * len(states),
+            np.vstack([totals[0, :] for totals in states.values()]),
+            np.vstack([totals[1, :] for totals in states.values()]),
+            batch_size)
+
+    def _global_cases(self, regions: Regions, since: Optional[datetime.date],
+                      us_rollup: bool) -> Generator[Cases, None, None]:
+        '''Parse the global time series.
+
+        If ``us_rollup`` is ``True`` then the national US totals are marked as
+        a rollup, since the county-level time series provides the states.
+        '''
+        # Get paths to the various CSV files.
+        csv_confirmed = self._time_series('confirmed_global')
+        csv_deceased = self._time_series('deaths_global')
+        # Stream through both files at the same time so that only one row of
+        # each is ever in memory.
+        with _open_csv(csv_confirmed) as (header, rows_confirmed), \
+                _open_csv(csv_deceased) as (header_deceased, rows_deceased):
+            if header != header_deceased:
+                raise RuntimeError(
+                    'Confirmed and deceased headers don\'t match.')
+
+            dates: List[Tuple[int, datetime.date]] = []
+            for column in range(4, len(header)):
+                month, day, year = tuple(int(dd) for dd in header[column].split('/'))  # noqa: E501
+                date = datetime.date(year+2000, month, day)
+                if since is None or date >= since:
+                    dates.append((column, date))
+
+            rows = itertools.zip_longest(rows_confirmed, rows_deceased)
+            for confirmed, deceased in rows:
+                # Check the data consistency.
+                if confirmed is None or deceased is None \
+                        or len(confirmed) != len(deceased):
+                    raise RuntimeError(
+                        'CSV content sizes are different between the '
+                        'confirmed and deceased time series.')
+
+                # Only keep the requested regions.
+                if not region_matches(regions, confirmed[1], confirmed[0]):
+                    continue
+
+                rollup = us_rollup and confirmed[1] == 'US'
+
+                # Extract the data.
+                for column, date in dates:
+                    yield Cases(
+                        date=date,
+                        province=confirmed[0],
+                        country=confirmed[1],
+                        confirmed=confirmed[column],
+                        resolved=-1,
+                        deceased=deceased[column],
+                        rollup=rollup
+                    )
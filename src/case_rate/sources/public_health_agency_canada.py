@@ -1,13 +1,14 @@
 import csv
 import datetime
 import pathlib
-from typing import Generator
+from typing import Generator, Optional
 
 import click
 
-from case_rate._types import Cases, CaseTesting, PathLike
-from case_rate.sources._utilities import download_file
-from case_rate.storage import InputSource
+from case_rate._types import Cases, CaseTesting, PathLike, Regions
+from case_rate.sources._utilities import (compressed_path, download_file,
+                                          file_fingerprint, open_text)
+from case_rate.storage import InputSource, region_matches
 
 
 def _to_date(date: str) -> datetime.date:
@@ -70,9 +71,13 @@ class PublicHealthAgencyCanadaSource(InputSource):
     https://health-infobase.canada.ca/src/data/covidLive/covid19.csv.  The
     data source will link back to the original PHAC site rather than to the
     file.
+
+    The national totals reported by PHAC are stored as rollups (see
+    :class:`Cases`) so that they're used for Canada as a whole instead of
+    summing up the provinces.
     '''
     def __init__(self, path: PathLike, url: str, info: str,
-                 update: bool = True):
+                 update: bool = True, compression: Optional[str] = None):
         '''
         Parameters
         ----------
@@ -84,8 +89,11 @@ class PublicHealthAgencyCanadaSource(InputSource):
             the URL to the main information path (not the CSV file)
         update : bool, optional
             if ``True`` then updates an existing CSV file to the latest version
+        compression : str, optional
+            store the CSV file compressed, using either ``'gzip'`` or
+            ``'lzma'``; by default it's stored as plain text
         '''
-        path = pathlib.Path(path) / 'covid19.csv'
+        path = compressed_path(pathlib.Path(path) / 'covid19.csv', compression)
         if path.exists():
             if update:
                 click.echo('Updating PHAC COVID-19 report.')
@@ -108,33 +116,57 @@ class PublicHealthAgencyCanadaSource(InputSource):
     def url(self) -> str:
         return self._info
 
-    def cases(self) -> Generator[Cases, None, None]:
-        with self._path.open() as f:
+    def fingerprint(self) -> Optional[str]:
+        return file_fingerprint(self._path)
+
+    def cases(self, regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Cases, None, None]:
+        with open_text(self._path) as f:
             contents = csv.DictReader(f)
             for entry in contents:
-                if entry['prname'] == 'Canada':
+                # The national totals are kept as rollups rather than being
+                # treated as another province.
+                rollup = entry['prname'] == 'Canada'
+                province = '' if rollup else entry['prname']
+
+                if not region_matches(regions, 'Canada', province):
+                    continue
+
+                date = _to_date(entry['date'])
+                if since is not None and date < since:
                     continue
 
                 # NOTE: PHAC doesn't report resolved cases as of 2022-08-26
                 yield Cases(
-                    date=_to_date(entry['date']),
-                    province=entry['prname'],
+                    date=date,
+                    province=province,
                     country='Canada',
                     confirmed=_to_int(entry['totalcases']),
                     resolved=-1,
-                    deceased=_to_int(entry['numdeaths'])
+                    deceased=_to_int(entry['numdeaths']),
+                    rollup=rollup
                 )
 
-    def testing(self) -> Generator[CaseTesting, None, None]:
-        with self._path.open() as f:
+    def testing(self, regions: Regions = None,
+                since: Optional[datetime.date] = None
+                ) -> Generator[CaseTesting, None, None]:
+        with open_text(self._path) as f:
             contents = csv.DictReader(f)
             for entry in contents:
                 if entry['prname'] == 'Canada':
                     continue
 
+                if not region_matches(regions, 'Canada', entry['prname']):
+                    continue
+
+                date = _to_date(entry['date'])
+                if since is not None and date < since:
+                    continue
+
                 # NOTE: PHAC doesn't report testing counts as of 2022-08-26
                 yield CaseTesting(
-                    date=_to_date(entry['date']),
+                    date=date,
                     province=entry['prname'],
                     country='Canada',
                     tested=-1,
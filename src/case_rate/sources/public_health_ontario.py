@@ -1,13 +1,14 @@
 import csv
 import datetime
 import pathlib
-from typing import Generator
+from typing import Generator, Optional
 
 import click
 
-from case_rate._types import Cases, CaseTesting, PathLike
-from case_rate.sources._utilities import download_file
-from case_rate.storage import InputSource
+from case_rate._types import Cases, CaseTesting, PathLike, Regions
+from case_rate.sources._utilities import (compressed_path, download_file,
+                                          file_fingerprint, open_text)
+from case_rate.storage import InputSource, region_matches
 
 
 def _to_date(date: str) -> datetime.date:
@@ -81,7 +82,8 @@ class PublicHealthOntarioSource(InputSource):
     .. _Status of COVID-19 cases in Ontario: https://data.ontario.ca/dataset/status-of-covid-19-cases-in-ontario
     '''  # noqa: E501
     def __init__(self, path: PathLike, url: str = None,
-                 info: str = None, update: bool = True):
+                 info: str = None, update: bool = True,
+                 compression: Optional[str] = None):
         '''
         Parameters
         ----------
@@ -94,13 +96,16 @@ class PublicHealthOntarioSource(InputSource):
             provided then it uses the default link
         update : bool, optional
             if ``True`` then updates an existing CSV file to the latest version
+        compression : str, optional
+            store the CSV file compressed, using either ``'gzip'`` or
+            ``'lzma'``; by default it's stored as plain text
         '''
         if url is None:
             raise ValueError('Missing data source URL.')
         if info is None:
             raise ValueError('Missing information URL.')
 
-        path = pathlib.Path(path) / 'covid19.csv'
+        path = compressed_path(pathlib.Path(path) / 'covid19.csv', compression)
         if path.exists():
             if update:
                 click.echo('Updating PHO "Status of COVID-19 cases in Ontario" report.')  # noqa: E501
@@ -123,12 +128,24 @@ class PublicHealthOntarioSource(InputSource):
     def url(self) -> str:
         return self._info
 
-    def cases(self) -> Generator[Cases, None, None]:
-        with self._path.open() as f:
+    def fingerprint(self) -> Optional[str]:
+        return file_fingerprint(self._path)
+
+    def cases(self, regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Cases, None, None]:
+        if not region_matches(regions, 'Canada', 'Ontario'):
+            return
+
+        with open_text(self._path) as f:
             contents = csv.DictReader(f)
             for entry in contents:
+                date = _to_date(entry['Reported Date'])
+                if since is not None and date < since:
+                    continue
+
                 yield Cases(
-                    date=_to_date(entry['Reported Date']),
+                    date=date,
                     province='Ontario',
                     country='Canada',
                     confirmed=_to_int(entry['Total Cases']),
@@ -136,12 +153,21 @@ class PublicHealthOntarioSource(InputSource):
                     deceased=_to_int(entry['Deaths'])
                 )
 
-    def testing(self) -> Generator[CaseTesting, None, None]:
-        with self._path.open() as f:
+    def testing(self, regions: Regions = None,
+                since: Optional[datetime.date] = None
+                ) -> Generator[CaseTesting, None, None]:
+        if not region_matches(regions, 'Canada', 'Ontario'):
+            return
+
+        with open_text(self._path) as f:
             contents = csv.DictReader(f)
             for entry in contents:
+                date = _to_date(entry['Reported Date'])
+                if since is not None and date < since:
+                    continue
+
                 yield CaseTesting(
-                    date=_to_date(entry['Reported Date']),
+                    date=date,
                     province='Ontario',
                     country='Canada',
                     tested=_to_int(entry['Total tests completed in the last day']),  # noqa: E501
@@ -1,29 +1,81 @@
 import abc
 import datetime
+import inspect
 import sqlite3
-from typing import (Any, Dict, Generator, List, NamedTuple, Optional, Tuple,
-                    Union)
+import itertools
+from typing import (Any, Callable, Dict, Generator, Iterable, List,
+                    NamedTuple, Optional, Sequence, Tuple, Type, Union)
 
-from ._types import PathLike, Cases, CaseTesting
+from ._types import (Batch, PathLike, Cases, CaseFrame, CaseTesting, Datum,
+                     Regions, TestingFrame)
+from . import filters
+from .cache import ParsedCache
 
 __all__ = [
+    'BATCH_SIZE',
     'InputSource',
-    'Storage'
+    'Storage',
+    'region_matches'
 ]
 
 
-def _generate_select(table: str, fields: Tuple[str],
-                     region: Tuple[Optional[str]] = (None, None)
-                     ) -> Tuple[str, Tuple[str]]:
+BATCH_SIZE = 4096
+
+# The fields stored in each of the data tables.
+_TABLE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'cases': Cases._fields,
+    'testing': CaseTesting._fields
+}
+
+_TABLE_FRAMES: Dict[str, Type[Union[CaseFrame, TestingFrame]]] = {
+    'cases': CaseFrame,
+    'testing': TestingFrame
+}
+
+
+def region_matches(regions: Regions, country: str, province: str) -> bool:
+    '''Check if a country/province is in a set of selected regions.
+
+    Parameters
+    ----------
+    regions : collection of ``(country, province)`` tuples, or ``None``
+        the selected regions; a ``None`` in either position matches anything
+        and a ``None`` collection matches all regions
+    country : str
+        the country being checked
+    province : str
+        the province/state being checked
+
+    Returns
+    -------
+    bool
+        ``True`` if the region is in the selection
+    '''
+    if regions is None:
+        return True
+
+    for selected_country, selected_province in regions:
+        if selected_country is not None and selected_country != country:
+            continue
+        if selected_province is not None and selected_province != province:
+            continue
+        return True
+
+    return False
+
+
+def _generate_select(table: str, fields: Tuple[str, ...],
+                     region: Tuple[Optional[str], ...] = (None, None)
+                     ) -> Tuple[str, Tuple[str, ...]]:
     '''Generates a select statement for SQL queries.
 
     Parameters
     ----------
     table : str
         name of the table to query
-    fields : Tuple[str]
+    fields : Tuple[str, ...]
         list of columns to retrieve
-    region : ``(province, country)``, optional
+    region : ``(province, country)`` or ``(province, country, county)``
         region to select, by default ``(None, None)``
 
     Returns
@@ -35,7 +87,7 @@ def _generate_select(table: str, fields: Tuple[str],
         the select statement
     '''
     filtered = []
-    province, country = region
+    province, country, *county = region
 
     columns = ', '.join(fields)
     query = f'SELECT {columns} FROM {table} WHERE source == ?'
@@ -48,9 +100,21 @@ def _generate_select(table: str, fields: Tuple[str],
         query += ' AND country == ?'
         filtered.append(country)
 
+    if len(county) > 0 and county[0] is not None:
+        query += ' AND county == ?'
+        filtered.append(county[0])
+
     return query, tuple(filtered)
 
 
+def _to_cases(rows: Iterable[Sequence]) -> List[Cases]:
+    '''Convert rows, with their columns in :class:`Cases` order, into records.
+
+    The rollup flag is stored as an integer and only becomes a ``bool`` here.
+    '''
+    return [Cases(*row[:-1], bool(row[-1])) for row in rows]  # type: ignore
+
+
 # Ensure dates are stored correctly within the database.
 def _adapt_date(date: datetime.date) -> str:
     return f'{date.year}-{date.month}-{date.day}'
@@ -66,13 +130,156 @@ sqlite3.register_adapter(datetime.date, _adapt_date)
 sqlite3.register_converter('timestamp', _convert_date)
 
 
+def _rollup_clause(province: Optional[str]) -> str:
+    '''Generate the condition that selects between rollups and provinces.
+
+    A query for a single province never includes a national rollup.  Any other
+    query uses a country's rollup rows, when the source provides them, instead
+    of its provincial rows so that nothing is counted twice.
+
+    Parameters
+    ----------
+    province : str or ``None``
+        the province being selected, if any
+
+    Returns
+    -------
+    str
+        the condition to append to a query on the ``cases`` table; it takes
+        the source ID as a parameter if a province isn't provided
+    '''
+    if province is not None:
+        return ' AND rollup == 0'
+
+    return (' AND (rollup == 1 OR country NOT IN '
+            '(SELECT country FROM cases WHERE source == ? AND rollup == 1))')
+
+
+# Reconstructs the state of a source's cases as of some vintage.  This relies
+# on SQLite taking the "bare" columns from the row with the maximum vintage.
+_LATEST_REVISIONS = '''
+    SELECT date, province, country, county, rollup, confirmed, deceased,
+           resolved, deleted, MAX(vintage) AS vintage
+    FROM case_revisions
+    WHERE {conditions}
+    GROUP BY country, province, county, rollup, date
+'''
+
+# Stores the differences between the cases table and the previous vintage.
+_RECORD_REVISIONS = '''
+    WITH latest AS ({latest})
+    INSERT INTO case_revisions (vintage, source, date, province, country,
+                                county, rollup, confirmed, deceased, resolved,
+                                deleted)
+    SELECT :new, :source, c.date, c.province, c.country, c.county, c.rollup,
+           c.confirmed, c.deceased, c.resolved, 0
+    FROM cases AS c
+    LEFT JOIN latest AS l
+        ON l.country == c.country AND l.province == c.province
+        AND l.county == c.county AND l.rollup == c.rollup
+        AND l.date == c.date
+    WHERE c.source == :source AND (
+        l.vintage IS NULL OR l.deleted
+        OR l.confirmed IS NOT c.confirmed
+        OR l.deceased IS NOT c.deceased
+        OR l.resolved IS NOT c.resolved)
+    UNION ALL
+    SELECT :new, :source, l.date, l.province, l.country, l.county, l.rollup,
+           l.confirmed, l.deceased, l.resolved, 1
+    FROM latest AS l
+    WHERE NOT l.deleted AND NOT EXISTS (
+        SELECT 1 FROM cases AS c
+        WHERE c.source == :source AND c.country == l.country
+        AND c.province == l.province AND c.county == l.county
+        AND c.rollup == l.rollup AND c.date == l.date)
+'''.format(latest=_LATEST_REVISIONS.format(
+    conditions='source == :source AND vintage <= :previous'))
+
+
+def _read_source(fn: Callable[..., Iterable[Datum]], regions: Regions,
+                 since: Optional[datetime.date]) -> Iterable[Datum]:
+    '''Read from an input source, only passing along any requested filters.
+
+    This allows input sources that were written without any filtering support
+    to continue to work with the storage backend.  Any filter that the source
+    doesn't accept is applied here instead.  A region selection that includes
+    ``(None, None)`` selects everything and so isn't passed along.
+    '''
+    if regions is not None and (None, None) in regions:
+        regions = None
+
+    parameters = inspect.signature(fn).parameters
+    accepts_any = any(parameter.kind == inspect.Parameter.VAR_KEYWORD
+                      for parameter in parameters.values())
+
+    filters: Dict[str, Any] = {}
+    if regions is not None and (accepts_any or 'regions' in parameters):
+        filters['regions'] = regions
+        regions = None
+    if since is not None and (accepts_any or 'since' in parameters):
+        filters['since'] = since
+        since = None
+
+    records = fn(**filters)
+    if regions is not None:
+        records = (record for record in records
+                   if region_matches(regions, record.country, record.province))
+    if since is not None:
+        records = (record for record in records if record.date >= since)
+    return records
+
+
+def _to_batches(records: Iterable[Sequence], fields: Sequence[str],
+                batch_size: int) -> Generator[Batch, None, None]:
+    '''Group a stream of records into fixed-size columnar batches.
+
+    Parameters
+    ----------
+    records : iterable of tuples
+        the records, with values in the same order as ``fields``
+    fields : sequence of ``str``
+        the name of each column
+    batch_size : int
+        maximum number of records in a batch; only the last batch may be
+        smaller
+
+    Yields
+    ------
+    dict
+        a mapping between each field name and a list of column values
+    '''
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, batch_size))
+        if len(chunk) == 0:
+            return
+
+        yield {field: list(column)
+               for field, column in zip(fields, zip(*chunk))}
+
+
 class InputSource(abc.ABC):
     '''Defines an object that case provide data to the storage backend.
 
     A subclass must define the class methods and the :meth:`url` method.  It
     can also implement :meth:`cases` or :meth:`testing` depending on what
     information the report presents.  The default implementations do nothing.
+
+    Both :meth:`cases` and :meth:`testing` accept optional ``regions`` and
+    ``since`` filters.  A source should use these to skip any rows that
+    weren't requested while it's parsing, rather than returning everything
+    and leaving the filtering to :class:`Storage`.
+
+    :class:`Storage` reads the data through :meth:`batches`, which groups the
+    records into fixed-size columnar chunks.  A source that can parse its data
+    directly into columns can override :meth:`parse`.
+
+    If the source has a :attr:`cache` and provides a :meth:`fingerprint` of its
+    raw data then :meth:`batches` will read from the cache rather than parsing
+    the raw data again.
     '''
+    cache: Optional[ParsedCache] = None
+
     @classmethod
     @abc.abstractmethod
     def name(cls) -> str:
@@ -117,9 +324,33 @@ class InputSource(abc.ABC):
         '''
         pass
 
-    def cases(self) -> Generator[Cases, None, None]:
+    def fingerprint(self) -> Optional[str]:
+        '''An identifier for the current version of the source's raw data.
+
+        The fingerprint must change whenever the raw data changes.  The default
+        implementation returns ``None``, meaning that the source is never
+        cached.
+
+        Returns
+        -------
+        str or ``None``
+            the fingerprint, or ``None`` if the source can't be cached
+        '''
+        return None
+
+    def cases(self, regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Cases, None, None]:
         '''The number of COVID-19 cases and their current status.
 
+        Parameters
+        ----------
+        regions : collection of ``(country, province)`` tuples, optional
+            only return cases for these regions (see :func:`region_matches`);
+            by default all regions are returned
+        since : :class:`datetime.date`, optional
+            only return cases reported on or after this date
+
         Yields
         ------
         :class:`Cases`
@@ -128,9 +359,19 @@ class InputSource(abc.ABC):
         '''
         return []
 
-    def testing(self) -> Generator[CaseTesting, None, None]:
+    def testing(self, regions: Regions = None,
+                since: Optional[datetime.date] = None
+                ) -> Generator[CaseTesting, None, None]:
         '''The number of COVID-19 tests (completed and in-progress).
 
+        Parameters
+        ----------
+        regions : collection of ``(country, province)`` tuples, optional
+            only return tests for these regions (see :func:`region_matches`);
+            by default all regions are returned
+        since : :class:`datetime.date`, optional
+            only return tests reported on or after this date
+
         Yields
         ------
         :class:`CaseTesting`
@@ -139,6 +380,70 @@ class InputSource(abc.ABC):
         '''
         return []
 
+    def batches(self, table: str, batch_size: int = BATCH_SIZE,
+                regions: Regions = None,
+                since: Optional[datetime.date] = None
+                ) -> Generator[Batch, None, None]:
+        '''Read the case or testing data in fixed-size, columnar batches.
+
+        The batches are generated lazily so only a single batch is ever held in
+        memory, regardless of the size of the underlying data.  The data comes
+        from :meth:`parse` unless it's already in the source's :attr:`cache`.
+
+        Parameters
+        ----------
+        table : str
+            either ``'cases'`` or ``'testing'``
+        batch_size : int, optional
+            the maximum number of records in each batch
+        regions : collection of ``(country, province)`` tuples, optional
+            only return data for these regions
+        since : :class:`datetime.date`, optional
+            only return data reported on or after this date
+
+        Yields
+        ------
+        dict
+            a mapping between the field names of :class:`Cases` (or
+            :class:`CaseTesting`) and lists containing the column values
+        '''
+        if table not in _TABLE_FIELDS:
+            raise ValueError(f'Unknown data table "{table}".')
+
+        batches = self.parse(table, batch_size, regions, since)
+        if self.cache is None:
+            yield from batches
+            return
+
+        fingerprint = self.fingerprint()
+        if fingerprint is None:
+            yield from batches
+            return
+
+        yield from self.cache.read_through(self.name(), table, fingerprint,
+                                           batches, batch_size, regions,
+                                           since)
+
+    def parse(self, table: str, batch_size: int = BATCH_SIZE,
+              regions: Regions = None,
+              since: Optional[datetime.date] = None
+              ) -> Generator[Batch, None, None]:
+        '''Parse the raw case or testing data into columnar batches.
+
+        The default implementation groups the records from :meth:`cases` or
+        :meth:`testing`.  The arguments are the same as for :meth:`batches`.
+        '''
+        fn: Callable[..., Iterable[Datum]]
+        if table == 'cases':
+            fn = self.cases
+        elif table == 'testing':
+            fn = self.testing
+        else:
+            raise ValueError(f'Unknown data table "{table}".')
+
+        records = _read_source(fn, regions, since)
+        yield from _to_batches(records, _TABLE_FIELDS[table], batch_size)
+
 
 class Storage:
     '''Creates the storage backend used by the covid19 application.
@@ -217,8 +522,14 @@ class Storage:
                     resolved INTEGER,
                     deceased INTEGER,
                     source INTEGER,
+                    county TEXT DEFAULT '',
+                    rollup INTEGER DEFAULT 0,
                     FOREIGN KEY (source) REFERENCES sources(name)
                 );
+                CREATE INDEX IF NOT EXISTS cases_by_region
+                    ON cases (source, country, province, county);
+                CREATE INDEX IF NOT EXISTS cases_rollups
+                    ON cases (source, country) WHERE rollup == 1;
                 CREATE TABLE IF NOT EXISTS testing (
                     date DATE,
                     province TEXT,
@@ -227,54 +538,363 @@ class Storage:
                     under_investigation INTEGER,
                     source INTEGER,
                     FOREIGN KEY (source) REFERENCES sources(name)
-                )
+                );
+                CREATE TABLE IF NOT EXISTS vintages (
+                    vintage INTEGER PRIMARY KEY,
+                    source INTEGER,
+                    ingested INTEGER,
+                    FOREIGN KEY (source) REFERENCES sources(name)
+                );
+                CREATE TABLE IF NOT EXISTS case_revisions (
+                    vintage INTEGER,
+                    source INTEGER,
+                    date DATE,
+                    province TEXT,
+                    country TEXT,
+                    county TEXT,
+                    rollup INTEGER,
+                    confirmed INTEGER,
+                    deceased INTEGER,
+                    resolved INTEGER,
+                    deleted INTEGER DEFAULT 0,
+                    FOREIGN KEY (vintage) REFERENCES vintages(vintage)
+                );
+                CREATE INDEX IF NOT EXISTS case_revisions_by_region
+                    ON case_revisions (source, country, province, county,
+                                       rollup, date, vintage);
                 ''')
         except sqlite3.IntegrityError as e:
             raise Storage.Error('Failed to initialize storage backend.') from e
 
-    def populate(self, source: InputSource):
+    def populate(self, source: InputSource, regions: Regions = None,
+                 since: Optional[datetime.date] = None):
         '''Populate the database with the contents from an input source.
 
+        The optional filters are passed through to the input source so that it
+        can skip anything that isn't needed.  Note that a source is only ever
+        populated once; make sure the filters cover every region that will be
+        queried from it.
+
         Parameters
         ----------
         source : :class:`InputSource`
             an input source object that will populate the internal database
+        regions : collection of ``(country, province)`` tuples, optional
+            only store data for these regions
+        since : :class:`datetime.date`, optional
+            only store data reported on or after this date
         '''
+        # Check if the source exists.  If yes, then register otherwise return
+        # to avoid duplicate inserts.
+        if not self.register(source):
+            return
+
+        for table in _TABLE_FIELDS:
+            for batch in source.batches(table, regions=regions, since=since):
+                self.insert_batch(source, table, batch)
+
+    def register(self, source: InputSource) -> bool:
+        '''Register an input source with the database.
+
+        Parameters
+        ----------
+        source : :class:`InputSource`
+            the input source being registered
+
+        Returns
+        -------
+        bool
+            ``True`` if the source was registered or ``False`` if it already
+            exists in the database
+        '''
+        if self._get_source(source) is not None:
+            return False
+
+        self._register(source)
+        return True
+
+    def populate_vintage(self, source: InputSource,
+                         as_of: Optional[datetime.date] = None,
+                         regions: Regions = None,
+                         since: Optional[datetime.date] = None) -> int:
+        '''Populate the database with a new vintage of an input source.
+
+        This is the same as :meth:`populate` except that the source's existing
+        data is replaced and the changes are recorded with
+        :meth:`record_vintage`.
+
+        Parameters
+        ----------
+        source : :class:`InputSource`
+            an input source object that will populate the internal database
+        as_of : :class:`datetime.date`, optional
+            the date of the vintage, by default today
+        regions : collection of ``(country, province)`` tuples, optional
+            only store data for these regions
+        since : :class:`datetime.date`, optional
+            only store data reported on or after this date
+
+        Returns
+        -------
+        int
+            the vintage's ID
+        '''
+        self.begin_vintage(source)
+        for table in _TABLE_FIELDS:
+            for batch in source.batches(table, regions=regions, since=since):
+                self.insert_batch(source, table, batch)
+
+        return self.record_vintage(source, as_of)
+
+    def begin_vintage(self, source: InputSource):
+        '''Prepare to ingest a new vintage of an input source.
+
+        Unlike :meth:`register`, a source that's already in the database has
+        its current data removed so that it can be replaced.  Any previously
+        recorded vintages are kept.
+
+        Parameters
+        ----------
+        source : :class:`InputSource`
+            the input source being ingested
+        '''
+        ref = self._get_source(source)
+        if ref is None:
+            self._register(source)
+            return
+
         with self._conn:
-            cursor = self._conn.cursor()
+            self._conn.execute(
+                'UPDATE sources SET details = ?, url = ? WHERE rowid == ?',
+                (source.details(), source.url(), ref.source_id))
+            for table in _TABLE_FIELDS:
+                self._conn.execute(f'DELETE FROM {table} WHERE source == ?',
+                                   (ref.source_id,))
+
+    def record_vintage(self, source: Union[str, InputSource],
+                       as_of: Optional[datetime.date] = None) -> int:
+        '''Record the source's current cases as a new vintage.
+
+        Only the cases that are new, or changed, since the previous vintage are
+        stored, along with markers for any that have since been removed.  The
+        full set of cases for any vintage can be reconstructed with the
+        ``as_of`` argument in :meth:`cases`.
+
+        Parameters
+        ----------
+        source : ``str`` or :class:`InputSource`
+            the input source; it must already be registered
+        as_of : :class:`datetime.date`, optional
+            the date of the vintage, by default today
+
+        Returns
+        -------
+        int
+            the vintage's ID
+
+        Raises
+        ------
+        :exc:`Storage.Error`
+            if the source hasn't been registered or if the vintage is older
+            than the source's most recent vintage
+        '''
+        ref = self._get_source(source)
+        if ref is None:
+            raise Storage.Error('Input source has not been registered.')
+
+        if as_of is None:
+            as_of = datetime.date.today()
+
+        previous, ingested = self._conn.execute(
+            'SELECT MAX(vintage), MAX(ingested) FROM vintages '
+            'WHERE source == ?', (ref.source_id,)).fetchone()
+        if ingested is not None and ingested > as_of.toordinal():
+            raise Storage.Error(
+                'Vintages must be recorded in chronological order.')
+
+        with self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO vintages (source, ingested) VALUES (?, ?)',
+                (ref.source_id, as_of.toordinal()))
+            vintage: int = cursor.lastrowid  # type: ignore
+            self._conn.execute(_RECORD_REVISIONS, {
+                'new': vintage,
+                'source': ref.source_id,
+                'previous': -1 if previous is None else previous
+            })
+
+        return vintage
+
+    def vintages(self, source: Union[str, InputSource]
+                 ) -> List[Tuple[int, datetime.date]]:
+        '''List the vintages that were recorded for an input source.
+
+        Parameters
+        ----------
+        source : ``str`` or :class:`InputSource`
+            the input source
+
+        Returns
+        -------
+        list of ``(vintage, date)`` tuples
+            the vintages, from oldest to newest
+        '''
+        ref = self._get_source(source)
+        if ref is None:
+            return []
+
+        rows = self._conn.execute(
+            'SELECT vintage, ingested FROM vintages WHERE source == ? '
+            'ORDER BY vintage', (ref.source_id,))
+        return [(row['vintage'], datetime.date.fromordinal(row['ingested']))
+                for row in rows]
+
+    def insert_batch(self, source: Union[str, InputSource], table: str,
+                     batch: Batch):
+        '''Insert a columnar batch of case or testing data into the database.
+
+        Parameters
+        ----------
+        source : ``str`` or :class:`InputSource`
+            the input source that the data came from; it must already be
+            registered
+        table : str
+            either ``'cases'`` or ``'testing'``
+        batch : dict
+            a mapping between field names and column values, such as what's
+            produced by :meth:`InputSource.batches`
+
+        Raises
+        ------
+        :exc:`Storage.Error`
+            if the source hasn't been registered
+        '''
+        ref = self._get_source(source)
+        if ref is None:
+            raise Storage.Error('Input source has not been registered.')
+
+        fields = _TABLE_FIELDS[table]
+        columns = ', '.join(fields)
+        placeholders = ','.join('?' * (len(fields) + 1))
+
+        # The rollup flag is stored as an integer; binding a 'bool' is much
+        # slower than binding an 'int'.
+        values = [batch[field] if field != 'rollup' else map(int, batch[field])
+                  for field in fields]
+        rows = zip(*values, itertools.repeat(ref.source_id))
+
+        with self._conn:
+            self._conn.executemany(
+                f'INSERT INTO {table} ({columns}, source) '
+                f'VALUES ({placeholders})', rows)
+
+    def batches(self, source: Union[str, InputSource], table: str,
+                batch_size: int = BATCH_SIZE,
+                country: Optional[str] = None,
+                province: Optional[str] = None,
+                county: Optional[str] = None
+                ) -> Generator[Batch, None, None]:
+        '''Read case or testing data from the database in columnar batches.
+
+        Unlike :meth:`cases` and :meth:`tests`, this never loads the full
+        result set into memory.
+
+        Parameters
+        ----------
+        source : ``str`` or :class:`InputSource`
+            the input source to retrieve
+        table : str
+            either ``'cases'`` or ``'testing'``
+        batch_size : int, optional
+            the maximum number of records in each batch
+        country : str, optional
+            optionally select data just from a single country
+        province : str, optional
+            optionally select data from a single province/state
+        county : str, optional
+            optionally select data from a single county; this only applies to
+            case data and, if not provided, any county-level detail is excluded
+
+        Case data follows the same rules as :meth:`cases` for choosing between
+        a source's national rollups and its provincial data.
+
+        Yields
+        ------
+        dict
+            a mapping between field names and lists of column values
+        '''
+        fields = _TABLE_FIELDS[table]
+        if table == 'cases':
+            region: Tuple = (province, country, county or '')
+        else:
+            region = (province, country)
+
+        rows = self._select(source, table, fields, region)
+        yield from _to_batches(rows, fields, batch_size)
+
+    def frame(self, source: Union[str, InputSource], table: str,
+              country: Optional[str] = None,
+              province: Optional[str] = None,
+              county: Optional[str] = None,
+              where: Optional[filters.Predicate] = None
+              ) -> Union[CaseFrame, TestingFrame]:
+        '''Read case or testing data into a columnar frame.
+
+        This selects the same records as :meth:`batches` but stores them as
+        a :class:`CaseFrame` or :class:`TestingFrame`, rather than a list of
+        named tuples.  An optional predicate selects the records in the
+        database query, if it can be compiled into SQL, or with a mask after
+        they've been read.
+
+        Parameters
+        ----------
+        source : ``str`` or :class:`InputSource`
+            the input source to retrieve
+        table : str
+            either ``'cases'`` or ``'testing'``
+        country : str, optional
+            optionally select data just from a single country
+        province : str, optional
+            optionally select data from a single province/state
+        county : str, optional
+            optionally select data from a single county
+        where : :class:`filters.Predicate`, optional
+            only return the records matching this predicate
+
+        Returns
+        -------
+        :class:`CaseFrame` or :class:`TestingFrame`
+            all of the selected records
+        '''
+        fields = _TABLE_FIELDS[table]
+        if table == 'cases':
+            region: Tuple = (province, country, county or '')
+        else:
+            region = (province, country)
 
-            # Check if the source exists.  If yes, then register otherwise
-            # return to avoid duplicate inserts.
-            ref = self._get_source(source)
-            if ref is None:
-                ref = self._register(source)
-            else:
-                return
-
-            # Populate the set of confirmed cases.
-            cases: Cases
-            for cases in source.cases():
-                cursor.execute(
-                    'INSERT INTO cases VALUES (?,?,?,?,?,?,?)',
-                    (cases.date, cases.province, cases.country,
-                     cases.confirmed, cases.resolved, cases.deceased,
-                     ref.source_id))
-
-            # Populate the testing data.
-            tests: CaseTesting
-            for tests in source.testing():
-                cursor.execute(
-                    'INSERT INTO testing VALUES (?,?,?,?,?,?)',
-                    (tests.date, tests.province, tests.country,
-                     tests.tested, tests.under_investigation,
-                     ref.source_id)
-                )
+        clause = None if where is None else where.where()
+        rows = self._select(source, table, fields, region, clause)
+        frame = _TABLE_FRAMES[table].from_batches(
+            _to_batches(rows, fields, BATCH_SIZE))
+
+        if where is not None and clause is None:
+            frame = frame[where.mask(frame)]
+
+        return frame
 
     def cases(self, source: Union[str, InputSource],
               country: Optional[str] = None,
-              province: Optional[str] = None) -> List[Cases]:
+              province: Optional[str] = None,
+              county: Optional[str] = None,
+              as_of: Optional[datetime.date] = None) -> List[Cases]:
         '''Return a list of all cases for the input source.
 
+        County-level cases are only returned if a county is requested.
+        Otherwise any county-level detail is excluded so that it isn't counted
+        twice with the province-level totals.  Similarly, if the source
+        publishes its own national totals then those are returned for a
+        country instead of its provinces.
+
         Parameters
         ----------
         source : a string or :class:`InputSource`
@@ -283,18 +903,25 @@ class Storage:
             optionally select cases just from a single country
         province : str, optional
             optionally select cases from a single province/state
+        county : str, optional
+            optionally select cases from a single county
+        as_of : :class:`datetime.date`, optional
+            return the cases as they were in the most recent vintage recorded
+            on or before this date (see :meth:`record_vintage`), rather than
+            the current cases
 
         Returns
         -------
         list of :class:`Cases`
             All available cases in the database for the input source.
         '''
-        region = (province, country)
-        cases: List[Cases] = []
-        for row in self._select(source, 'cases', Cases._fields, region):
-            cases.append(Cases(**row))
+        region = (province, country, county or '')
+        if as_of is None:
+            rows = self._select(source, 'cases', Cases._fields, region)
+        else:
+            rows = self._select_vintage(source, Cases._fields, region, as_of)
 
-        return cases
+        return _to_cases(rows)
 
     def tests(self, source: Union[str, InputSource],
               country: Optional[str] = None,
@@ -316,18 +943,16 @@ class Storage:
             All available testing results for the input source.
         '''
         region = (province, country)
-        tests: List[CaseTesting] = []
-        for row in self._select(source, 'testing', CaseTesting._fields, region):  # noqa: E501
-            tests.append(CaseTesting(**row))
-
-        return tests
+        rows = self._select(source, 'testing', CaseTesting._fields, region)
+        return [CaseTesting(*row) for row in rows]
 
     def _select(self,
                 source: Union[str, InputSource],
                 table: str,
-                fields: Tuple[str],
-                region: Tuple[Optional[str]] = (None, None)
-                ) -> Generator[Dict[str, Any], None, None]:
+                fields: Tuple[str, ...],
+                region: Tuple[Optional[str], ...] = (None, None),
+                where: Optional[Tuple[str, Tuple]] = None
+                ) -> Generator[sqlite3.Row, None, None]:
         '''Pull rows from the database.
 
         Parameters
@@ -338,29 +963,114 @@ class Storage:
             the table being accessed
         fields : tuple of ``str``
             columns to retrieve
-        region : ``(province, country)``
-            the nation or subnational region to retrieve; if both are provided
-            then it's treated as an "and" condition
+        region : ``(province, country)`` or ``(province, country, county)``
+            the nation or subnational region to retrieve; if more than one is
+            provided then it's treated as an "and" condition
+        where : ``(condition, parameters)``, optional
+            an extra SQL condition, e.g. from :meth:`filters.Predicate.where`
 
         Yields
         ------
-        list of dictionaries
+        :class:`sqlite3.Row`
             the obtained rows
+
+        Raises
+        ------
+        :exc:`Storage.Error`
+            if the source hasn't been registered
         '''
         ref = self._get_source(source)
+        if ref is None:
+            raise Storage.Error('Input source has not been registered.')
+
+        province = region[0]
         query, region = _generate_select(table, fields, region)
-        rows = self._conn.execute(query, (ref.source_id, *region))
+        params: Tuple = (ref.source_id, *region)
+
+        if table == 'cases':
+            query += _rollup_clause(province)
+            if province is None:
+                params += (ref.source_id,)
+
+        if where is not None:
+            query += f' AND ({where[0]})'
+            params += where[1]
+
+        rows = self._conn.execute(query, params)
 
         for row in rows:
             yield row
 
-    def _get_source(self, source: InputSource) -> Optional['Storage._Source']:
+    def _select_vintage(self,
+                        source: Union[str, InputSource],
+                        fields: Tuple[str, ...],
+                        region: Tuple[Optional[str], ...],
+                        as_of: datetime.date
+                        ) -> Generator[sqlite3.Row, None, None]:
+        '''Pull the case rows from a past vintage.
+
+        Parameters
+        ----------
+        source : ``str`` or :class:`InputSource`
+            the input source to retrieve
+        fields : tuple of ``str``
+            columns to retrieve
+        region : ``(province, country, county)``
+            the region to retrieve
+        as_of : :class:`datetime.date`
+            use the most recent vintage recorded on or before this date
+
+        Yields
+        ------
+        :class:`sqlite3.Row`
+            the obtained rows
+
+        Raises
+        ------
+        :exc:`Storage.Error`
+            if the source hasn't been registered
+        '''
+        ref = self._get_source(source)
+        if ref is None:
+            raise Storage.Error('Input source has not been registered.')
+
+        vintage, = self._conn.execute(
+            'SELECT MAX(vintage) FROM vintages '
+            'WHERE source == ? AND ingested <= ?',
+            (ref.source_id, as_of.toordinal())).fetchone()
+        if vintage is None:
+            return
+
+        conditions = ['source == ?', 'vintage <= ?']
+        params: List[Any] = [ref.source_id, vintage]
+        for column, value in zip(('province', 'country', 'county'), region):
+            if value is not None:
+                conditions.append(f'{column} == ?')
+                params.append(value)
+
+        latest = _LATEST_REVISIONS.format(conditions=' AND '.join(conditions))
+        query = f'SELECT {", ".join(fields)} FROM ({latest}) WHERE NOT deleted'
+
+        # Same rule as the current cases for preferring national rollups.
+        if region[0] is not None:
+            query += ' AND rollup == 0'
+        else:
+            query += (' AND (rollup == 1 OR country NOT IN '
+                      '(SELECT country FROM case_revisions WHERE source == ? '
+                      'AND vintage <= ? AND rollup == 1 AND NOT deleted))')
+            params += [ref.source_id, vintage]
+
+        for row in self._conn.execute(query, params):
+            yield row
+
+    def _get_source(self, source: Union[str, InputSource]
+                    ) -> Optional['Storage._Source']:
         '''Obtain the database reference for the current source.
 
         Parameters
         ----------
-        source : :class:`InputSource`
-            an input source object
+        source : ``str`` or :class:`InputSource`
+            an input source object or its name
 
         Returns
         -------
@@ -0,0 +1,193 @@
+import datetime
+import os
+import tracemalloc
+
+from case_rate.cache import ParsedCache
+from case_rate.storage import InputSource, Cases, Storage
+
+
+class CachedSource(InputSource):
+    def __init__(self, version='v1'):
+        self.version = version
+        self.parsed = 0
+
+    @classmethod
+    def name(cls):
+        return 'cached'
+
+    @classmethod
+    def details(cls):
+        return 'Source with a fingerprint.'
+
+    def url(self):
+        return 'http://127.0.0.1'
+
+    def fingerprint(self):
+        return self.version
+
+    def cases(self, regions=None, since=None):
+        self.parsed += 1
+        for day in range(1, 11):
+            yield Cases(
+                date=datetime.date(2020, 1, day),
+                province='a',
+                country='country',
+                confirmed=day,
+                resolved=-1,
+                deceased=0)
+
+
+def read_all(source, **kwargs):
+    batches = list(source.batches('cases', 4, **kwargs))
+    return [len(batch['date']) for batch in batches], batches
+
+
+class TestParsedCache:
+    def test_read_through(self, tmp_path):
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path)
+
+        sizes, expected = read_all(source)
+        assert sizes == [4, 4, 2]
+        assert source.parsed == 1
+        assert len(list(tmp_path.glob('*.npz'))) == 1
+
+        sizes, actual = read_all(source)
+        assert sizes == [4, 4, 2]
+        assert source.parsed == 1
+        assert actual == expected
+        assert isinstance(actual[0]['date'][0], datetime.date)
+        assert isinstance(actual[0]['confirmed'][0], int)
+
+    def test_fingerprint_changed(self, tmp_path):
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path)
+        read_all(source)
+
+        source.version = 'v2'
+        read_all(source)
+        assert source.parsed == 2
+
+    def test_filters_are_keyed(self, tmp_path):
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path)
+        read_all(source)
+        read_all(source, since=datetime.date(2020, 1, 5))
+        assert source.parsed == 2
+
+    def test_partial_read_not_stored(self, tmp_path):
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path)
+
+        next(source.batches('cases', 4))
+        assert len(list(tmp_path.glob('*.npz'))) == 0
+
+    def test_no_fingerprint(self, tmp_path):
+        source = CachedSource(version=None)
+        source.cache = ParsedCache(tmp_path)
+        read_all(source)
+        read_all(source)
+        assert source.parsed == 2
+        assert not tmp_path.exists() or len(list(tmp_path.glob('*.npz'))) == 0
+
+    def test_eviction(self, tmp_path):
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path)
+        read_all(source)
+
+        entry = next(tmp_path.glob('*.npz'))
+        size = entry.stat().st_size
+        os.utime(entry, (0, 0))
+
+        # Only room for one entry, so the least recently used one is removed.
+        source.cache = ParsedCache(tmp_path, size_limit=1.5*size / 2**20)
+        source.version = 'v2'
+        read_all(source)
+
+        entries = list(tmp_path.glob('*.npz'))
+        assert len(entries) == 1
+        assert entries[0] != entry
+
+    def test_eviction_skips_temporary(self, tmp_path):
+        # A file that's still being written by another process.
+        tmp_path.mkdir(exist_ok=True)
+        writing = tmp_path / '.tmp1234.npz'
+        writing.write_bytes(b'0'*4096)
+        os.utime(writing, (0, 0))
+
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path, size_limit=1 / 2**20)
+        read_all(source)
+        assert writing.exists()
+
+    def test_spooled_columns(self, tmp_path):
+        class WideSource(CachedSource):
+            def cases(self, regions=None, since=None):
+                # Each batch has a different text width.
+                for case in super().cases():
+                    yield case._replace(province='p'*case.confirmed)
+
+        source = WideSource()
+        source.cache = ParsedCache(tmp_path)
+        _, expected = read_all(source)
+        _, actual = read_all(source)
+
+        assert source.parsed == 1
+        assert actual == expected
+        assert [path.name for path in tmp_path.iterdir()
+                if path.name.startswith('.')] == []
+
+    def test_hit_streams(self, tmp_path):
+        class LargeSource(CachedSource):
+            def cases(self, regions=None, since=None):
+                self.parsed += 1
+                for day in range(20000):
+                    yield Cases(
+                        date=datetime.date(2020, 1, 1),
+                        province=f'province {day}',
+                        country='country',
+                        confirmed=day,
+                        resolved=-1,
+                        deceased=0)
+
+        source = LargeSource()
+        source.cache = ParsedCache(tmp_path)
+        for _ in source.batches('cases', 100):
+            pass
+
+        # Reading the first batch of a hit shouldn't load the whole entry.
+        tracemalloc.start()
+        try:
+            batch = next(source.batches('cases', 100))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert source.parsed == 1
+        assert batch['confirmed'] == list(range(100))
+        assert peak < 20000*len('province 00000')*4
+
+    def test_corrupt_entry(self, tmp_path):
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path)
+        _, expected = read_all(source)
+
+        entry = next(tmp_path.glob('*.npz'))
+        entry.write_bytes(entry.read_bytes()[:20])
+
+        _, actual = read_all(source)
+        assert source.parsed == 2
+        assert actual == expected
+
+    def test_populate(self, tmp_path):
+        source = CachedSource()
+        source.cache = ParsedCache(tmp_path)
+
+        for _ in range(2):
+            with Storage() as storage:
+                storage.populate(source)
+                cases = list(storage.cases(source.name()))
+                assert len(cases) == 10
+                assert cases[-1].confirmed == 10
+
+        assert source.parsed == 1
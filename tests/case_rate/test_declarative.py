@@ -0,0 +1,105 @@
+import datetime
+
+import pytest
+
+from case_rate.sources import register_sources
+from case_rate.sources.declarative import declare_source
+from case_rate.storage import Storage
+
+DATA = '''Date,Region,Total,Deaths,Tests
+2020-03-01,Canada,3,N/A,10
+2020-03-01,Ontario,1,0,4
+2020-03-01,Quebec,1,,5
+2020-03-02,Canada,6,1,20
+2020-03-02,Ontario,3,1,8
+2020-03-02,Quebec,2,0,9
+'''
+
+DECLARATION = {
+    'type': 'csv',
+    'region': 'Canada',
+    'details': 'Test Feed',
+    'url': 'http://127.0.0.1/data.csv',
+    'rollup': 'Canada',
+    'constants': {
+        'country': 'Canada'
+    },
+    'columns': {
+        'date': 'Date',
+        'province': 'Region',
+        'confirmed': 'Total',
+        'deceased': 'Deaths'
+    },
+    'testing': {
+        'date': 'Date',
+        'province': 'Region',
+        'tested': 'Tests'
+    }
+}
+
+
+def make_source(path, declaration=DECLARATION):
+    SourceCls = declare_source('test-feed', declaration)
+    source = SourceCls.__new__(SourceCls)
+    source._path = path / 'data.csv'
+    source._path.write_text(DATA)
+    source._info = declaration['url']
+    return source
+
+
+class TestDeclarativeSource:
+    def test_declare(self):
+        SourceCls = declare_source('test-feed', DECLARATION)
+        assert SourceCls.__name__ == 'TestFeedSource'
+        assert SourceCls.name() == 'test-feed'
+        assert SourceCls.details() == 'Test Feed'
+
+    def test_cases(self, tmp_path):
+        cases = list(make_source(tmp_path).cases())
+        assert len(cases) == 6
+        assert cases[0].date == datetime.date(2020, 3, 1)
+        assert cases[0].province == ''
+        assert cases[0].rollup is True
+        assert cases[0].deceased == 0
+        assert cases[1].province == 'Ontario'
+        assert cases[1].rollup is False
+        assert cases[1].resolved == -1
+        assert cases[5].confirmed == 2
+
+    def test_filters(self, tmp_path):
+        source = make_source(tmp_path)
+
+        cases = list(source.cases(regions=[('Canada', 'Quebec')]))
+        assert [case.confirmed for case in cases] == [1, 2]
+
+        cases = list(source.cases(since=datetime.date(2020, 3, 2)))
+        assert len(cases) == 3
+
+    def test_testing(self, tmp_path):
+        tests = list(make_source(tmp_path).testing())
+        assert [test.tested for test in tests] == [10, 4, 5, 20, 8, 9]
+        assert all(test.under_investigation == -1 for test in tests)
+
+    def test_populate(self, tmp_path):
+        source = make_source(tmp_path)
+        with Storage() as storage:
+            storage.populate(source)
+            cases = storage.cases(source, country='Canada')
+            assert [case.confirmed for case in cases] == [3, 6]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            declare_source('bad', {'columns': {'date': 'Date'}})
+
+        with pytest.raises(ValueError):
+            declare_source('bad', {'columns': {'date': 'Date',
+                                               'confirmed': 'Total',
+                                               'unknown': 'Other'},
+                                   'constants': {'country': 'Canada'}})
+
+    def test_register(self):
+        sources = {}
+        register_sources({'test-feed': DECLARATION, 'other': {'url': ''}},
+                         sources)
+        assert list(sources.keys()) == [('Canada', None)]
+        assert sources[('Canada', None)].name() == 'test-feed'
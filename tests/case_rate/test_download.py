@@ -0,0 +1,160 @@
+import functools
+import gzip
+import http.server
+import lzma
+import os
+import threading
+
+import pytest
+import requests
+
+from case_rate.sources import _utilities
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / 'server'
+    root.mkdir()
+
+    handler = functools.partial(QuietHandler, directory=str(root))
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    yield root, f'http://127.0.0.1:{httpd.server_address[1]}'
+
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestDownloadFile:
+    def test_download(self, server, tmp_path):
+        root, url = server
+        (root / 'data.csv').write_bytes(b'a,b\n1,2\n')
+
+        output = tmp_path / 'data.csv'
+        nbytes = _utilities.download_file(f'{url}/data.csv', output)
+
+        assert nbytes == 8
+        assert output.read_bytes() == b'a,b\n1,2\n'
+        assert _utilities._metadata_path(output).exists()
+        assert len(list(tmp_path.glob('.data.csv.*'))) == 0
+
+    def test_not_modified(self, server, tmp_path):
+        root, url = server
+        (root / 'data.csv').write_bytes(b'a,b\n1,2\n')
+
+        output = tmp_path / 'data.csv'
+        assert _utilities.download_file(f'{url}/data.csv', output) == 8
+        assert _utilities.download_file(f'{url}/data.csv', output) == 0
+        assert output.read_bytes() == b'a,b\n1,2\n'
+
+    def test_modified(self, server, tmp_path):
+        root, url = server
+        source = root / 'data.csv'
+        source.write_bytes(b'a,b\n1,2\n')
+
+        output = tmp_path / 'data.csv'
+        assert _utilities.download_file(f'{url}/data.csv', output) == 8
+
+        source.write_bytes(b'a,b\n1,2\n3,4\n')
+        stat = source.stat()
+        os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+
+        assert _utilities.download_file(f'{url}/data.csv', output) == 12
+        assert output.read_bytes() == b'a,b\n1,2\n3,4\n'
+
+    def test_size_limit(self, server, tmp_path, monkeypatch):
+        root, url = server
+        (root / 'data.csv').write_bytes(b'0123456789'*10)
+        monkeypatch.setattr(_utilities, 'FILE_SIZE_LIMIT', 50 / 2**20)
+
+        output = tmp_path / 'data.csv'
+        output.write_bytes(b'original')
+
+        with pytest.raises(ValueError):
+            _utilities.download_file(f'{url}/data.csv', output)
+
+        assert output.read_bytes() == b'original'
+        assert len(list(tmp_path.glob('.data.csv.*'))) == 0
+
+    @pytest.mark.parametrize('compression,opener', [
+        ('gzip', gzip.open),
+        ('lzma', lzma.open)
+    ])
+    def test_compressed(self, server, tmp_path, compression, opener):
+        root, url = server
+        (root / 'data.csv').write_bytes(b'a,b\n1,2\n'*100)
+
+        output = _utilities.compressed_path(tmp_path / 'data.csv', compression)
+        nbytes = _utilities.download_file(f'{url}/data.csv', output)
+
+        assert nbytes == 800
+        assert output.stat().st_size < 800
+        with opener(output, 'rb') as f:
+            assert f.read() == b'a,b\n1,2\n'*100
+        with _utilities.open_text(output) as f:
+            assert f.readline() == 'a,b\n'
+
+    def test_unknown_compression(self, tmp_path):
+        with pytest.raises(ValueError):
+            _utilities.compressed_path(tmp_path / 'data.csv', 'zip')
+
+
+class TestDownloader:
+    def test_retry_server_error(self, tmp_path):
+        requests_seen = []
+
+        class FlakyHandler(QuietHandler):
+            def do_GET(self):
+                requests_seen.append(self.path)
+                if len(requests_seen) < 3:
+                    self.send_error(503)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Length', '4')
+                self.end_headers()
+                self.wfile.write(b'data')
+
+        httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            downloader = _utilities.Downloader(retries=3, backoff=0)
+            url = f'http://127.0.0.1:{httpd.server_address[1]}/data.csv'
+            nbytes = downloader.download(url, tmp_path / 'data.csv')
+            downloader.close()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+        assert nbytes == 4
+        assert len(requests_seen) == 3
+        assert (tmp_path / 'data.csv').read_bytes() == b'data'
+
+    def test_gives_up_after_retries(self, tmp_path):
+        class BrokenHandler(QuietHandler):
+            def do_GET(self):
+                self.send_error(500)
+
+        httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), BrokenHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            downloader = _utilities.Downloader(retries=1, backoff=0)
+            url = f'http://127.0.0.1:{httpd.server_address[1]}/data.csv'
+            with pytest.raises(requests.HTTPError):
+                downloader.download(url, tmp_path / 'data.csv')
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+
+        assert not (tmp_path / 'data.csv').exists()
@@ -0,0 +1,137 @@
+import datetime
+
+from click.testing import CliRunner
+
+import feeds
+from case_rate.cli import sources as sources_command
+from case_rate.ingest import ingest
+from case_rate.sources.jhu_csse import JHUCSSESource
+from case_rate.sources.public_health_agency_canada import \
+    PublicHealthAgencyCanadaSource
+from case_rate.sources.public_health_ontario import PublicHealthOntarioSource
+from case_rate.storage import Storage
+
+
+def serve_all(server):
+    feeds.write_jhu_repo(server.root, countries=5, counties=6, days=10)
+    feeds.write_phac_csv(server.root / 'phac.csv', provinces=3, days=10)
+    feeds.write_pho_csv(server.root / 'pho.csv', days=10)
+
+    return {
+        'jhu-csse': {
+            'repo': f'{server.url}/COVID-19.git'
+        },
+        'public-health-agency-canada': {
+            'url': f'{server.url}/phac.csv',
+            'info': f'{server.url}/'
+        },
+        'public-health-ontario': {
+            'url': f'{server.url}/pho.csv',
+            'info': f'{server.url}/'
+        }
+    }
+
+
+class TestSyntheticFeeds:
+    def test_jhu_clone(self, feed_server, tmp_path):
+        feeds.write_jhu_repo(feed_server.root, countries=5, counties=6,
+                             days=10)
+
+        repo = f'{feed_server.url}/COVID-19.git'
+        source = JHUCSSESource(tmp_path / 'data', repo=repo, update=False)
+        assert source.url() == repo
+
+        with Storage() as storage:
+            storage.populate(source, regions=[('US', 'State 01')])
+            counties = storage.cases(source, country='US',
+                                     province='State 01', county='County 000001')  # noqa: E501
+            assert len(counties) == 10
+
+        with Storage() as storage:
+            storage.populate(source)
+            assert len(storage.cases(source)) == 5*10
+
+    def test_phac(self, feed_server, tmp_path):
+        feeds.write_phac_csv(feed_server.root / 'phac.csv', provinces=3,
+                             days=10)
+
+        source = PublicHealthAgencyCanadaSource(
+            tmp_path, url=f'{feed_server.url}/phac.csv', info='', update=False)
+
+        with Storage() as storage:
+            storage.populate(source)
+            national = storage.cases(source, country='Canada')
+            provinces = storage.cases(source, country='Canada',
+                                      province='Province 00000')
+
+        assert len(national) == 10
+        assert all(case.rollup for case in national)
+        assert len(provinces) == 10
+
+    def test_pho(self, feed_server, tmp_path):
+        feeds.write_pho_csv(feed_server.root / 'pho.csv', days=10)
+
+        source = PublicHealthOntarioSource(
+            tmp_path, url=f'{feed_server.url}/pho.csv', info='', update=False)
+
+        with Storage() as storage:
+            storage.populate(source)
+            assert len(storage.cases(source)) == 10
+            assert len(storage.tests(source)) == 10
+
+    def test_ingest(self, feed_server, tmp_path):
+        params = serve_all(feed_server)
+        selectors = [None, 'Canada', 'Canada:Ontario']
+
+        with Storage() as storage:
+            sources = ingest(storage, tmp_path / 'data', False, selectors,
+                             params, since=datetime.date(2020, 1, 26))
+
+            assert len(storage.cases(sources[None])) == 5*6
+            assert len(storage.cases(sources['Canada'], country='Canada')) == 6  # noqa: E501
+            assert len(storage.cases(sources['Canada:Ontario'])) == 6
+
+
+class TestSourcesCommand:
+    def update(self, tmp_path, params, *args):
+        config = {'storage': tmp_path / 'data', 'sources': params}
+        (tmp_path / 'data').mkdir(exist_ok=True)
+        return CliRunner().invoke(sources_command.command,
+                                  ['update', *args], obj=config)
+
+    def summary(self, output):
+        lines = output[output.index('Summary:'):].splitlines()[1:]
+        return {line.split()[1]: line for line in lines
+                if line.startswith('  ') and not line.startswith('      ')}
+
+    def test_update(self, feed_server, tmp_path):
+        params = serve_all(feed_server)
+        result = self.update(tmp_path, params, '--jobs', '2')
+        assert result.exit_code == 0, result.output
+
+        summary = self.summary(result.output)
+        assert len(summary) == 3
+        assert all('\u2713' in line for line in summary.values())
+
+        # The JHU source is updated with 'git' rather than the downloader.
+        assert summary['jhu-csse'].endswith('n/a')
+        assert not summary['public-health-ontario'].endswith(' 0.0 B')
+
+        # Nothing is transferred when the files haven't changed.
+        result = self.update(tmp_path, params, '-j', '1')
+        summary = self.summary(result.output)
+        assert summary['public-health-ontario'].endswith(' 0.0 B')
+
+    def test_failed_source(self, feed_server, tmp_path):
+        params = serve_all(feed_server)
+        params['public-health-ontario']['url'] = f'{feed_server.url}/missing.csv'  # noqa: E501
+
+        result = self.update(tmp_path, params)
+        assert result.exit_code != 0
+        assert '1 source(s) failed to update.' in result.output
+
+        summary = self.summary(result.output)
+        assert '\u2717' in summary['public-health-ontario']
+        assert '\u2713' in summary['jhu-csse']
+        assert '\u2713' in summary['public-health-agency-canada']
+        assert 'HTTPError' in result.output
@@ -4,7 +4,7 @@ from typing import List
 import pytest
 
 from case_rate import filters
-from case_rate._types import Cases, CaseTesting
+from case_rate._types import Cases, CaseFrame, CaseTesting
 
 
 class TestFilters:
@@ -139,3 +139,76 @@ class TestFilters:
         selected = filters.select_by_country(cases, 'b')
         assert len(selected) == 1
         assert selected[0].country == 'b'
+
+    def test_sum_matches_addition(self):
+        cases: List[Cases] = []
+        for i in range(30):
+            cases.append(Cases(
+                date=datetime.date(1234, 5, 1 + i % 4),
+                province='a' if i < 20 else 'b',
+                country='a',
+                confirmed=i,
+                resolved=-1 if i % 5 == 1 else i,
+                deceased=1,
+                rollup=i % 7 != 0
+            ))
+
+        expected = {}
+        for case in cases:
+            if case.date in expected:
+                expected[case.date] += case
+            else:
+                expected[case.date] = case
+
+        summed = filters.sum_by_date(cases)
+        assert summed == [expected[date] for date in sorted(expected)]
+        assert summed[0].resolved == 96
+        assert summed[1].resolved == -1
+        assert summed[1].province == 'aggr'
+        assert summed[1].country == 'a'
+
+
+def make_cases() -> List[Cases]:
+    cases: List[Cases] = []
+    for i in range(12):
+        cases.append(Cases(
+            date=datetime.date(1234, 5, 6 - i % 3),
+            province=f'province {i % 2}',
+            country='a' if i < 8 else 'b',
+            confirmed=i,
+            resolved=0,
+            deceased=0
+        ))
+    return cases
+
+
+class TestPredicates:
+    @pytest.mark.parametrize('predicate', [
+        filters.Equals('country', 'a'),
+        filters.Equals('country', 'missing'),
+        filters.IsIn('province', ['province 1', 'other']),
+        filters.AtLeast('confirmed', 5),
+        filters.DateRange(start=datetime.date(1234, 5, 5)),
+        filters.DateRange(end=datetime.date(1234, 5, 5)),
+        filters.Equals('country', 'a') & ~filters.AtLeast('confirmed', 5),
+        filters.Equals('country', 'b') | filters.Equals('confirmed', 1)
+    ])
+    def test_frame_matches_records(self, predicate):
+        cases = make_cases()
+        frame = CaseFrame.from_records(cases)
+
+        expected = filters.select(cases, predicate)
+        assert filters.select(frame, predicate).to_records() == expected
+
+    def test_where(self):
+        predicate = filters.Equals('country', 'a') & \
+            ~filters.IsIn('confirmed', [1, 2])
+        assert predicate.where() == (
+            '(country == ?) AND (NOT (confirmed IN (?, ?)))', ('a', 1, 2))
+
+        predicate = filters.AtLeast('confirmed', 5) | filters.DateRange()
+        assert predicate.where() is None
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError):
+            filters.Equals('population', 1)
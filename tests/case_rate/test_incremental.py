@@ -0,0 +1,70 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from case_rate._types import Cases
+from case_rate.analysis import (IncrementalRegression, TimeSeries,
+                                estimate_slope, smooth)
+
+
+def make_series(num_days, seed=0):
+    rng = np.random.default_rng(seed)
+    counts = np.cumsum(rng.integers(0, 50, size=num_days)) + 100
+    return TimeSeries([
+        Cases(date=datetime.date(2020, 3, 1) + datetime.timedelta(days=i),
+              province='', country='country', confirmed=int(count),
+              deceased=0, resolved=-1)
+        for i, count in enumerate(counts)
+    ], 'confirmed')
+
+
+class TestIncrementalRegression:
+    def test_matches_batch_regression(self):
+        series = make_series(30)
+        regression = IncrementalRegression(7)
+        regression.update(series._samples)
+
+        assert np.allclose(regression.smoothed, smooth(series, 7, False))
+        assert np.allclose(regression.slope, estimate_slope(series, 7))
+
+    def test_daily_updates(self):
+        series = make_series(30)
+        regression = IncrementalRegression(7)
+        regression.update(series._samples[:20])
+
+        for n in range(21, 31):
+            assert regression.update(series._samples[:n]) == 4
+
+        assert np.allclose(regression.smoothed, smooth(series, 7, False))
+        assert np.allclose(regression.slope, estimate_slope(series, 7))
+
+    def test_extend(self):
+        series = make_series(30)
+        regression = IncrementalRegression(7)
+        regression.update(series._samples[:20])
+
+        for n in range(20, 30):
+            assert regression.extend(series._samples[n:n+1]) == 4
+
+        assert np.allclose(regression.samples, series._samples)
+        assert np.allclose(regression.smoothed, smooth(series, 7, False))
+        assert np.allclose(regression.slope, estimate_slope(series, 7))
+
+    def test_revised_samples(self):
+        series = make_series(30)
+        regression = IncrementalRegression(7)
+        regression.update(series._samples)
+
+        revised = series._samples.copy()
+        revised[10] += 5
+        assert regression.update(revised) == 23
+
+        fresh = IncrementalRegression(7)
+        fresh.update(revised)
+        assert np.allclose(regression.smoothed, fresh.smoothed)
+        assert np.allclose(regression.slope, fresh.slope)
+
+    def test_reject_small_window(self):
+        with pytest.raises(ValueError):
+            IncrementalRegression(2)
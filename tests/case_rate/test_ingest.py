@@ -0,0 +1,129 @@
+import datetime
+
+import pytest
+
+from case_rate.ingest import ingest
+from case_rate.storage import (Storage, InputSource, Cases, CaseTesting,
+                               region_matches)
+
+
+class RegionalSource(InputSource):
+    instances = 0
+
+    def __init__(self, path, update):
+        RegionalSource.instances += 1
+
+    @classmethod
+    def name(cls):
+        return 'regional'
+
+    @classmethod
+    def details(cls):
+        return 'Source with several provinces.'
+
+    def url(self):
+        return 'http://127.0.0.1'
+
+    def cases(self, regions=None, since=None):
+        for day in range(1, 21):
+            for province in ('a', 'b', 'c'):
+                if not region_matches(regions, 'country', province):
+                    continue
+                yield Cases(
+                    date=datetime.date(2020, 1, day),
+                    province=province,
+                    country='country',
+                    confirmed=day,
+                    resolved=0,
+                    deceased=0)
+
+    def testing(self, regions=None, since=None):
+        for day in range(1, 21):
+            yield CaseTesting(
+                date=datetime.date(2020, 1, day),
+                province='a',
+                country='country',
+                tested=day,
+                under_investigation=0)
+
+
+class WorldSource(InputSource):
+    def __init__(self, path, update):
+        pass
+
+    @classmethod
+    def name(cls):
+        return 'world'
+
+    @classmethod
+    def details(cls):
+        return 'Default source.'
+
+    def url(self):
+        return 'http://127.0.0.1'
+
+    def cases(self):
+        yield Cases(
+            date=datetime.date(2020, 1, 1),
+            province='',
+            country='other',
+            confirmed=1,
+            resolved=0,
+            deceased=0)
+
+
+class BrokenSource(WorldSource):
+    @classmethod
+    def name(cls):
+        return 'broken'
+
+    def cases(self):
+        raise RuntimeError('Failed to parse.')
+
+
+TEST_SOURCES = {
+    (None, None): WorldSource,
+    ('country', None): RegionalSource
+}
+
+
+class TestIngest:
+    def test_ingest(self, tmp_path):
+        RegionalSource.instances = 0
+        selectors = ['country:a', 'country:b', None]
+        with Storage() as storage:
+            input_sources = ingest(storage, tmp_path, False, selectors,
+                                   sources=TEST_SOURCES, batch_size=7,
+                                   queue_size=1)
+
+            assert RegionalSource.instances == 1
+            assert input_sources['country:a'] is input_sources['country:b']
+            assert isinstance(input_sources[None], WorldSource)
+
+            # Only the requested provinces are ingested.
+            assert len(storage.cases('regional')) == 40
+            assert len(storage.cases('regional', province='a')) == 20
+            assert len(storage.cases('regional', province='c')) == 0
+            assert len(storage.tests('regional')) == 20
+            assert len(storage.cases('world')) == 1
+
+    def test_ingest_error(self, tmp_path):
+        sources = {
+            (None, None): BrokenSource,
+            ('country', None): RegionalSource
+        }
+        with Storage() as storage:
+            with pytest.raises(RuntimeError):
+                ingest(storage, tmp_path, False, ['country', None],
+                       sources=sources, batch_size=1, queue_size=1)
+
+    def test_ingest_vintage(self, tmp_path):
+        with Storage() as storage:
+            for as_of in (datetime.date(2020, 2, 1), datetime.date(2020, 2, 2)):  # noqa: E501
+                ingest(storage, tmp_path, False, ['country'],
+                       sources=TEST_SOURCES, batch_size=7, queue_size=1,
+                       vintage=True, as_of=as_of)
+
+            assert len(storage.vintages('regional')) == 2
+            assert len(storage.cases('regional')) == 60
+            assert len(storage.cases('regional', as_of=datetime.date(2020, 2, 1))) == 60  # noqa: E501
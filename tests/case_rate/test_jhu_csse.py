@@ -0,0 +1,151 @@
+import datetime
+
+import pytest
+
+from case_rate.sources.jhu_csse import JHUCSSESource
+from case_rate.storage import Storage
+
+
+CONFIRMED = '''Province/State,Country/Region,Lat,Long,1/22/20,1/23/20,1/24/20
+,Afghanistan,33.9,67.7,0,1,2
+,US,40.0,-100.0,8,11,15
+Alberta,Canada,53.9,-116.5,1,2,3
+Ontario,Canada,51.2,-85.3,4,5,6
+'''
+
+DECEASED = '''Province/State,Country/Region,Lat,Long,1/22/20,1/23/20,1/24/20
+,Afghanistan,33.9,67.7,0,0,1
+,US,40.0,-100.0,0,1,3
+Alberta,Canada,53.9,-116.5,0,0,0
+Ontario,Canada,51.2,-85.3,0,1,1
+'''
+
+
+CONFIRMED_US = '''UID,iso2,iso3,code3,FIPS,Admin2,Province_State,Country_Region,Lat,Long_,Combined_Key,1/22/20,1/23/20,1/24/20
+84036047,US,USA,840,36047.0,Kings,New York,US,40.6,-73.9,"Kings, New York, US",1,2,3
+84036061,US,USA,840,36061.0,New York,New York,US,40.7,-73.9,"New York, New York, US",2,4,6
+84006037,US,USA,840,6037.0,Los Angeles,California,US,34.3,-118.2,"Los Angeles, California, US",5,5,5
+16,AS,ASM,16,60.0,,American Samoa,US,-14.2,-169.8,"American Samoa, US",0,0,1
+'''  # noqa: E501
+
+DECEASED_US = '''UID,iso2,iso3,code3,FIPS,Admin2,Province_State,Country_Region,Lat,Long_,Combined_Key,Population,1/22/20,1/23/20,1/24/20
+84036047,US,USA,840,36047.0,Kings,New York,US,40.6,-73.9,"Kings, New York, US",2559903,0,1,1
+84036061,US,USA,840,36061.0,New York,New York,US,40.7,-73.9,"New York, New York, US",1628706,0,0,2
+84006037,US,USA,840,6037.0,Los Angeles,California,US,34.3,-118.2,"Los Angeles, California, US",10039107,0,0,0
+16,AS,ASM,16,60.0,,American Samoa,US,-14.2,-169.8,"American Samoa, US",55641,0,0,0
+'''  # noqa: E501
+
+
+def make_source(path, confirmed=CONFIRMED, deceased=DECEASED, us=False):
+    folder = path / 'COVID-19' / 'csse_covid_19_data' / 'csse_covid_19_time_series'  # noqa: E501
+    folder.mkdir(parents=True)
+    (folder / 'time_series_covid19_confirmed_global.csv').write_text(confirmed)
+    (folder / 'time_series_covid19_deaths_global.csv').write_text(deceased)
+
+    if us:
+        (folder / 'time_series_covid19_confirmed_US.csv').write_text(CONFIRMED_US)  # noqa: E501
+        (folder / 'time_series_covid19_deaths_US.csv').write_text(DECEASED_US)
+
+    source = JHUCSSESource.__new__(JHUCSSESource)
+    source._path = path / 'COVID-19'
+    source._url = 'http://127.0.0.1'
+    return source
+
+
+class TestJHUCSSESource:
+    def test_cases(self, tmp_path):
+        source = make_source(tmp_path)
+        cases = list(source.cases())
+        assert len(cases) == 12
+
+        ontario = [case for case in cases if case.province == 'Ontario']
+        assert [int(case.confirmed) for case in ontario] == [4, 5, 6]
+        assert [int(case.deceased) for case in ontario] == [0, 1, 1]
+        assert ontario[0].date == datetime.date(2020, 1, 22)
+        assert all(case.resolved == -1 for case in cases)
+
+    def test_cases_filtered(self, tmp_path):
+        source = make_source(tmp_path)
+        cases = list(source.cases(regions=[('Canada', None)],
+                                  since=datetime.date(2020, 1, 23)))
+        assert len(cases) == 4
+        assert all(case.country == 'Canada' for case in cases)
+        assert all(case.date >= datetime.date(2020, 1, 23) for case in cases)
+
+    def test_mismatched_files(self, tmp_path):
+        deceased = '\n'.join(DECEASED.splitlines()[:-1])
+        source = make_source(tmp_path, deceased=deceased)
+        with pytest.raises(RuntimeError):
+            list(source.cases())
+
+    def test_batches(self, tmp_path):
+        source = make_source(tmp_path)
+        batches = list(source.batches('cases', batch_size=5))
+        assert [len(batch['date']) for batch in batches] == [5, 5, 2]
+
+        with Storage() as storage:
+            storage.populate(source)
+            assert len(storage.cases(source, country='Canada')) == 6
+
+            exported = list(storage.batches(source, 'cases', batch_size=5))
+            assert [len(batch['confirmed']) for batch in exported] == [5, 5, 2]
+
+    def test_us_counties(self, tmp_path):
+        source = make_source(tmp_path, us=True)
+
+        # Without an explicit request for the US, the national totals from the
+        # global time series are used.
+        cases = list(source.cases())
+        assert len(cases) == 12
+        assert all(case.county == '' for case in cases)
+
+        with Storage() as storage:
+            storage.populate(source, regions=[('US', None), ('US', 'New York')])  # noqa: E501
+
+            # The national totals still come from the global time series, even
+            # though the states are summed up from the counties.
+            us = storage.cases(source, country='US')
+            assert [case.confirmed for case in us] == [8, 11, 15]
+            assert all(case.rollup for case in us)
+
+            for state in ('American Samoa', 'California', 'New York'):
+                assert len(storage.cases(source, country='US', province=state)) == 3  # noqa: E501
+
+            new_york = storage.cases(source, country='US', province='New York')
+            assert [case.confirmed for case in new_york] == [3, 6, 9]
+            assert [case.deceased for case in new_york] == [0, 1, 3]
+
+            kings = storage.cases(source, country='US', province='New York',
+                                  county='Kings')
+            assert [case.confirmed for case in kings] == [1, 2, 3]
+            assert all(case.county == 'Kings' for case in kings)
+
+    def test_us_country(self, tmp_path):
+        source = make_source(tmp_path, us=True)
+        with Storage() as storage:
+            storage.populate(source, regions=[('US', None)])
+
+            # A plain 'US' request only uses the global time series.
+            us = storage.cases(source, country='US')
+            assert [case.confirmed for case in us] == [8, 11, 15]
+            assert [case.deceased for case in us] == [0, 1, 3]
+            assert all(case.province == '' and case.county == ''
+                       for case in us)
+
+    def test_us_counties_filtered(self, tmp_path):
+        source = make_source(tmp_path, us=True)
+        regions = [('US', 'California'), ('Canada', None)]
+        since = datetime.date(2020, 1, 23)
+
+        cases = list(source.cases(regions=regions, since=since))
+        assert all(case.date >= since for case in cases)
+        assert all(case.province in ('California', 'Alberta', 'Ontario')
+                   for case in cases)
+
+        california = [case for case in cases if case.province == 'California']
+        assert len(california) == 4
+        assert sorted(case.county for case in california) == [
+            '', '', 'Los Angeles', 'Los Angeles']
+
+        batches = list(source.batches('cases', 3, regions, since))
+        assert sum(len(batch['date']) for batch in batches) == len(cases)
@@ -0,0 +1,77 @@
+import pytest
+
+from case_rate import ingest, sources
+from case_rate.storage import InputSource
+
+
+class CountingSource(InputSource):
+    instances = 0
+
+    def __init__(self, path, update, **kwargs):
+        CountingSource.instances += 1
+        self.path = path
+        self.options = kwargs
+
+    @classmethod
+    def name(cls):
+        return 'counting'
+
+    @classmethod
+    def details(cls):
+        return 'Counts the number of times it was initialized.'
+
+    def url(self):
+        return 'http://127.0.0.1'
+
+
+class DefaultSource(CountingSource):
+    @classmethod
+    def name(cls):
+        return 'default'
+
+
+TEST_SOURCES = {
+    (None, None): DefaultSource,
+    ('Country', None): CountingSource
+}
+
+
+class TestSources:
+    def test_select_source(self):
+        assert sources.select_source(None, TEST_SOURCES) is DefaultSource
+        assert sources.select_source('Country', TEST_SOURCES) is CountingSource
+        assert sources.select_source('Country:Province', TEST_SOURCES) is CountingSource  # noqa: E501
+        assert sources.select_source('Other', TEST_SOURCES) is DefaultSource
+        assert sources.select_source('Country:Province:County', TEST_SOURCES) is CountingSource  # noqa: E501
+
+    def test_parse_region(self):
+        assert sources.parse_region(None) == (None, None, None)
+        assert sources.parse_region('a') == ('a', None, None)
+        assert sources.parse_region('a:b') == ('a', 'b', None)
+        assert sources.parse_region('a:b:c') == ('a', 'b', 'c')
+        with pytest.raises(ValueError):
+            sources.parse_region('a:b:c:d')
+
+    def test_plan_deduplicates(self):
+        regions = ['Country', 'Country:A', 'Country:B', None, 'Other']
+        params = {'counting': {'option': 1}}
+
+        keys, jobs = ingest._plan(regions, params, TEST_SOURCES)
+
+        assert len(jobs) == 2
+        assert keys['Country'] == keys['Country:A'] == keys['Country:B']
+        assert keys[None] == keys['Other']
+        assert jobs[keys['Country']].options == {'option': 1}
+        assert jobs[keys['Country']].regions == [
+            ('Country', None), ('Country', 'A'), ('Country', 'B')
+        ]
+
+    def test_plan_duplicate_names(self):
+        class Impostor(DefaultSource):
+            pass
+
+        duplicated = dict(TEST_SOURCES)
+        duplicated[('Other', None)] = Impostor
+
+        with pytest.raises(ValueError):
+            ingest._plan([None, 'Other'], {}, duplicated)
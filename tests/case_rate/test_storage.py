@@ -1,7 +1,10 @@
 import datetime
 
+import pytest
+
+from case_rate import filters
 from case_rate.storage import (Storage, InputSource, Cases, CaseTesting,
-                               _generate_select)
+                               _generate_select, region_matches)
 
 
 class MockedSource(InputSource):
@@ -98,6 +101,31 @@ class RegionalSource(InputSource):
                 under_investigation=5)
 
 
+class DailySource(InputSource):
+    @classmethod
+    def name(cls):
+        return 'DailySource'
+
+    def details(self):
+        return 'Input source with a month of daily cases.'
+
+    def url(self):
+        return 'http://127.0.0.1'
+
+    def cases(self):
+        for day in range(1, 31):
+            yield Cases(
+                date=datetime.date(2020, 1, day),
+                province='',
+                country='country',
+                confirmed=day,
+                resolved=-1,
+                deceased=0)
+
+    def testing(self):
+        return iter(())
+
+
 class TestStorageInternals:
     def test_date_insert(self):
         sample_date = datetime.date(1234, 5, 6)
@@ -132,6 +160,10 @@ class TestStorageInternals:
         assert rgn[0] == 'province'
         assert rgn[1] == 'country'
 
+        sql, rgn = _generate_select('table', ('a',), (None, 'country', 'county'))  # noqa: E501
+        assert sql == 'SELECT a FROM table WHERE source == ? AND country == ? AND county == ?'  # noqa: E501
+        assert rgn == ('country', 'county')
+
 
 class TestStorage:
     def test_class_name(self):
@@ -204,3 +236,256 @@ class TestStorage:
             assert len(storage.tests('RegionalSource', province='province')) == 2  # noqa: E501
             assert len(storage.tests('RegionalSource', country='country')) == 2  # noqa: E501
             assert len(storage.tests('RegionalSource', country='country', province='province')) == 1  # noqa: E501
+
+    def test_frame(self):
+        test_source = RegionalSource()
+        with Storage() as storage:
+            storage.populate(test_source)
+
+            cases = storage.frame('RegionalSource', 'cases', country='country')
+            assert cases.to_records() == storage.cases('RegionalSource', country='country')  # noqa: E501
+
+            tests = storage.frame('RegionalSource', 'testing')
+            assert tests.to_records() == storage.tests('RegionalSource')
+
+    def test_unknown_source(self):
+        with Storage() as storage:
+            with pytest.raises(Storage.Error):
+                storage.cases('RegionalSource')
+            with pytest.raises(Storage.Error):
+                storage.tests('RegionalSource')
+            with pytest.raises(Storage.Error):
+                storage.frame('RegionalSource', 'cases')
+            with pytest.raises(Storage.Error):
+                storage.cases('RegionalSource', as_of=datetime.date.today())
+            with pytest.raises(Storage.Error):
+                storage.record_vintage('RegionalSource')
+
+    def test_frame_where(self):
+        test_source = RegionalSource()
+        with Storage() as storage:
+            storage.populate(test_source)
+
+            # Compiled into the query.
+            where = filters.Equals('province', 'province')
+            cases = storage.frame('RegionalSource', 'cases', where=where)
+            assert cases['province'].tolist() == ['province', 'province']
+
+            # Applied after the query.
+            where = filters.DateRange(end=datetime.date(1234, 5, 5))
+            assert len(storage.frame('RegionalSource', 'cases', where=where)) == 0  # noqa: E501
+
+    def test_frame_where_date(self):
+        with Storage() as storage:
+            storage.populate(DailySource())
+            frame = storage.frame('DailySource', 'cases')
+
+            # The threshold crosses a digit boundary, i.e. '2020-1-9' sorts
+            # after '2020-1-10' as a string.
+            where = filters.AtLeast('date', datetime.date(2020, 1, 9))
+            cases = storage.frame('DailySource', 'cases', where=where)
+            assert len(cases) == 22
+            assert cases.to_records() == filters.select(frame, where).to_records()  # noqa: E501
+
+            where = filters.AtLeast('confirmed', 9)
+            assert len(storage.frame('DailySource', 'cases', where=where)) == 22  # noqa: E501
+
+
+class FilteredSource(RegionalSource):
+    @classmethod
+    def name(cls):
+        return 'FilteredSource'
+
+    def cases(self, regions=None, since=None):
+        self.requested = (regions, since)
+        for case in super().cases():
+            if region_matches(regions, case.country, case.province):
+                yield case
+
+    def testing(self, regions=None, since=None):
+        for test in super().testing():
+            if region_matches(regions, test.country, test.province):
+                yield test
+
+
+class TestRegionFilter:
+    def test_region_matches(self):
+        assert region_matches(None, 'country', 'province')
+        assert region_matches([(None, None)], 'country', 'province')
+        assert region_matches([('country', None)], 'country', 'province')
+        assert region_matches([('country', 'province')], 'country', 'province')  # noqa: E501
+        assert region_matches([('a', None), ('country', None)], 'country', '')  # noqa: E501
+        assert not region_matches([('country', 'other')], 'country', 'province')  # noqa: E501
+        assert not region_matches([], 'country', 'province')
+
+    def test_populate_pushdown(self):
+        test_source = FilteredSource()
+        since = datetime.date(1234, 5, 6)
+        with Storage() as storage:
+            storage.populate(test_source, regions=[('country', None)],
+                             since=since)
+            assert test_source.requested == ([('country', None)], since)
+            assert len(storage.cases('FilteredSource')) == 2
+
+    def test_populate_without_filters(self):
+        test_source = FilteredSource()
+        with Storage() as storage:
+            storage.populate(test_source)
+            assert test_source.requested == (None, None)
+            assert len(storage.cases('FilteredSource')) == 4
+
+    def test_populate_legacy_source(self):
+        # 'RegionalSource' doesn't accept any filters, so they're applied by
+        # the storage backend instead.
+        with Storage() as storage:
+            storage.populate(RegionalSource(), regions=[('country', None)])
+            assert len(storage.cases('RegionalSource')) == 2
+            assert len(storage.tests('RegionalSource')) == 2
+
+        with Storage() as storage:
+            storage.populate(RegionalSource(),
+                             since=datetime.date(1234, 5, 7))
+            assert len(storage.cases('RegionalSource')) == 0
+
+
+class RollupSource(InputSource):
+    @classmethod
+    def name(cls):
+        return 'RollupSource'
+
+    def details(self):
+        return 'Input source with national rollups.'
+
+    def url(self):
+        return 'http://127.0.0.1'
+
+    def cases(self):
+        date = datetime.date(1234, 5, 6)
+        for province, country in [('a', 'x'), ('b', 'x'), ('c', 'y')]:
+            yield Cases(
+                date=date,
+                province=province,
+                country=country,
+                confirmed=1,
+                resolved=-1,
+                deceased=0)
+
+        # Deliberately different from the sum of the provinces.
+        yield Cases(
+            date=date,
+            province='',
+            country='x',
+            confirmed=5,
+            resolved=-1,
+            deceased=0,
+            rollup=True)
+
+
+class TestRollups:
+    def test_country_prefers_rollup(self):
+        with Storage() as storage:
+            storage.populate(RollupSource())
+
+            cases = storage.cases('RollupSource', country='x')
+            assert len(cases) == 1
+            assert cases[0].confirmed == 5
+            assert cases[0].rollup is True
+
+            frame = storage.frame('RollupSource', 'cases', country='x')
+            assert frame['rollup'].dtype == bool
+            assert frame['rollup'].tolist() == [True]
+
+    def test_province_excludes_rollup(self):
+        with Storage() as storage:
+            storage.populate(RollupSource())
+
+            cases = storage.cases('RollupSource', country='x', province='a')
+            assert len(cases) == 1
+            assert cases[0].rollup is False
+
+            cases = storage.cases('RollupSource', country='y')
+            assert len(cases) == 1
+            assert cases[0].province == 'c'
+
+    def test_world_uses_rollups(self):
+        with Storage() as storage:
+            storage.populate(RollupSource())
+
+            cases = storage.cases('RollupSource')
+            assert sorted((case.country, case.confirmed) for case in cases) == [('x', 5), ('y', 1)]  # noqa: E501
+
+
+class RevisedSource(InputSource):
+    def __init__(self):
+        self.confirmed = {1: 1, 2: 2, 3: 3}
+
+    @classmethod
+    def name(cls):
+        return 'RevisedSource'
+
+    def details(self):
+        return 'Input source that revises its history.'
+
+    def url(self):
+        return 'http://127.0.0.1'
+
+    def cases(self):
+        for day, confirmed in self.confirmed.items():
+            yield Cases(
+                date=datetime.date(2020, 3, day),
+                province='province',
+                country='country',
+                confirmed=confirmed,
+                resolved=-1,
+                deceased=0)
+
+
+class TestVintages:
+    def revisions(self, storage):
+        rows = storage._conn.execute('SELECT COUNT(*) FROM case_revisions')
+        return rows.fetchone()[0]
+
+    def test_reconstruct(self):
+        source = RevisedSource()
+        first = datetime.date(2020, 4, 1)
+        second = datetime.date(2020, 4, 2)
+        third = datetime.date(2020, 4, 3)
+
+        with Storage() as storage:
+            storage.populate_vintage(source, as_of=first)
+            assert self.revisions(storage) == 3
+
+            # Revise one day and add another; only those are stored.
+            source.confirmed = {1: 1, 2: 5, 3: 3, 4: 6}
+            storage.populate_vintage(source, as_of=second)
+            assert self.revisions(storage) == 5
+
+            # Drop a day.
+            source.confirmed = {2: 5, 3: 3, 4: 6}
+            storage.populate_vintage(source, as_of=third)
+            assert self.revisions(storage) == 6
+
+            def confirmed(as_of):
+                cases = storage.cases(source, as_of=as_of)
+                return sorted((case.date.day, case.confirmed) for case in cases)  # noqa: E501
+
+            assert confirmed(datetime.date(2020, 3, 31)) == []
+            assert confirmed(first) == [(1, 1), (2, 2), (3, 3)]
+            assert confirmed(second) == [(1, 1), (2, 5), (3, 3), (4, 6)]
+            assert confirmed(third) == [(2, 5), (3, 3), (4, 6)]
+            assert len(storage.cases(source)) == 3
+            assert [date for _, date in storage.vintages(source)] == [first, second, third]  # noqa: E501
+
+    def test_unchanged(self):
+        source = RevisedSource()
+        with Storage() as storage:
+            storage.populate_vintage(source, as_of=datetime.date(2020, 4, 1))
+            storage.populate_vintage(source, as_of=datetime.date(2020, 4, 2))
+            assert self.revisions(storage) == 3
+
+    def test_out_of_order(self):
+        source = RevisedSource()
+        with Storage() as storage:
+            storage.populate_vintage(source, as_of=datetime.date(2020, 4, 2))
+            with pytest.raises(Storage.Error):
+                storage.populate_vintage(source, as_of=datetime.date(2020, 4, 1))  # noqa: E501
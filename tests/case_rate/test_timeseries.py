@@ -0,0 +1,338 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from case_rate._types import Cases, CaseFrame
+from case_rate.analysis import (MultiTimeSeries, TimeSeries, TimeSeriesPanel,
+                                estimate_growth, estimate_slope,
+                                growth_factor, operations, percent_change,
+                                smooth)
+
+
+def make_case(day, confirmed, province='province'):
+    return Cases(
+        date=datetime.date(2020, 3, day),
+        province=province,
+        country='country',
+        confirmed=confirmed,
+        deceased=0,
+        resolved=-1
+    )
+
+
+class TestTimeSeries:
+    def test_gaps_are_filled(self):
+        cases = [
+            make_case(5, 30),
+            make_case(1, 10),
+            make_case(2, 20),
+        ]
+
+        series = TimeSeries(cases, 'confirmed')
+        assert series.dates[0] == datetime.date(2020, 3, 1)
+        assert series.dates[-1] == datetime.date(2020, 3, 5)
+        assert series._samples.tolist() == [10, 20, 20, 20, 30]
+
+    def test_summed_by_date(self):
+        cases = [
+            make_case(1, 10, 'a'),
+            make_case(1, 5, 'b'),
+            make_case(2, 20, 'a'),
+            make_case(2, 1, 'b'),
+        ]
+
+        series = TimeSeries(cases, 'confirmed', min_value=5)
+        assert series._samples.tolist() == [15, 20]
+
+    def test_frame(self):
+        cases = [make_case(day, 10*day) for day in range(1, 10)]
+        expected = TimeSeries(cases, 'confirmed', min_value=30)
+        series = TimeSeries(CaseFrame.from_records(cases), 'confirmed',
+                            min_value=30)
+        assert series.dates == expected.dates
+        assert np.all(series._samples == expected._samples)
+
+    def test_from_arrays(self):
+        dates = np.array(['2020-03-03', '2020-03-01', '2020-03-01'],
+                         dtype='datetime64[D]')
+        series = TimeSeries.from_arrays(dates, [7, 2, 3], label='cases')
+        assert series.label == 'cases'
+        assert series.dates[0] == datetime.date(2020, 3, 1)
+        assert series._samples.tolist() == [5, 5, 7]
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            TimeSeries([], 'confirmed')
+
+        with pytest.raises(ValueError):
+            TimeSeries([make_case(1, 10)], 'confirmed', min_value=100)
+
+    def test_date_index(self):
+        series = TimeSeries([make_case(day, day) for day in range(1, 11)],
+                            'confirmed')
+        assert series.index.dtype == np.dtype('datetime64[D]')
+        assert series.index[0] == np.datetime64('2020-03-01')
+        assert series.dates is series.dates
+        assert series.dates[-1] == datetime.date(2020, 3, 10)
+
+        with pytest.raises(ValueError):
+            series.index[0] = np.datetime64('2020-01-01')
+
+    def test_locate(self):
+        series = TimeSeries([make_case(day, day) for day in range(1, 11)],
+                            'confirmed')
+        assert series.locate(datetime.date(2020, 3, 4)) == 3
+        assert series.locate(np.datetime64('2020-03-10')) == 9
+
+        with pytest.raises(KeyError):
+            series.locate(datetime.date(2020, 3, 11))
+
+    def test_between(self):
+        series = TimeSeries([make_case(day, day) for day in range(1, 11)],
+                            'confirmed')
+
+        view = series.between(datetime.date(2020, 3, 3),
+                              datetime.date(2020, 3, 5))
+        assert view.dates == [datetime.date(2020, 3, day) for day in (3, 4, 5)]
+        assert view._samples.tolist() == [3, 4, 5]
+        assert np.shares_memory(view._samples, series._samples)
+
+        assert len(series.between(end=datetime.date(2020, 2, 1))) == 0
+        assert len(series.between(start=datetime.date(2020, 3, 9))) == 2
+
+    def test_array_conversion(self):
+        series = TimeSeries([make_case(day, day) for day in range(1, 6)],
+                            'confirmed')
+        assert np.asarray(series) is series._samples
+        assert np.array(series) is not series._samples
+        assert np.array(series).tolist() == [1, 2, 3, 4, 5]
+
+    def test_ufuncs(self):
+        series = TimeSeries([make_case(day, day) for day in range(1, 6)],
+                            'confirmed')
+
+        scaled = series * 10
+        assert isinstance(scaled, TimeSeries)
+        assert scaled.index is series.index
+        assert scaled.label == 'confirmed'
+        assert np.asarray(scaled).tolist() == [10, 20, 30, 40, 50]
+
+        logged = np.log(series)
+        assert np.allclose(np.asarray(logged), np.log([1, 2, 3, 4, 5]))
+        assert np.asarray(series + series).tolist() == [2, 4, 6, 8, 10]
+        assert np.sum(series) == 15
+
+        with pytest.raises(ValueError):
+            series + series.between(end=datetime.date(2020, 3, 2))
+
+    def test_append(self):
+        cases = [make_case(day, 10*day) for day in range(1, 21) if day != 15]
+        expected = TimeSeries(cases, 'confirmed', min_value=20)
+
+        series = TimeSeries(cases[:10], 'confirmed', min_value=20)
+        dates = series.dates
+        series.append([case.date for case in cases[10:]],
+                      [case.confirmed for case in cases[10:]])
+
+        assert series.dates is not dates
+        assert series.dates == expected.dates
+        assert series.index[-1] == np.datetime64('2020-03-20')
+        assert np.all(np.asarray(series) == np.asarray(expected))
+
+        with pytest.raises(ValueError):
+            series.append([datetime.date(2020, 3, 20)], [500])
+
+        # Even if the value would've been dropped.
+        with pytest.raises(ValueError):
+            series.append([datetime.date(2020, 3, 20)], [5])
+
+        # Values below the threshold are ignored.
+        series.append([datetime.date(2020, 3, 22)], [5])
+        assert len(series) == len(expected)
+
+    def test_append_updates_regression(self):
+        cases = [make_case(day, day**2) for day in range(1, 31)]
+        expected = TimeSeries(cases, 'confirmed')
+
+        series = TimeSeries(cases[:20], 'confirmed')
+        regression = series.regression(7)
+        for case in cases[20:]:
+            series.append([case.date], [case.confirmed])
+
+        assert series.regression(7) is regression
+        assert np.allclose(regression.smoothed, smooth(expected, 7, False))
+        assert np.allclose(regression.slope, estimate_slope(expected, 7))
+
+    def test_append_to_empty(self):
+        series = TimeSeries([make_case(day, day) for day in range(1, 11)],
+                            'confirmed', min_value=2)
+        view = series.between(end=datetime.date(2020, 2, 1))
+        assert len(view) == 0
+
+        regression = view.regression(5)
+        view.append([datetime.date(2020, 3, 5), datetime.date(2020, 3, 8),
+                     datetime.date(2020, 3, 9)], [7, 9, 1])
+
+        assert view.dates == [datetime.date(2020, 3, day) for day in range(5, 9)]  # noqa: E501
+        assert view._samples.tolist() == [7, 7, 7, 9]
+        assert view.locate(datetime.date(2020, 3, 8)) == 3
+        assert np.allclose(regression.smoothed, smooth(view, 5, False))
+        assert len(series) == 9
+
+
+class TestMultiTimeSeries:
+    @pytest.fixture
+    def cases(self):
+        rng = np.random.default_rng(7)
+        cases = []
+        for day in range(1, 25):
+            for province in ('a', 'b'):
+                cases.append(Cases(
+                    date=datetime.date(2020, 3, day),
+                    province=province,
+                    country='country',
+                    confirmed=int(day**2 + rng.integers(0, 10)),
+                    deceased=int(day + rng.integers(0, 3)),
+                    resolved=int(2*day)
+                ))
+        return cases
+
+    def test_matches_single_series(self, cases):
+        series = MultiTimeSeries(cases, min_value=10)
+        assert series.columns == ('confirmed', 'deceased', 'resolved')
+        assert np.asarray(series).shape == (len(series), 3)
+
+        for field in series.columns:
+            column = series[field]
+            assert column.label == field
+            assert column.index is series.index
+            assert np.shares_memory(np.asarray(column), np.asarray(series))
+
+        expected = TimeSeries(cases, 'confirmed', min_value=10)
+        assert series.dates == expected.dates
+        assert np.all(np.asarray(series['confirmed']) == np.asarray(expected))
+
+    def test_select(self, cases):
+        series = MultiTimeSeries(CaseFrame.from_records(cases),
+                                 ['deceased', 'confirmed'])
+        assert series.select(['confirmed']).shape == (len(series), 1)
+        assert np.all(series.select(['confirmed', 'deceased']) ==
+                      np.asarray(series)[:, ::-1])
+
+        with pytest.raises(KeyError):
+            series.select(['tested'])
+        with pytest.raises(KeyError):
+            series['tested']
+
+    def test_operations(self, cases):
+        series = MultiTimeSeries(cases)
+        for field in series.columns:
+            single = series[field]
+            assert np.allclose(smooth(series, 7, False)[field],
+                               smooth(single, 7, False))
+            assert np.allclose(smooth(series, 7, True, order=2)[field],
+                               smooth(single, 7, True, order=2))
+            assert np.allclose(estimate_slope(series, 7, order=2)[field],
+                               estimate_slope(single, 7, order=2))
+            assert np.allclose(estimate_growth(series, 7)[field],
+                               estimate_growth(single, 7), equal_nan=True)
+            assert np.allclose(percent_change(series, 7)[field],
+                               percent_change(single, 7))
+            assert np.allclose(growth_factor(series, 7)[field],
+                               growth_factor(single, 7), equal_nan=True)
+
+        assert list(smooth(series, 7, False, columns=['deceased'])) == \
+            ['deceased']
+
+
+class TestTimeSeriesPanel:
+    @pytest.fixture
+    def regions(self):
+        rng = np.random.default_rng(11)
+        regions = {}
+        for name, first, last in [('a', 1, 28), ('b', 6, 20), ('c', 3, 31)]:
+            regions[name] = [
+                Cases(
+                    date=datetime.date(2020, 3, day),
+                    province=name,
+                    country='country',
+                    confirmed=int(3*day**2 + rng.integers(0, 20)),
+                    deceased=0,
+                    resolved=-1
+                )
+                for day in range(first, last + 1) if day % 7 != 0
+            ]
+        return regions
+
+    def test_matches_single_series(self, regions):
+        panel = TimeSeriesPanel(regions, 'confirmed', min_value=50)
+        assert panel.regions == ('a', 'b', 'c')
+        assert np.asarray(panel).shape == (3, len(panel))
+        assert panel.dates[0] == datetime.date(2020, 3, 4)
+        assert panel.dates[-1] == datetime.date(2020, 3, 31)
+
+        for name, cases in regions.items():
+            expected = TimeSeries(cases, 'confirmed', min_value=50)
+            series = panel[name]
+            assert series.dates == expected.dates
+            assert np.all(np.asarray(series) == np.asarray(expected))
+
+        row = panel.regions.index('b')
+        assert panel.starts[row] == panel.locate(datetime.date(2020, 3, 6))
+        assert not panel.valid[row, -1]
+        assert np.isnan(np.asarray(panel)[row, -1])
+
+    def test_from_frame(self, regions):
+        cases = [case for records in regions.values() for case in records]
+        panel = TimeSeriesPanel.from_frame(CaseFrame.from_records(cases),
+                                           'confirmed', by='province')
+        assert sorted(panel.regions) == ['a', 'b', 'c']
+        for name, records in regions.items():
+            expected = TimeSeries(records, 'confirmed')
+            assert np.all(np.asarray(panel[name]) == np.asarray(expected))
+
+    def test_operations(self, regions):
+        panel = TimeSeriesPanel(regions, 'confirmed', min_value=50)
+        smoothed = smooth(panel, 7, False)
+        logged = smooth(panel, 7, True, order=2)
+        slopes = estimate_slope(panel, 7, order=2)
+        growth = estimate_growth(panel, 7)
+        change = percent_change(panel, 7)
+        factor = growth_factor(panel, 7)
+
+        for row, name in enumerate(panel.regions):
+            series = panel[name]
+            span = slice(panel.locate(series.dates[0]),
+                         panel.locate(series.dates[-1]) + 1)
+
+            assert np.allclose(smoothed[row, span], smooth(series, 7, False))
+            assert np.allclose(logged[row, span],
+                               smooth(series, 7, True, order=2))
+            assert np.allclose(slopes[row, span],
+                               estimate_slope(series, 7, order=2))
+            assert np.allclose(growth[row, span], estimate_growth(series, 7),
+                               equal_nan=True)
+            assert np.allclose(change[row, span], percent_change(series, 7))
+            assert np.allclose(factor[row, span], growth_factor(series, 7),
+                               equal_nan=True)
+
+            outside = ~panel.valid[row]
+            assert np.all(np.isnan(smoothed[row, outside]))
+            assert np.all(np.isnan(slopes[row, outside]))
+
+    def test_view_threshold(self, regions):
+        panel = TimeSeriesPanel(regions, 'confirmed', min_value=50)
+        series = panel['a']
+        length = len(series)
+
+        series.append([datetime.date(2020, 3, 29)], [1])
+        assert len(series) == length
+
+    def test_chunked_regression(self, regions, monkeypatch):
+        panel = TimeSeriesPanel(regions, 'confirmed', min_value=50)
+        expected = smooth(panel, 7, True, order=2)
+
+        monkeypatch.setattr(operations, 'PANEL_CHUNK_SIZE', 2)
+        assert np.allclose(smooth(panel, 7, True, order=2), expected,
+                           equal_nan=True)
@@ -1,6 +1,9 @@
 import datetime
-from case_rate._types import Cases, CaseTesting
+from case_rate import _types
+from case_rate._types import Cases, CaseFrame, CaseTesting
+from case_rate.regions import REGIONS, RegionRegistry
 
+import numpy as np
 import pytest
 
 
@@ -158,3 +161,102 @@ class TestTypes:
 
         with pytest.raises(TypeError):
             case_testing + cases
+
+
+def make_cases():
+    cases = []
+    for i in range(12):
+        cases.append(Cases(
+            date=datetime.date(2020, 1, 3 - i % 3),
+            province=f'province {i % 2}',
+            country='country' if i < 8 else 'other',
+            confirmed=i,
+            deceased=1,
+            resolved=-1 if i % 4 == 0 else i
+        ))
+    return cases
+
+
+class TestFrames:
+    def test_round_trip(self):
+        cases = make_cases()
+        frame = CaseFrame.from_records(cases)
+        assert len(frame) == 12
+        assert frame.to_records() == cases
+        assert frame.date.dtype == np.dtype('datetime64[D]')
+
+        codes = frame.encoded('country')
+        assert codes.tolist() == [REGIONS.lookup('country')]*8 + \
+            [REGIONS.lookup('other')]*4
+
+    def test_from_batches(self):
+        frame = _types.TestingFrame.from_batches([
+            {'date': [datetime.date(2020, 1, 1)], 'province': ['a'],
+             'country': ['b'], 'tested': [1], 'under_investigation': [2]},
+            {'date': [datetime.date(2020, 1, 2)], 'province': ['a'],
+             'country': ['b'], 'tested': [3], 'under_investigation': [4]}
+        ])
+        assert frame['tested'].tolist() == [1, 3]
+        assert frame['province'].tolist() == ['a', 'a']
+
+    def test_missing_column(self):
+        with pytest.raises(ValueError):
+            CaseFrame(date=[datetime.date(2020, 1, 1)], confirmed=[1])
+
+    def test_mixed_records(self):
+        with pytest.raises(TypeError):
+            CaseFrame.from_records([CaseTesting(
+                date=datetime.date(2020, 1, 1),
+                province='province',
+                country='country',
+                tested=1,
+                under_investigation=0
+            )])
+
+    def test_select(self):
+        frame = CaseFrame.from_records(make_cases())
+
+        selected = frame.select(frame['confirmed'] > 5)
+        assert selected['confirmed'].tolist() == [8, 11, 7, 10, 6, 9]
+        assert np.all(np.diff(selected.date.astype(int)) >= 0)
+
+        slow = frame.select(lambda case: case.confirmed > 5)
+        assert slow.to_records() == selected.to_records()
+
+    def test_select_by_country(self):
+        frame = CaseFrame.from_records(make_cases())
+        assert len(frame.select_by_country('other')) == 4
+        assert len(frame.select_by_country('missing')) == 0
+
+    def test_sum_by_date(self):
+        cases = make_cases()
+        summed = CaseFrame.from_records(cases).sum_by_date().to_records()
+        assert len(summed) == 3
+        assert [case.date.day for case in summed] == [1, 2, 3]
+        assert summed[0].province == 'aggr'
+        assert summed[0].country == 'aggr'
+
+        for case in summed:
+            rows = [row for row in cases if row.date == case.date]
+            total = rows[0]
+            for row in rows[1:]:
+                total = total + row
+            assert case == total
+
+
+class TestRegionRegistry:
+    def test_intern(self):
+        registry = RegionRegistry()
+        assert registry.intern('a') == 0
+        assert registry.intern('b') == 1
+        assert registry.intern('a') == 0
+        assert len(registry) == 2
+        assert registry.lookup('c') is None
+        assert 'c' not in registry
+
+    def test_encode(self):
+        registry = RegionRegistry()
+        ids = registry.encode(['a', 'b', 'a', 'c'])
+        assert ids.tolist() == [0, 1, 0, 2]
+        assert registry.decode(ids).tolist() == ['a', 'b', 'a', 'c']
+        assert registry.to_names(ids) == ['a', 'b', 'a', 'c']
@@ -0,0 +1,10 @@
+import pytest
+
+import feeds
+
+
+@pytest.fixture
+def feed_server(tmp_path):
+    '''A local server for the synthetic feeds, rooted at ``tmp_path/feeds``.'''
+    with feeds.FeedServer(tmp_path / 'feeds') as server:
+        yield server
@@ -0,0 +1,15 @@
+'''Synthetic upstream feeds for exercising the input sources offline.'''
+from .generate import (CURRENT_VOLUME, Volume, scaled, write_jhu_repo,
+                       write_jhu_series, write_phac_csv, write_pho_csv)
+from .server import FeedServer
+
+__all__ = [
+    'CURRENT_VOLUME',
+    'FeedServer',
+    'Volume',
+    'scaled',
+    'write_jhu_repo',
+    'write_jhu_series',
+    'write_phac_csv',
+    'write_pho_csv'
+]
@@ -0,0 +1,159 @@
+'''Ingest benchmark using the synthetic feeds.
+
+Each feed is generated at some multiple of its current volume, served from a
+local :class:`FeedServer` and then downloaded (or cloned) by its input source.
+The parse and insert throughputs are measured separately: parsing is timed
+by reading every batch from the source and inserting is timed by only
+measuring :meth:`Storage.insert_batch`.
+
+Run it from the repo's root with::
+
+    $ python -m tests.feeds.benchmark --scale 1 --scale 10 --scale 100
+
+Note that the 100x feeds are several gigabytes in size.
+'''
+import pathlib
+import tempfile
+import time
+from typing import Iterable, List, NamedTuple, Optional
+
+import click
+
+from case_rate._types import Regions
+from case_rate.sources import _utilities
+from case_rate.sources.jhu_csse import JHUCSSESource
+from case_rate.sources.public_health_agency_canada import \
+    PublicHealthAgencyCanadaSource
+from case_rate.sources.public_health_ontario import PublicHealthOntarioSource
+from case_rate.storage import InputSource, Storage, _TABLE_FIELDS
+
+from . import generate
+from .server import FeedServer
+
+
+class Result(NamedTuple):
+    feed: str
+    scale: int
+    records: int
+    parse_time: float
+    insert_time: float
+
+
+def _measure(feed: str, scale: int, source: InputSource,
+             regions: Regions) -> Result:
+    '''Measure the parse and insert throughput for a single source.'''
+    records = 0
+    start = time.perf_counter()
+    for table in _TABLE_FIELDS:
+        for batch in source.parse(table, regions=regions):
+            records += len(batch['date'])
+    parse_time = time.perf_counter() - start
+
+    insert_time = 0.0
+    with Storage() as storage:
+        storage.register(source)
+        for table in _TABLE_FIELDS:
+            for batch in source.parse(table, regions=regions):
+                start = time.perf_counter()
+                storage.insert_batch(source, table, batch)
+                insert_time += time.perf_counter() - start
+
+    return Result(feed, scale, records, parse_time, insert_time)
+
+
+def run(scale: int, workdir: pathlib.Path,
+        days: Optional[int] = None) -> List[Result]:
+    '''Generate, serve and ingest every feed at some scale.
+
+    Parameters
+    ----------
+    scale : int
+        multiple of each feed's current volume
+    workdir : path
+        folder used for the generated feeds and the downloaded data
+    days : int, optional
+        override the number of days in each feed
+
+    Returns
+    -------
+    list of :class:`Result`
+        the results for each feed
+    '''
+    def volume(feed):
+        regions, num_days = generate.scaled(feed, scale)
+        return regions, num_days if days is None else days
+
+    countries, jhu_days = volume('jhu-csse')
+    counties, _ = volume('jhu-csse-us')
+    provinces, phac_days = volume('public-health-agency-canada')
+    _, pho_days = volume('public-health-ontario')
+
+    root = workdir / 'feeds'
+    data = workdir / 'data'
+    data.mkdir(parents=True)
+
+    click.echo(f'Generating the {scale}x feeds...')
+    root.mkdir(parents=True)
+    generate.write_jhu_repo(root, countries, counties, jhu_days)
+    generate.write_phac_csv(root / 'phac.csv', provinces, phac_days)
+    generate.write_pho_csv(root / 'pho.csv', pho_days)
+
+    def working_path(SourceCls):
+        path = data / SourceCls.name()
+        path.mkdir()
+        return path
+
+    results = []
+    with FeedServer(root) as server:
+        jhu = JHUCSSESource(working_path(JHUCSSESource),
+                            repo=f'{server.url}/COVID-19.git', update=False)
+        phac = PublicHealthAgencyCanadaSource(
+            working_path(PublicHealthAgencyCanadaSource),
+            url=f'{server.url}/phac.csv', info='', update=False)
+        pho = PublicHealthOntarioSource(
+            working_path(PublicHealthOntarioSource),
+            url=f'{server.url}/pho.csv', info='', update=False)
+
+    results.append(_measure('jhu-csse', scale, jhu, None))
+    results.append(_measure('jhu-csse-us', scale, jhu, [('US', None)]))
+    results.append(_measure('public-health-agency-canada', scale, phac, None))
+    results.append(_measure('public-health-ontario', scale, pho, None))
+    return results
+
+
+def _report(results: Iterable[Result]):
+    click.secho(f'{"Feed":<30} {"Scale":>6} {"Records":>12} '
+                f'{"Parse (rec/s)":>15} {"Insert (rec/s)":>15}', bold=True)
+    for result in results:
+        parse_rate = result.records / max(result.parse_time, 1e-9)
+        insert_rate = result.records / max(result.insert_time, 1e-9)
+        click.echo(f'{result.feed:<30} {result.scale:>5}x '
+                   f'{result.records:>12,} {parse_rate:>15,.0f} '
+                   f'{insert_rate:>15,.0f}')
+
+
+@click.command()
+@click.option('-s', '--scale', 'scales', type=int, multiple=True,
+              help='Multiple of the current feed volume; may be repeated.  '
+                   'Defaults to 1x, 10x and 100x.')
+@click.option('--days', type=int, default=None,
+              help='Override the number of days in each feed.')
+def main(scales: List[int], days: Optional[int]):
+    '''Benchmark the parse and insert throughput of each input source.'''
+    if len(scales) == 0:
+        scales = [1, 10, 100]
+
+    # The scaled up feeds are much larger than anything the real servers
+    # provide.
+    _utilities.FILE_SIZE_LIMIT = float('inf')
+
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as workdir:
+            results.extend(run(scale, pathlib.Path(workdir), days))
+
+    _report(results)
+
+
+if __name__ == '__main__':
+    main()
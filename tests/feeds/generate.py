@@ -0,0 +1,186 @@
+'''Generators for synthetic versions of each upstream data feed.
+
+The generated files follow the same layout as the real feeds, but the region
+names and counts are made up.  Every generator is deterministic for a given
+seed.
+'''
+import datetime
+import pathlib
+import subprocess
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+START_DATE = datetime.date(2020, 1, 22)
+
+
+class Volume(NamedTuple):
+    '''The size of a feed.'''
+    regions: int
+    days: int
+
+
+# Approximately the size of each upstream feed at the time of writing.
+CURRENT_VOLUME = {
+    'jhu-csse': Volume(regions=289, days=1143),
+    'jhu-csse-us': Volume(regions=3342, days=1143),
+    'public-health-agency-canada': Volume(regions=13, days=1000),
+    'public-health-ontario': Volume(regions=1, days=1000)
+}
+
+
+def scaled(feed: str, scale: int) -> Volume:
+    '''The volume of a feed scaled up by some factor.
+
+    A feed that only ever covers a single region is scaled by its number of
+    days instead.
+    '''
+    volume = CURRENT_VOLUME[feed]
+    if volume.regions == 1:
+        return Volume(regions=1, days=volume.days*scale)
+    return Volume(regions=volume.regions*scale, days=volume.days)
+
+
+def _dates(days: int) -> List[datetime.date]:
+    return [START_DATE + datetime.timedelta(days=n) for n in range(days)]
+
+
+def cumulative_counts(rng: np.random.Generator, regions: int,
+                      days: int) -> Tuple[np.ndarray, np.ndarray]:
+    '''Generate cumulative confirmed and deceased counts.
+
+    Returns
+    -------
+    confirmed, deceased : np.ndarray
+        ``regions x days`` arrays of non-decreasing counts
+    '''
+    daily = rng.poisson(rng.uniform(1, 50, size=(regions, 1)),
+                        size=(regions, days))
+    confirmed = np.cumsum(daily, axis=1)
+    deceased = np.cumsum(rng.binomial(daily, 0.02), axis=1)
+    return confirmed, deceased
+
+
+def _join(values) -> str:
+    return ','.join(str(value) for value in values)
+
+
+def write_jhu_series(folder: pathlib.Path, countries: int, counties: int,
+                     days: int, seed: int = 0):
+    '''Write the JHU-CSSE global and US time series into a folder.
+
+    Parameters
+    ----------
+    folder : path
+        the root of the COVID-19 repo
+    countries : int
+        number of rows in the global time series
+    counties : int
+        number of counties in the US time series
+    days : int
+        number of days in each time series
+    seed : int, optional
+        random number generator seed
+    '''
+    rng = np.random.default_rng(seed)
+    series = folder / 'csse_covid_19_data' / 'csse_covid_19_time_series'
+    series.mkdir(parents=True, exist_ok=True)
+
+    dates = [f'{d.month}/{d.day}/{d.year % 100}' for d in _dates(days)]
+
+    # Global time series, which includes a national total for the US.
+    names = [('', 'US')] + [('', f'Country {i:05d}')
+                            for i in range(countries - 1)]
+    confirmed, deceased = cumulative_counts(rng, len(names), days)
+    for name, counts in (('confirmed_global', confirmed),
+                         ('deaths_global', deceased)):
+        with (series / f'time_series_covid19_{name}.csv').open('wt') as f:
+            f.write(_join(['Province/State', 'Country/Region', 'Lat', 'Long'] + dates) + '\n')  # noqa: E501
+            for (province, country), row in zip(names, counts):
+                f.write(_join([province, country, 0.0, 0.0] + row.tolist()) + '\n')  # noqa: E501
+
+    # County-level US time series.
+    header = ['UID', 'iso2', 'iso3', 'code3', 'FIPS', 'Admin2',
+              'Province_State', 'Country_Region', 'Lat', 'Long_',
+              'Combined_Key']
+    confirmed, deceased = cumulative_counts(rng, counties, days)
+    for name, counts, extra in (('confirmed_US', confirmed, []),
+                                ('deaths_US', deceased, ['Population'])):
+        with (series / f'time_series_covid19_{name}.csv').open('wt') as f:
+            f.write(_join(header + extra + dates) + '\n')
+            for i, row in enumerate(counts):
+                county = f'County {i:06d}'
+                state = f'State {i % 50:02d}'
+                values = [84000000 + i, 'US', 'USA', 840, float(i), county,
+                          state, 'US', 0.0, 0.0,
+                          f'"{county}, {state}, US"']
+                values += [1000] if extra else []
+                f.write(_join(values + row.tolist()) + '\n')
+
+
+def _git(*args, cwd: pathlib.Path):
+    subprocess.run(['git', '-c', 'user.name=Synthetic Feeds',
+                    '-c', 'user.email=feeds@localhost'] + list(args),
+                   check=True, capture_output=True, cwd=cwd)
+
+
+def write_jhu_repo(root: pathlib.Path, countries: int, counties: int,
+                   days: int, seed: int = 0) -> pathlib.Path:
+    '''Create a bare git repo with the JHU-CSSE time series.
+
+    Parameters
+    ----------
+    root : path
+        folder where the repo is created
+    countries, counties, days, seed
+        see :func:`write_jhu_series`
+
+    Returns
+    -------
+    path
+        path to the bare repo, ``<root>/COVID-19.git``
+    '''
+    work = root / 'COVID-19'
+    work.mkdir(parents=True)
+    write_jhu_series(work, countries, counties, days, seed)
+
+    _git('init', '-q', cwd=work)
+    _git('add', '.', cwd=work)
+    _git('commit', '-q', '-m', 'Synthetic time series', cwd=work)
+
+    bare = root / 'COVID-19.git'
+    _git('clone', '-q', '--bare', work.as_posix(), bare.as_posix(), cwd=root)
+    return bare
+
+
+def write_phac_csv(path: pathlib.Path, provinces: int, days: int,
+                   seed: int = 0):
+    '''Write a PHAC-style CSV file, including the national totals.'''
+    rng = np.random.default_rng(seed)
+    confirmed, deceased = cumulative_counts(rng, provinces, days)
+    names = [f'Province {i:05d}' for i in range(provinces)]
+
+    with path.open('wt') as f:
+        f.write('pruid,prname,date,totalcases,numdeaths\n')
+        for day, date in enumerate(_dates(days)):
+            date_str = date.strftime('%d-%m-%Y')
+            f.write(_join([1, 'Canada', date_str, confirmed[:, day].sum(),
+                           deceased[:, day].sum()]) + '\n')
+            for i, name in enumerate(names):
+                f.write(_join([i + 10, name, date_str, confirmed[i, day],
+                               deceased[i, day]]) + '\n')
+
+
+def write_pho_csv(path: pathlib.Path, days: int, seed: int = 0):
+    '''Write a PHO-style CSV file.'''
+    rng = np.random.default_rng(seed)
+    confirmed, deceased = cumulative_counts(rng, 1, days)
+    tested = rng.poisson(1000, size=days)
+
+    with path.open('wt') as f:
+        f.write('Reported Date,Total Cases,Resolved,Deaths,'
+                'Total tests completed in the last day,Under Investigation\n')
+        for day, date in enumerate(_dates(days)):
+            f.write(_join([date.isoformat(), confirmed[0, day],
+                           confirmed[0, day] - deceased[0, day],
+                           deceased[0, day], tested[day], 0]) + '\n')
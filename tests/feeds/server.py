@@ -0,0 +1,114 @@
+'''A local stand-in for the upstream data servers.'''
+import functools
+import http.server
+import os
+import pathlib
+import subprocess
+import threading
+import urllib.parse
+from typing import Optional
+
+
+class _FeedHandler(http.server.SimpleHTTPRequestHandler):
+    '''Serves static files and, for anything under ``*.git``, git repos.'''
+    def log_message(self, format, *args):
+        pass
+
+    def _is_git(self) -> bool:
+        path = urllib.parse.urlsplit(self.path).path
+        return '.git/' in path
+
+    def do_GET(self):
+        if self._is_git():
+            self._git_backend()
+        else:
+            super().do_GET()
+
+    def do_POST(self):
+        if self._is_git():
+            self._git_backend()
+        else:
+            self.send_error(405)
+
+    def _git_backend(self):
+        '''Forward the request to 'git http-backend' (the smart protocol).'''
+        path, _, query = self.path.partition('?')
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length > 0 else b''
+
+        env = dict(os.environ,
+                   GIT_PROJECT_ROOT=self.directory,
+                   GIT_HTTP_EXPORT_ALL='1',
+                   PATH_INFO=urllib.parse.unquote(path),
+                   QUERY_STRING=query,
+                   REQUEST_METHOD=self.command,
+                   CONTENT_TYPE=self.headers.get('Content-Type', ''),
+                   CONTENT_LENGTH=str(len(body)),
+                   REMOTE_ADDR=self.client_address[0])
+        for header, variable in (('Git-Protocol', 'GIT_PROTOCOL'),
+                                 ('Content-Encoding', 'HTTP_CONTENT_ENCODING')):  # noqa: E501
+            if header in self.headers:
+                env[variable] = self.headers[header]
+
+        output = subprocess.run(['git', 'http-backend'], input=body, env=env,
+                                capture_output=True, check=True).stdout
+
+        head, separator, payload = output.partition(b'\r\n\r\n')
+        if len(separator) == 0:
+            head, _, payload = output.partition(b'\n\n')
+
+        status = 200
+        headers = []
+        for line in head.decode().splitlines():
+            key, _, value = line.partition(':')
+            if key.lower() == 'status':
+                status = int(value.split()[0])
+            else:
+                headers.append((key, value.strip()))
+
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FeedServer:
+    '''Serve a folder of synthetic feeds from a local HTTP server.
+
+    Plain files are served as-is.  Bare git repos (any folder ending in
+    ``.git``) are served using git's smart HTTP protocol so that they can be
+    shallow cloned.
+
+    Use it as a context manager::
+
+        with FeedServer(root) as server:
+            download_file(f'{server.url}/covid19.csv', output)
+    '''
+    def __init__(self, root: pathlib.Path):
+        self.root = pathlib.Path(root)
+        self._httpd: Optional[http.server.ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        '''str: The server's base URL.'''
+        if self._httpd is None:
+            raise RuntimeError('Server is not running.')
+        return f'http://127.0.0.1:{self._httpd.server_address[1]}'
+
+    def __enter__(self) -> 'FeedServer':
+        self.root.mkdir(parents=True, exist_ok=True)
+        handler = functools.partial(_FeedHandler, directory=str(self.root))
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                                      handler)
+        thread = threading.Thread(target=self._httpd.serve_forever,
+                                  daemon=True)
+        thread.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None